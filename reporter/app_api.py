@@ -1,28 +1,185 @@
-import sqlite3
+import functools
+import threading
+from collections import OrderedDict
 from datetime import date, datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import IO, Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
 
-from . import models  # Direct import of models module
-from .database import DB_FILE
+from . import exports, models  # Direct import of models module
+from .database import DB_FILE, ConnectionPool
 from .database_manager import DatabaseManager
 
 
+# Most results the query cache holds; the least recently used one is evicted beyond it.
+# Keys include page cursors, filters and report ranges, so they are unbounded otherwise.
+QUERY_CACHE_MAX_ENTRIES = 256
+
+
+class QueryCache:
+    """
+    Read-through LRU cache for AppAPI query results. Each entry remembers the
+    generation of every table it was computed from; a write through AppAPI bumps
+    the generation of the tables it touches and drops the entries that depend on them.
+    Writes made outside AppAPI (e.g. the historical migration) are not seen.
+    """
+
+    def __init__(self, max_entries: int = QUERY_CACHE_MAX_ENTRIES) -> None:
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+        self._generations: Dict[str, int] = {}
+        # key -> (tables, generation snapshot, value), least recently used first
+        self._entries: "OrderedDict[Hashable, Tuple[Tuple[str, ...], Tuple[int, ...], Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _snapshot(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        return tuple(self._generations.get(table, 0) for table in tables)
+
+    def get_or_load(
+        self, key: Hashable, tables: Tuple[str, ...], loader: Callable[[], Any]
+    ) -> Any:
+        with self._lock:
+            snapshot = self._snapshot(tables)
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] == snapshot:
+                    self._entries.move_to_end(key)
+                    return entry[2]
+                del self._entries[key]
+        # Load outside the lock so slow queries don't block other sessions.
+        value = loader()
+        with self._lock:
+            # Only store if no write landed while loading.
+            if self._snapshot(tables) == snapshot:
+                self._entries[key] = (tables, snapshot, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, tables: Iterable[str]) -> None:
+        with self._lock:
+            tables = set(tables)
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+            stale = [key for key, entry in self._entries.items() if tables.intersection(entry[0])]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _copy_result(value: Any) -> Any:
+    """A copy of a cached result's lists, dicts and Pages, so callers can't mutate the cached
+    one. The DTOs inside are shared between callers and must be treated as read-only."""
+    if isinstance(value, list):
+        # Result lists are homogeneous: the first item tells whether the items are containers too
+        if value and isinstance(value[0], (list, dict)):
+            return [_copy_result(item) for item in value]
+        return list(value)
+    if isinstance(value, dict):
+        return {name: _copy_result(item) for name, item in value.items()}
+    if isinstance(value, models.Page):
+        return models.Page(items=list(value.items), next_cursor=value.next_cursor)
+    return value
+
+
+def _cached(*tables: str):
+    """Serves the decorated AppAPI read from the query cache, keyed by method and arguments."""
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = (method.__name__, args, tuple(sorted(kwargs.items())))
+            result = self.cache.get_or_load(
+                key, tables, lambda: method(self, *args, **kwargs)
+            )
+            return _copy_result(result)
+
+        return wrapper
+
+    return decorator
+
+
+def _invalidates(*tables: str):
+    """Bumps the cache generation of the given tables after the decorated AppAPI write."""
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self.cache.invalidate(tables)
+
+        return wrapper
+
+    return decorator
+
+
+# Exportable table -> (DatabaseManager iter_* method, export columns, sheet name)
+TABLE_EXPORTS: Dict[str, Tuple[str, List[exports.Column], str]] = {
+    "members": ("iter_members_for_view", exports.MEMBER_COLUMNS, "Members"),
+    "group_class_memberships": (
+        "iter_group_class_memberships_for_view",
+        exports.GROUP_CLASS_MEMBERSHIP_COLUMNS,
+        "Group Class Memberships",
+    ),
+    "pt_memberships": ("iter_pt_memberships_for_view", exports.PT_MEMBERSHIP_COLUMNS, "PT Memberships"),
+}
+
+
+def _write_export(
+    rows: Iterator[Any], columns: List[exports.Column], stream: IO[bytes], export_format: str, sheet_name: str
+) -> int:
+    """Writes a DatabaseManager iter_* generator out through exports.write_export, closing it
+    afterwards so its reader connection is handed back even if the writer failed midway."""
+    try:
+        return exports.write_export(rows, columns, stream, export_format, sheet_name=sheet_name)
+    finally:
+        rows.close()
+
+
+def _series_periods(start: date, end: date, granularity: str) -> List[str]:
+    """First day (YYYY-MM-DD) of every day, Monday-based week or month bucket overlapping start..end."""
+    if granularity == "week":
+        current = start - timedelta(days=start.weekday())
+    elif granularity == "month":
+        current = start.replace(day=1)
+    else:
+        current = start
+    periods = []
+    while current <= end:
+        periods.append(current.isoformat())
+        if granularity == "month":
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            current += timedelta(days=7 if granularity == "week" else 1)
+    return periods
+
+
 class AppAPI:
     """
     API layer for the Kranos MMA Reporter application.
     Acts as a bridge between the UI and Business Logic layers.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, db_manager: Optional[DatabaseManager] = None) -> None:
         """
         Initializes the AppAPI and creates its own DatabaseManager instance.
+        The DatabaseManager is backed by a ConnectionPool so concurrent Streamlit
+        sessions read in parallel and share a single serialized writer.
+        A db_manager may be passed in instead (e.g. one over an in-memory database).
         """
-        conn = sqlite3.connect(
-            DB_FILE, check_same_thread=False
-        )  # check_same_thread for web apps
-        self.db_manager: DatabaseManager = DatabaseManager(connection=conn)
+        if db_manager is None:
+            db_manager = DatabaseManager(pool=ConnectionPool(DB_FILE))
+        self.db_manager: DatabaseManager = db_manager
+        self.cache = QueryCache()
 
     # Member operations
+    @_invalidates("members")
     def add_member(
         self, name: str, email: str, phone: str, join_date: str
     ) -> Optional[models.Member]:
@@ -40,6 +197,7 @@ class AppAPI:
         )
         return self.db_manager.add_member(new_member)
 
+    @_invalidates("members")
     def update_member(
         self,
         member_id: int,
@@ -63,14 +221,40 @@ class AppAPI:
         )
         return self.db_manager.update_member(member_to_update)
 
+    @_cached("members")
     def get_all_members_for_view(self) -> List[models.MemberView]:
         # Assumes db_manager.get_all_members_for_view() returns List[models.MemberView]
         return self.db_manager.get_all_members_for_view()
 
+    @_cached("members")
+    def get_members_page_for_view(
+        self, limit: int, after: Optional[Tuple[str, int]] = None
+    ) -> models.Page:
+        return self.db_manager.get_members_page_for_view(limit, after=after)
+
+    def search_members(self, query: str, limit: int = 20) -> List[models.MemberView]:
+        """
+        Up to limit members whose name, phone or email matches query, best match first
+        (see DatabaseManager.search_members). Not cached: each keystroke is a new query,
+        and the index answers in milliseconds anyway.
+        """
+        return self.db_manager.search_members(query, limit)
+
+    def search_members_by_prefix(
+        self, prefix: str, limit: int = 10, active_only: bool = False
+    ) -> List[models.MemberView]:
+        """
+        Up to limit members whose phone or name starts with prefix, for typeahead pickers
+        (see DatabaseManager.search_members_by_prefix). Not cached, like search_members.
+        """
+        return self.db_manager.search_members_by_prefix(prefix, limit, active_only)
+
+    @_invalidates("members", "group_class_memberships", "pt_memberships")
     def delete_member(self, member_id: int) -> bool:
         return self.db_manager.delete_member(member_id)
 
     # Group Plan operations
+    @_invalidates("group_plans")
     def add_group_plan(
         self,
         name: str,
@@ -91,10 +275,12 @@ class AppAPI:
         )
         return self.db_manager.add_group_plan(new_plan)
 
+    @_cached("group_plans")
     def get_all_group_plans_for_view(self) -> List[models.GroupPlanView]:
         # Assumes db_manager.get_all_group_plans_for_view() returns List[models.GroupPlanView]
         return self.db_manager.get_all_group_plans_for_view()
 
+    @_invalidates("group_plans")
     def update_group_plan(
         self,
         plan_id: int,
@@ -118,9 +304,11 @@ class AppAPI:
         )
         return self.db_manager.update_group_plan(plan_to_update)
 
+    @_invalidates("group_plans")
     def delete_group_plan(self, plan_id: int) -> bool:
         return self.db_manager.delete_group_plan(plan_id)
 
+    @_cached("group_plans")
     def get_group_plan_by_display_name(
         self, display_name: str
     ) -> Optional[models.GroupPlanView]:
@@ -144,6 +332,7 @@ class AppAPI:
         return None
 
     # Group Class Membership operations
+    @_invalidates("group_class_memberships")
     def create_group_class_membership(
         self,
         member_id: int,
@@ -201,6 +390,7 @@ class AppAPI:
         )
         return self.db_manager.add_group_class_membership(new_membership)
 
+    @_cached("group_class_memberships", "members", "group_plans")
     def get_all_group_class_memberships_for_view(
         self, name_filter: Optional[str] = None, status_filter: Optional[str] = None
     ) -> List[models.GroupClassMembershipView]:
@@ -209,6 +399,19 @@ class AppAPI:
             name_filter=name_filter, status_filter=status_filter
         )
 
+    @_cached("group_class_memberships", "members", "group_plans")
+    def get_group_class_memberships_page_for_view(
+        self,
+        limit: int,
+        after: Optional[Tuple[str, int]] = None,
+        name_filter: Optional[str] = None,
+        status_filter: Optional[str] = None,
+    ) -> models.Page:
+        return self.db_manager.get_group_class_memberships_page_for_view(
+            limit, after=after, name_filter=name_filter, status_filter=status_filter
+        )
+
+    @_invalidates("group_class_memberships")
     def update_group_class_membership(
         self,
         membership_id: int,
@@ -272,11 +475,13 @@ class AppAPI:
         )
         return self.db_manager.update_group_class_membership(membership_to_update)
 
+    @_invalidates("group_class_memberships")
     def delete_group_class_membership_record(self, membership_id: int) -> bool:
         # Renamed in db_manager to delete_group_class_membership
         return self.db_manager.delete_group_class_membership(membership_id)
 
     # Personal Training (PT) Membership operations
+    @_invalidates("pt_memberships")
     def create_pt_membership(
         self,
         member_id: int,
@@ -297,13 +502,22 @@ class AppAPI:
         )
         return self.db_manager.add_pt_membership(new_pt_membership)
 
+    @_cached("pt_memberships", "members")
     def get_all_pt_memberships_for_view(self) -> List[models.PTMembershipView]:
         # Assumes db_manager.get_all_pt_memberships_for_view returns List[models.PTMembershipView]
         return self.db_manager.get_all_pt_memberships_for_view()
 
+    @_cached("pt_memberships", "members")
+    def get_pt_memberships_page_for_view(
+        self, limit: int, after: Optional[Tuple[str, int]] = None
+    ) -> models.Page:
+        return self.db_manager.get_pt_memberships_page_for_view(limit, after=after)
+
+    @_invalidates("pt_memberships")
     def delete_pt_membership(self, membership_id: int) -> bool:
         return self.db_manager.delete_pt_membership(membership_id)
 
+    @_invalidates("pt_memberships")
     def update_pt_membership(
         self,
         membership_id: int,
@@ -332,42 +546,150 @@ class AppAPI:
         return self.db_manager.update_pt_membership(pt_membership_to_update)
 
     # Report generation
+    @_cached("group_class_memberships", "pt_memberships", "members", "group_plans")
     def generate_financial_report(
         self, start_date: str, end_date: str
     ) -> Dict[str, Any]:
-        # This function's logic seems mostly okay but relies on db_manager returning specific dict keys.
-        # No changes specified for this in the task, so keeping as is, assuming db_manager.generate_financial_report_data is stable.
-        raw_transactions = self.db_manager.generate_financial_report_data(
-            start_date, end_date
+        """
+        Builds the financial report for purchases between start_date and end_date (inclusive).
+        "details" are the report lines in purchase order; "summary" carries the total revenue
+        and its breakdown by type and by plan. All amounts are in rupees.
+        """
+        details = self.db_manager.get_financial_report_details(start_date, end_date)
+        # Summed as integer paise inside SQLite, so the totals are exact
+        totals = self.db_manager.get_financial_report_totals(start_date, end_date)
+
+        return {
+            "summary": {
+                "total_revenue": models.from_paise(totals["total"]),
+                "by_type": {
+                    line_type: {"count": entry["count"], "revenue": models.from_paise(entry["amount"])}
+                    for line_type, entry in totals["by_type"].items()
+                },
+                "by_plan": [
+                    {
+                        "plan_id": entry["plan_id"],
+                        "plan_name": entry["plan_name"],
+                        "count": entry["count"],
+                        "revenue": models.from_paise(entry["amount"]),
+                    }
+                    for entry in totals["by_plan"]
+                ],
+            },
+            "details": details,
+        }
+
+    def export_financial_report(
+        self, start_date: str, end_date: str, export_format: str, stream: IO[bytes]
+    ) -> int:
+        """
+        Writes the financial report lines between start_date and end_date (inclusive) to a
+        binary stream as "csv" or "xlsx", streaming them from the database in batches so
+        memory use stays flat however long the range is. Not cached: the output goes to
+        the stream. Returns the number of lines written; raises ValueError for an unknown format.
+        """
+        return _write_export(
+            self.db_manager.iter_financial_report_details(start_date, end_date),
+            exports.FINANCIAL_REPORT_COLUMNS,
+            stream,
+            export_format,
+            "Financial Report",
         )
 
-        total_revenue = 0.0
-        processed_details = []
-
-        for trans in raw_transactions:  # trans is a dict
-            item_name = "Unknown Item"
-            if trans.get("type") == "group":
-                item_name = trans.get("plan_name", "Group Plan")
-            elif trans.get("type") == "pt":
-                sessions = trans.get("sessions_total", "N/A")
-                item_name = f"{sessions} PT Sessions"
-
-            processed_details.append(
-                {
-                    "purchase_date": trans.get("purchase_date"),
-                    "amount_paid": trans.get("amount_paid"),
-                    "type": trans.get("type"),
-                    "member_name": trans.get("member_name"),
-                    "item_name": item_name,
-                }
+    def export_table(self, table: str, export_format: str, stream: IO[bytes]) -> int:
+        """
+        Writes every row of "members", "group_class_memberships" or "pt_memberships" (in
+        their view form, with member and plan names) to a binary stream as "csv" or "xlsx",
+        streamed from the database in batches like export_financial_report. Returns the
+        number of rows written; raises ValueError for an unknown table or format.
+        """
+        if table not in TABLE_EXPORTS:
+            raise ValueError(f"Invalid export table '{table}'. Expected one of {', '.join(TABLE_EXPORTS)}.")
+        iter_method, columns, sheet_name = TABLE_EXPORTS[table]
+        return _write_export(
+            getattr(self.db_manager, iter_method)(), columns, stream, export_format, sheet_name
+        )
+
+    # revenue_daily is derived from the purchase tables by triggers, so it shares their cache generations
+    @_cached("group_class_memberships", "pt_memberships")
+    def get_revenue_totals(
+        self, start_date: str, end_date: str, period: str = "month"
+    ) -> List[Dict[str, Any]]:
+        """
+        Revenue per calendar period ("month", "quarter" or "year") between start_date and
+        end_date (inclusive), read from the daily rollup. Returns one entry per period with
+        purchases: {"period", "count", "total_revenue", "by_type": {type: {"count", "revenue"}}},
+        amounts in rupees. Raises ValueError for an unknown period.
+        """
+        periods: Dict[str, Dict[str, Any]] = {}
+        for row in self.db_manager.get_revenue_by_period(start_date, end_date, period):
+            entry = periods.setdefault(
+                row["period"],
+                {"period": row["period"], "count": 0, "amount": 0, "by_type": {}},
             )
-            total_revenue += trans.get("amount_paid", 0.0)
+            entry["count"] += row["count"]
+            entry["amount"] += row["amount"]
+            entry["by_type"][row["type"]] = {
+                "count": row["count"],
+                "revenue": models.from_paise(row["amount"]),
+            }
+        return [
+            {
+                "period": entry["period"],
+                "count": entry["count"],
+                "total_revenue": models.from_paise(entry["amount"]),
+                "by_type": entry["by_type"],
+            }
+            for entry in periods.values()
+        ]
+
+    @_cached("group_class_memberships", "pt_memberships", "group_plans")
+    def generate_financial_report_series(
+        self, start_date: str, end_date: str, granularity: str = "day"
+    ) -> Dict[str, Any]:
+        """
+        Dense revenue time series between start_date and end_date (inclusive) at "day",
+        "week" or "month" granularity, built from one grouped query over the daily rollup.
+        Returns {"granularity", "periods", "total", "by_type", "by_plan"}: periods lists the
+        first day of every bucket, and total, each by_type entry ("group", "pt") and each
+        by_plan entry (keyed by plan display name) hold one rupee amount per period,
+        0.0 where nothing was sold. Raises ValueError for an unknown granularity.
+        """
+        rows = self.db_manager.get_revenue_series(start_date, end_date, granularity)
+        periods = _series_periods(
+            date.fromisoformat(start_date), date.fromisoformat(end_date), granularity
+        )
+        position = {period: index for index, period in enumerate(periods)}
+        total = [0] * len(periods)
+        by_type = {"group": [0] * len(periods), "pt": [0] * len(periods)}
+        by_plan: Dict[str, List[int]] = {}
+        for row in rows:
+            index = position[row["period"]]
+            total[index] += row["amount"]
+            by_type[row["type"]][index] += row["amount"]
+            if row["type"] == "group":
+                plan_name = row["plan_name"] or f"Plan {row['plan_id']}"
+                by_plan.setdefault(plan_name, [0] * len(periods))[index] += row["amount"]
+
+        def in_rupees(amounts: List[int]) -> List[float]:
+            return [models.from_paise(amount) for amount in amounts]
 
         return {
-            "summary": {"total_revenue": total_revenue},
-            "details": processed_details,
+            "granularity": granularity,
+            "periods": periods,
+            "total": in_rupees(total),
+            "by_type": {line_type: in_rupees(amounts) for line_type, amounts in by_type.items()},
+            "by_plan": {plan_name: in_rupees(amounts) for plan_name, amounts in sorted(by_plan.items())},
         }
 
+    @_invalidates("group_class_memberships", "pt_memberships")
+    def check_revenue_rollup(self, repair: bool = True) -> int:
+        """
+        Verifies the daily revenue rollup against the purchase tables, rebuilding it when
+        repair is set. Returns the number of rollup rows that were out of step.
+        """
+        return self.db_manager.check_revenue_rollup(repair=repair)
+
     def generate_renewal_report(self) -> List[Dict[str, Any]]:
         """
         Generates data for the renewal report.
@@ -385,6 +707,17 @@ class AppAPI:
         )
         return data
 
+    # Diagnostics
+    def get_query_stats(self) -> List[Dict[str, Any]]:
+        """
+        Latency percentiles (p50/p95/p99, in ms), call and row counts and the latest SQL
+        of every DatabaseManager method called since start-up, slowest p95 first.
+        """
+        return self.db_manager.stats.snapshot()
+
+    def reset_query_stats(self) -> None:
+        self.db_manager.stats.reset()
+
 
 # Example of how to get a GroupPlan by ID (not directly part of AppAPI methods but useful for context)
 # def get_group_plan_details_example(db_manager: DatabaseManager, plan_id: int) -> Optional[models.GroupPlan]:
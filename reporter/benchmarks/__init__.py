@@ -0,0 +1,4 @@
+"""
+Performance benchmarks for the reporter package. They are scripts run by hand
+(`python -m reporter.benchmarks.<name>`), not part of the test suite.
+"""
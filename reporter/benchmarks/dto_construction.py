@@ -0,0 +1,92 @@
+"""
+Per-row cost and retained memory of building GroupClassMembershipView DTOs the old way
+(sqlite3.Row -> dict -> keyword constructor on a dict-backed dataclass) versus the
+positional row factory on the slotted dataclass.
+
+    python -m reporter.benchmarks.dto_construction --rows 100000
+"""
+
+import argparse
+import dataclasses
+import gc
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+from reporter.benchmarks.generator import GeneratorConfig, cached_database
+from reporter.database import get_connection
+from reporter.models import GroupClassMembershipView, from_paise
+
+VIEW_SQL = """
+SELECT
+    gcm.id, gcm.member_id, m.name AS member_name, gcm.plan_id, gp.name AS plan_name,
+    gcm.start_date, gcm.end_date, gcm.purchase_date, gcm.membership_type, gcm.is_active,
+    gcm.amount_paid
+FROM group_class_memberships gcm
+JOIN members m ON gcm.member_id = m.id
+JOIN group_plans gp ON gcm.plan_id = gp.id
+"""
+
+# The same fields without slots, as the DTO was declared before
+DictBackedView = dataclasses.make_dataclass(
+    "DictBackedView",
+    [(field.name, field.type, field) for field in dataclasses.fields(GroupClassMembershipView)],
+)
+
+
+def load_via_dict(conn: sqlite3.Connection) -> list:
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    views = []
+    for row in cursor.execute(VIEW_SQL):
+        data = dict(row)
+        data["is_active"] = bool(data["is_active"])
+        data["amount_paid"] = from_paise(data["amount_paid"])
+        views.append(DictBackedView(**data))
+    return views
+
+
+def load_positional(conn: sqlite3.Connection) -> list:
+    cursor = conn.cursor()
+    cursor.row_factory = GroupClassMembershipView.row_factory
+    return cursor.execute(VIEW_SQL).fetchall()
+
+
+def measure(label: str, load, conn: sqlite3.Connection, repeats: int) -> None:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        views = load(conn)
+        timings.append(time.perf_counter() - started)
+        del views
+    gc.collect()
+    tracemalloc.start()
+    try:
+        views = load(conn)
+        retained = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    best = min(timings)
+    print(
+        f"{label:<26} {len(views):>8} rows  best {best:6.3f}s  "
+        f"{best / len(views) * 1e6:5.2f} us/row  retained {retained / 2**20:7.1f} MiB "
+        f"({retained / len(views):5.0f} B/row)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="approximate purchases to generate")
+    parser.add_argument("--repeats", type=int, default=5, help="timed runs per path; the best is reported")
+    parser.add_argument("--db-dir", default=tempfile.gettempdir(), help="where the synthetic database is kept")
+    args = parser.parse_args()
+
+    conn = get_connection(cached_database(GeneratorConfig.for_rows(args.rows), args.db_dir))
+    measure("sqlite3.Row + dict(**)", load_via_dict, conn, args.repeats)
+    measure("positional row_factory", load_positional, conn, args.repeats)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
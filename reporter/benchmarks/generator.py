@@ -0,0 +1,234 @@
+"""
+Deterministic synthetic gym data for benchmarks: members with group class renewal chains
+and PT packs spread over several years. The same GeneratorConfig always produces the same
+data. Each member draws from its own seeded RNG, so histories are generated one member at a
+time and any scale streams in bounded memory.
+
+The data can be loaded straight into a database (load_into_database / cached_database) or
+written as source CSVs in the layout migrate_historical_data reads (write_source_csvs).
+"""
+
+import csv
+import os
+import random
+import tempfile
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Tuple
+
+from reporter.database import create_database
+from reporter.models import to_paise
+
+# (name, duration_days, price in rupees, how often new members pick it)
+PLAN_CATALOG: List[Tuple[str, int, float, int]] = [
+    ("MMA Focus", 30, 3_000.0, 30),
+    ("MMA Focus", 90, 8_639.0, 20),
+    ("MMA Mastery", 90, 12_969.0, 15),
+    ("MMA Mastery", 180, 24_000.0, 10),
+    ("MMA Mastery", 365, 45_000.0, 5),
+    ("Kickboxing", 30, 2_500.0, 15),
+    ("Kickboxing", 90, 7_000.0, 5),
+]
+
+# (sessions, price in rupees)
+PT_PACKS: List[Tuple[int, float]] = [(4, 8_000.0), (8, 15_000.0), (12, 21_000.0)]
+
+RENEWAL_RATE = 0.75  # Chance a member renews when a membership ends
+PLAN_SWITCH_RATE = 0.2  # Chance a renewal moves to a different plan
+LAPSE_RATE = 0.1  # Chance a renewal comes after a long break rather than a few days
+PT_CLIENT_RATE = 0.25  # Share of members who also buy PT packs
+
+# Average purchases per member over five years with the rates above; used to size a
+# dataset by row count. The generated count lands near, not exactly on, the target.
+PURCHASES_PER_MEMBER = 5.2
+
+FIRST_NAMES = ["Aarav", "Vivaan", "Aditya", "Diya", "Ananya", "Ishaan", "Kavya", "Rohan", "Saanvi", "Arjun", "Meera", "Kabir"]
+LAST_NAMES = ["Sharma", "Iyer", "Reddy", "Nair", "Gupta", "Rao", "Menon", "Kumar", "Das", "Pillai", "Shetty", "Joshi"]
+
+
+@dataclass(frozen=True)
+class GeneratorConfig:
+    members: int
+    years: int = 5
+    end_date: date = date(2025, 6, 30)
+    seed: int = 42
+
+    @classmethod
+    def for_rows(cls, rows: int, years: int = 5, seed: int = 42, end_date: date = date(2025, 6, 30)) -> "GeneratorConfig":
+        """A config producing roughly `rows` purchases (group class plus PT)."""
+        return cls(members=max(round(rows / PURCHASES_PER_MEMBER), 1), years=years, end_date=end_date, seed=seed)
+
+    @property
+    def start_date(self) -> date:
+        return self.end_date - timedelta(days=365 * self.years)
+
+
+@dataclass
+class MemberHistory:
+    member_id: int  # 1-based, matching the ids of a freshly loaded database
+    name: str
+    phone: str
+    email: str
+    join_date: str
+    # (plan_id, start_date, end_date, amount_paid, purchase_date, membership_type); plan ids are 1-based PLAN_CATALOG positions
+    memberships: List[Tuple[int, str, str, float, str, str]] = field(default_factory=list)
+    # (purchase_date, amount_paid, sessions)
+    pt_packs: List[Tuple[str, float, int]] = field(default_factory=list)
+
+
+def generate_members(config: GeneratorConfig) -> Iterator[MemberHistory]:
+    """Yields every member's history, in member_id order."""
+    plan_weights = [weight for *_, weight in PLAN_CATALOG]
+    span_days = (config.end_date - config.start_date).days
+    for index in range(config.members):
+        rng = random.Random(f"{config.seed}:{index}")
+        join = config.start_date + timedelta(days=rng.randrange(span_days))
+        history = MemberHistory(
+            member_id=index + 1,
+            name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {index}",
+            phone=f"9{index:09d}",
+            email=f"member{index}@example.com",
+            join_date=join.isoformat(),
+        )
+
+        plan_index = rng.choices(range(len(PLAN_CATALOG)), weights=plan_weights)[0]
+        start = join
+        membership_type = "New"
+        while start <= config.end_date:
+            _, duration_days, price, _ = PLAN_CATALOG[plan_index]
+            end = start + timedelta(days=duration_days - 1)
+            purchase = start - timedelta(days=rng.choice((0, 0, 0, 1, 2, 3)))
+            history.memberships.append(
+                (plan_index + 1, start.isoformat(), end.isoformat(), price, purchase.isoformat(), membership_type)
+            )
+            if rng.random() >= RENEWAL_RATE:
+                break
+            if rng.random() < PLAN_SWITCH_RATE:
+                plan_index = rng.choices(range(len(PLAN_CATALOG)), weights=plan_weights)[0]
+            gap_days = rng.randint(30, 120) if rng.random() < LAPSE_RATE else rng.randint(0, 5)
+            start = end + timedelta(days=1 + gap_days)
+            membership_type = "Renewal"
+
+        if rng.random() < PT_CLIENT_RATE:
+            purchase = join + timedelta(days=rng.randint(0, 30))
+            last_active = date.fromisoformat(history.memberships[-1][2])
+            while purchase <= min(last_active, config.end_date):
+                sessions, price = rng.choice(PT_PACKS)
+                history.pt_packs.append((purchase.isoformat(), price, sessions))
+                purchase += timedelta(days=rng.randint(20, 60))
+        yield history
+
+
+def load_into_database(conn, config: GeneratorConfig, chunk_members: int = 1_000) -> Dict[str, int]:
+    """Inserts the generated plans, members, memberships and PT packs into an empty database,
+    chunk_members members per executemany batch, in one transaction. Returns the row counts."""
+    counts = {"members": 0, "group_plans": len(PLAN_CATALOG), "group_class_memberships": 0, "pt_memberships": 0}
+
+    def flush(chunk: List[MemberHistory]) -> None:
+        conn.executemany(
+            "INSERT INTO members (id, name, phone, email, join_date, is_active) VALUES (?, ?, ?, ?, ?, 1)",
+            [(m.member_id, m.name, m.phone, m.email, m.join_date) for m in chunk],
+        )
+        conn.executemany(
+            """
+            INSERT INTO group_class_memberships (
+                member_id, plan_id, start_date, end_date, amount_paid, purchase_date, membership_type, is_active
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (m.member_id, plan_id, start, end, to_paise(amount), purchase, membership_type, int(end >= config.end_date.isoformat()))
+                for m in chunk
+                for plan_id, start, end, amount, purchase, membership_type in m.memberships
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO pt_memberships (member_id, purchase_date, amount_paid, sessions_total, sessions_remaining) VALUES (?, ?, ?, ?, ?)",
+            [
+                (m.member_id, purchase, to_paise(amount), sessions, sessions)
+                for m in chunk
+                for purchase, amount, sessions in m.pt_packs
+            ],
+        )
+        counts["members"] += len(chunk)
+        counts["group_class_memberships"] += sum(len(m.memberships) for m in chunk)
+        counts["pt_memberships"] += sum(len(m.pt_packs) for m in chunk)
+
+    with conn:
+        conn.executemany(
+            "INSERT INTO group_plans (id, name, duration_days, default_amount, display_name, is_active) VALUES (?, ?, ?, ?, ?, 1)",
+            [
+                (plan_id, name, duration_days, to_paise(price), f"{name} - {duration_days} days")
+                for plan_id, (name, duration_days, price, _) in enumerate(PLAN_CATALOG, start=1)
+            ],
+        )
+        chunk: List[MemberHistory] = []
+        for history in generate_members(config):
+            chunk.append(history)
+            if len(chunk) == chunk_members:
+                flush(chunk)
+                chunk = []
+        if chunk:
+            flush(chunk)
+    return counts
+
+
+def cached_database(config: GeneratorConfig, directory: str = tempfile.gettempdir()) -> str:
+    """Path of a database holding config's data, built on first use and reused afterwards.
+    Callers that write to it should work on a copy."""
+    path = os.path.join(
+        directory, f"kranos_benchmark_m{config.members}_y{config.years}_s{config.seed}_{config.end_date.isoformat()}.db"
+    )
+    if not os.path.exists(path):
+        building = f"{path}.building"
+        if os.path.exists(building):
+            os.remove(building)
+        conn = create_database(building)
+        try:
+            load_into_database(conn, config)
+        finally:
+            conn.close()
+        os.replace(building, path)
+    return path
+
+
+def _source_date(iso_date: str) -> str:
+    return date.fromisoformat(iso_date).strftime("%d/%m/%y")
+
+
+def write_source_csvs(directory: str, config: GeneratorConfig) -> Tuple[str, str]:
+    """Writes the generated history as GC and PT source CSVs (the layout of
+    GC_MEMBERS_CSV / PT_MEMBERS_CSV) into directory. Returns their paths."""
+    gc_path = os.path.join(directory, "benchmark_gc.csv")
+    pt_path = os.path.join(directory, "benchmark_pt.csv")
+    with open(gc_path, "w", newline="", encoding="utf-8") as gc_file, open(
+        pt_path, "w", newline="", encoding="utf-8"
+    ) as pt_file:
+        gc_writer = csv.writer(gc_file)
+        pt_writer = csv.writer(pt_file)
+        gc_writer.writerow(
+            ["Payment ID", "Membership Type", "Previous Payment  ID", "Client Name", "Phone", "Plan Status",
+             "Plan Type", "Plan Duration", "Payment Date", "Plan Start Date", "Plan End Date", "Amount",
+             "Amount Pending", "Payment Mode", "Freeze Status", "Freeze Days", "Renewal Status"]
+        )
+        pt_writer.writerow(
+            ["Member ID", "Client Name", "Phone", "Plan Status", "Session Count", "Payment Date", "Start Date", "Amount Paid"]
+        )
+        gc_count = pt_count = 0
+        for history in generate_members(config):
+            previous_payment = ""
+            for plan_id, start, end, amount, purchase, membership_type in history.memberships:
+                gc_count += 1
+                plan_name, duration_days, _, _ = PLAN_CATALOG[plan_id - 1]
+                gc_writer.writerow(
+                    [f"GC-{gc_count:02d}", "Fresh" if membership_type == "New" else "Renewal", previous_payment,
+                     history.name, history.phone, "EXPIRED", plan_name, duration_days, _source_date(purchase),
+                     _source_date(start), _source_date(end), f" ₹ {amount:,.2f} ", " ₹ -   ", "UPI", "", "", ""]
+                )
+                previous_payment = f"GC-{gc_count:02d}"
+            for purchase, amount, sessions in history.pt_packs:
+                pt_count += 1
+                pt_writer.writerow(
+                    [f"PT-{pt_count}", history.name, history.phone, "MMA PT", sessions,
+                     _source_date(purchase), _source_date(purchase), f"{amount:.0f}"]
+                )
+    return gc_path, pt_path
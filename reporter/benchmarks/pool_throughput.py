@@ -0,0 +1,92 @@
+"""
+Throughput of a mixed read/write workload run by several threads through one serialized
+connection versus the ConnectionPool (one writer, several query_only readers).
+
+    python -m reporter.benchmarks.pool_throughput --threads 8 --iterations 200
+
+Each side runs on its own fresh database file under a temporary directory.
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from reporter.database import READER_POOL_SIZE, ConnectionPool, create_database, get_connection
+from reporter.database_manager import DatabaseManager
+from reporter.models import Member, PTMembership
+
+
+def run_mixed_workload(db_manager: DatabaseManager, member_id: int, threads: int = 8, iterations: int = 40):
+    """Runs threads workers that each do iterations steps, one write in four and reads otherwise.
+    Returns (exceptions raised by the workers, elapsed seconds)."""
+    errors = []
+
+    def worker(worker_index):
+        try:
+            for i in range(iterations):
+                if i % 4 == 0:
+                    created = db_manager.add_pt_membership(
+                        PTMembership(
+                            id=None,
+                            member_id=member_id,
+                            purchase_date="2024-01-01",
+                            amount_paid=100.0,
+                            sessions_total=worker_index + 1,
+                            sessions_remaining=worker_index + 1,
+                        )
+                    )
+                    if created is None or created.id is None:
+                        raise AssertionError("add_pt_membership failed")
+                else:
+                    db_manager.get_all_pt_memberships_for_view()
+                    db_manager.get_financial_report_details("2024-01-01", "2024-12-31")
+        except Exception as exc:  # Collected so the caller can report it
+            errors.append(exc)
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return errors, time.perf_counter() - started
+
+
+def measure(label: str, db_manager: DatabaseManager, threads: int, iterations: int) -> None:
+    member = db_manager.add_member(
+        Member(id=None, name="Throughput", phone="999", email=None, join_date="2024-01-01", is_active=True)
+    )
+    errors, elapsed = run_mixed_workload(db_manager, member.id, threads, iterations)
+    operations = threads * iterations
+    print(f"{label:<24} {operations:>7} ops  {elapsed:7.3f}s  {operations / elapsed:9.0f} ops/s  errors {len(errors)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8, help="concurrent worker threads")
+    parser.add_argument("--iterations", type=int, default=200, help="steps per worker thread")
+    parser.add_argument("--readers", type=int, default=READER_POOL_SIZE, help="reader connections in the pool")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        serialized_path = os.path.join(work_dir, "serialized.db")
+        create_database(serialized_path).close()
+        conn = get_connection(serialized_path, check_same_thread=False)
+        try:
+            measure("serialized connection", DatabaseManager(connection=conn), args.threads, args.iterations)
+        finally:
+            conn.close()
+
+        pooled_path = os.path.join(work_dir, "pooled.db")
+        create_database(pooled_path).close()
+        pool = ConnectionPool(pooled_path, readers=args.readers)
+        try:
+            measure(f"pool ({args.readers} readers)", DatabaseManager(pool=pool), args.threads, args.iterations)
+        finally:
+            pool.close()
+
+
+if __name__ == "__main__":
+    main()
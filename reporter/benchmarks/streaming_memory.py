@@ -0,0 +1,61 @@
+"""
+Peak Python memory of reading every group class membership as a list (get_all_*) versus
+streaming it (iter_*), on a synthetic database from generator.py.
+
+    python -m reporter.benchmarks.streaming_memory --rows 1000000
+
+The database is built once under --db-dir and reused by later runs with the same --rows.
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+
+from reporter.benchmarks.generator import GeneratorConfig, cached_database
+from reporter.database import create_database
+from reporter.database_manager import FETCH_BATCH_SIZE, DatabaseManager
+
+
+def measure(label: str, consume) -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        count = consume()
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    print(f"{label:<48} {count:>9} rows  {elapsed:7.2f}s  peak {peak / 2**20:8.1f} MiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="approximate purchases to generate")
+    parser.add_argument("--batch-size", type=int, default=FETCH_BATCH_SIZE, help="rows per fetchmany() call")
+    parser.add_argument("--db-dir", default=tempfile.gettempdir(), help="where the synthetic database is kept")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    path = cached_database(GeneratorConfig.for_rows(args.rows), args.db_dir)
+    print(f"Dataset {path} ready in {time.perf_counter() - started:.1f}s")
+
+    db_manager = DatabaseManager(connection=create_database(path))
+    measure(
+        "get_all_group_class_memberships_for_view()",
+        lambda: len(db_manager.get_all_group_class_memberships_for_view()),
+    )
+    measure(
+        f"iter_group_class_memberships_for_view({args.batch_size})",
+        lambda: sum(1 for _ in db_manager.iter_group_class_memberships_for_view(batch_size=args.batch_size)),
+    )
+    measure("get_all_group_class_memberships()", lambda: len(db_manager.get_all_group_class_memberships()))
+    measure(
+        f"iter_group_class_memberships({args.batch_size})",
+        lambda: sum(1 for _ in db_manager.iter_group_class_memberships(batch_size=args.batch_size)),
+    )
+    db_manager.conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+"""
+Benchmark suite: times every public AppAPI method, the historical-data migration and the
+DatabaseManager report generators on synthetic data (see generator.py) at one or more
+scales, and writes the timings as JSON in the layout pytest-benchmark uses.
+
+    python -m reporter.benchmarks.suite --scale 1k --scale 100k --output bench.json
+    python -m reporter.benchmarks.suite --scale 100k --compare bench.json
+
+A scale is the approximate number of purchases (group class plus PT) in the dataset.
+With --compare, the run exits with status 1 if any benchmark's median is more than
+--tolerance slower than in the given earlier results.
+"""
+
+import argparse
+import datetime
+import inspect
+import io
+import json
+import logging
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from reporter import migrate_historical_data
+from reporter.app_api import AppAPI
+from reporter.benchmarks.generator import GeneratorConfig, cached_database, write_source_csvs
+from reporter.database import ConnectionPool, create_database
+from reporter.database_manager import DatabaseManager
+
+SCALES: Dict[str, int] = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+# Timed rounds per benchmark at each scale; other scales get DEFAULT_ROUNDS
+ROUNDS = {"1k": 20, "100k": 5, "1m": 3}
+DEFAULT_ROUNDS = 5
+MIGRATION_ROUNDS = {"1k": 5, "100k": 2, "1m": 1}
+
+# A benchmark: (function timed each round, setup run untimed before each round)
+Case = Tuple[Callable[[], Any], Optional[Callable[[], None]]]
+
+
+def time_rounds(func: Callable[[], Any], rounds: int, setup: Optional[Callable[[], None]] = None) -> Dict[str, float]:
+    """Runs setup (untimed) and func (timed) `rounds` times; returns pytest-benchmark-style stats in seconds."""
+    timings = []
+    for _ in range(rounds):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return {
+        "min": min(timings),
+        "max": max(timings),
+        "mean": statistics.fmean(timings),
+        "stddev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "median": statistics.median(timings),
+        "rounds": len(timings),
+        "data": timings,
+    }
+
+
+def public_app_api_methods() -> List[str]:
+    return sorted(
+        name for name, member in inspect.getmembers(AppAPI, inspect.isfunction) if not name.startswith("_")
+    )
+
+
+def app_api_cases(api: AppAPI, config: GeneratorConfig) -> Dict[str, Case]:
+    """One benchmark per public AppAPI method. Every setup clears the query cache, so reads
+    are timed against the database rather than served from memory. Writes act on rows the
+    setup creates, keeping the dataset the same size from round to round."""
+    end = config.end_date
+    last_month_end = end - datetime.timedelta(days=1)
+    last_month = (last_month_end.replace(day=1).isoformat(), last_month_end.isoformat())
+    first_day, last_day = config.start_date.isoformat(), end.isoformat()
+    counter = iter(range(10**9))
+    state: Dict[str, Any] = {}
+
+    def cold(extra: Optional[Callable[[], None]] = None) -> Callable[[], None]:
+        def setup() -> None:
+            api.cache.clear()
+            if extra is not None:
+                extra()
+
+        return setup
+
+    def new_member() -> None:
+        state["member"] = api.add_member(
+            name=f"Benchmark Member {next(counter)}", email=None, phone=f"8{next(counter):09d}", join_date=last_day
+        )
+
+    def new_plan() -> None:
+        state["plan"] = api.add_group_plan(name=f"Benchmark Plan {next(counter)}", duration_days=30, default_amount=1000.0)
+
+    def new_membership() -> None:
+        new_member()
+        state["membership"] = api.create_group_class_membership(
+            member_id=state["member"].id, plan_id=1, start_date=last_day, amount_paid=3000.0, purchase_date=last_day
+        )
+
+    def new_pt_membership() -> None:
+        new_member()
+        state["pt"] = api.create_pt_membership(
+            member_id=state["member"].id, purchase_date=last_day, amount_paid=8000.0, sessions_total=4
+        )
+
+    return {
+        "add_member": (
+            lambda: api.add_member(name="Benchmark Joiner", email=None, phone=f"7{next(counter):09d}", join_date=last_day),
+            cold(),
+        ),
+        "update_member": (lambda: api.update_member(state["member"].id, name="Renamed Member"), cold(new_member)),
+        "delete_member": (lambda: api.delete_member(state["member"].id), cold(new_member)),
+        "get_all_members_for_view": (api.get_all_members_for_view, cold()),
+        "get_members_page_for_view": (lambda: api.get_members_page_for_view(50), cold()),
+        "search_members": (lambda: api.search_members("Sharma 12"), cold()),
+        "search_members_by_prefix": (lambda: api.search_members_by_prefix("Ar", active_only=True), cold()),
+        "add_group_plan": (
+            lambda: api.add_group_plan(name=f"Benchmark Plan {next(counter)}", duration_days=30, default_amount=1000.0),
+            cold(),
+        ),
+        "update_group_plan": (
+            lambda: api.update_group_plan(state["plan"].id, default_amount=1100.0), cold(new_plan)
+        ),
+        "delete_group_plan": (lambda: api.delete_group_plan(state["plan"].id), cold(new_plan)),
+        "get_all_group_plans_for_view": (api.get_all_group_plans_for_view, cold()),
+        "get_group_plan_by_display_name": (lambda: api.get_group_plan_by_display_name("MMA Focus - 30 days"), cold()),
+        "create_group_class_membership": (
+            lambda: api.create_group_class_membership(
+                member_id=state["member"].id, plan_id=1, start_date=last_day, amount_paid=3000.0, purchase_date=last_day
+            ),
+            cold(new_member),
+        ),
+        "update_group_class_membership": (
+            lambda: api.update_group_class_membership(
+                state["membership"].id, member_id=state["member"].id, plan_id=2,
+                start_date=last_day, amount_paid=8639.0, purchase_date=last_day,
+            ),
+            cold(new_membership),
+        ),
+        "delete_group_class_membership_record": (
+            lambda: api.delete_group_class_membership_record(state["membership"].id), cold(new_membership)
+        ),
+        "get_all_group_class_memberships_for_view": (
+            lambda: api.get_all_group_class_memberships_for_view(name_filter=None, status_filter=None), cold()
+        ),
+        "get_group_class_memberships_page_for_view": (
+            lambda: api.get_group_class_memberships_page_for_view(50), cold()
+        ),
+        "create_pt_membership": (
+            lambda: api.create_pt_membership(
+                member_id=state["member"].id, purchase_date=last_day, amount_paid=8000.0, sessions_total=4
+            ),
+            cold(new_member),
+        ),
+        "update_pt_membership": (
+            lambda: api.update_pt_membership(
+                state["pt"].id, member_id=state["member"].id, purchase_date=last_day,
+                amount_paid=15000.0, sessions_total=8, sessions_remaining=8,
+            ),
+            cold(new_pt_membership),
+        ),
+        "delete_pt_membership": (lambda: api.delete_pt_membership(state["pt"].id), cold(new_pt_membership)),
+        "get_all_pt_memberships_for_view": (api.get_all_pt_memberships_for_view, cold()),
+        "get_pt_memberships_page_for_view": (lambda: api.get_pt_memberships_page_for_view(50), cold()),
+        "generate_financial_report": (lambda: api.generate_financial_report(*last_month), cold()),
+        "export_financial_report": (
+            lambda: api.export_financial_report(first_day, last_day, "csv", io.BytesIO()), cold()
+        ),
+        "export_table": (lambda: api.export_table("group_class_memberships", "csv", io.BytesIO()), cold()),
+        "get_revenue_totals": (lambda: api.get_revenue_totals(first_day, last_day, period="month"), cold()),
+        "generate_financial_report_series": (
+            lambda: api.generate_financial_report_series(first_day, last_day, granularity="week"), cold()
+        ),
+        "check_revenue_rollup": (lambda: api.check_revenue_rollup(repair=False), cold()),
+        "generate_renewal_report": (api.generate_renewal_report, cold()),
+        # Runs after every method above has been timed, so the snapshot covers them all
+        "get_query_stats": (api.get_query_stats, None),
+        "reset_query_stats": (api.reset_query_stats, None),
+    }
+
+
+def report_cases(db: DatabaseManager, config: GeneratorConfig) -> Dict[str, Case]:
+    """The DatabaseManager report generators over the whole dataset."""
+    first_day, last_day = config.start_date.isoformat(), config.end_date.isoformat()
+    today = datetime.date.today()
+    return {
+        "get_financial_report_details": (lambda: db.get_financial_report_details(first_day, last_day), None),
+        "iter_financial_report_details": (
+            lambda: sum(1 for _ in db.iter_financial_report_details(first_day, last_day)), None
+        ),
+        "get_financial_report_totals": (lambda: db.get_financial_report_totals(first_day, last_day), None),
+        "get_revenue_by_period": (lambda: db.get_revenue_by_period(first_day, last_day, "quarter"), None),
+        "get_revenue_series": (lambda: db.get_revenue_series(first_day, last_day, "day"), None),
+        # The same 30-day window AppAPI.generate_renewal_report asks for
+        "generate_renewal_report_data": (
+            lambda: db.generate_renewal_report_data(today.isoformat(), (today + datetime.timedelta(days=30)).isoformat()),
+            None,
+        ),
+    }
+
+
+def migration_case(config: GeneratorConfig, work_dir: str) -> Case:
+    """Times reading both source CSVs and bulk-loading them into a fresh database, as
+    migrate_historical_data() does."""
+    gc_csv, pt_csv = write_source_csvs(work_dir, config)
+    db_path = os.path.join(work_dir, "migration.db")
+    state: Dict[str, Any] = {}
+
+    def setup() -> None:
+        if state.get("conn") is not None:
+            state["conn"].close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+        state["conn"] = create_database(db_path)
+
+    def migrate() -> None:
+        db = DatabaseManager(connection=state["conn"])
+        gc_df = migrate_historical_data.read_source_csv(gc_csv)
+        pt_df = migrate_historical_data.read_source_csv(pt_csv)
+        earliest_start_dates = migrate_historical_data.collect_earliest_start_dates(gc_df, pt_df)
+        processed_members: dict = {}
+        migrate_historical_data.migrate_gc_data(db, processed_members, earliest_start_dates, gc_df)
+        migrate_historical_data.migrate_pt_data(db, processed_members, earliest_start_dates, pt_df)
+
+    return migrate, setup
+
+
+def run_scale(scale: str, rows: int, rounds: Optional[int], work_dir: str, seed: int) -> List[Dict[str, Any]]:
+    # History runs up to the start of the current month, so the renewal report (which looks
+    # 30 days ahead of today) has memberships to find; the dataset changes once a month.
+    config = GeneratorConfig.for_rows(rows, seed=seed, end_date=datetime.date.today().replace(day=1))
+    started = time.perf_counter()
+    source_db = cached_database(config, work_dir)
+    generate_seconds = time.perf_counter() - started
+
+    # Writes land in a copy, so the cached dataset stays pristine for the next run
+    db_path = os.path.join(work_dir, f"suite_{scale}.db")
+    shutil.copyfile(source_db, db_path)
+    pool = ConnectionPool(db_path)
+    api = AppAPI(db_manager=DatabaseManager(pool=pool))
+    counts = _table_counts(db_path)
+    params = {
+        "scale": scale, "rows": rows, "members": config.members, "years": config.years,
+        "end_date": config.end_date.isoformat(), "seed": seed, **counts,
+    }
+    print(f"[{scale}] {counts} (dataset ready in {generate_seconds:.1f}s)")
+
+    groups = [
+        ("app_api", app_api_cases(api, config), rounds or ROUNDS.get(scale, DEFAULT_ROUNDS)),
+        ("reports", report_cases(api.db_manager, config), rounds or ROUNDS.get(scale, DEFAULT_ROUNDS)),
+        ("migration", {"migrate_historical_data": migration_case(config, work_dir)}, rounds or MIGRATION_ROUNDS.get(scale, 1)),
+    ]
+    results = []
+    try:
+        for group, cases, group_rounds in groups:
+            for name, (func, setup) in cases.items():
+                stats = time_rounds(func, group_rounds, setup)
+                results.append(
+                    {
+                        "group": group,
+                        "name": f"{name}[{scale}]",
+                        "fullname": f"{group}::{name}[{scale}]",
+                        "params": params,
+                        "stats": stats,
+                    }
+                )
+                print(f"[{scale}] {group:<9} {name:<42} median {stats['median'] * 1e3:10.2f} ms")
+    finally:
+        pool.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+    return results
+
+
+def _table_counts(db_path: str) -> Dict[str, int]:
+    conn = sqlite3.connect(db_path)
+    try:
+        return {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("members", "group_plans", "group_class_memberships", "pt_memberships")
+        }
+    finally:
+        conn.close()
+
+
+def machine_info() -> Dict[str, Any]:
+    return {
+        "node": platform.node(),
+        "processor": platform.processor(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "release": platform.release(),
+        "python_implementation": platform.python_implementation(),
+        "python_version": platform.python_version(),
+        "sqlite_version": sqlite3.sqlite_version,
+    }
+
+
+def run_suite(scales: List[str], rounds: Optional[int] = None, work_dir: Optional[str] = None, seed: int = 42) -> Dict[str, Any]:
+    """Runs the suite at each scale (a SCALES key, or a plain row count) and returns the results document."""
+    work_dir = work_dir or tempfile.gettempdir()
+    benchmarks: List[Dict[str, Any]] = []
+    for scale in scales:
+        rows = SCALES[scale] if scale in SCALES else int(scale)
+        benchmarks.extend(run_scale(scale, rows, rounds, work_dir, seed))
+    return {
+        "machine_info": machine_info(),
+        "datetime": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "version": 1,
+        "benchmarks": benchmarks,
+    }
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float) -> List[str]:
+    """Describes each benchmark whose median grew by more than tolerance (0.25 = 25%) since baseline."""
+    previous = {bench["fullname"]: bench["stats"]["median"] for bench in baseline.get("benchmarks", [])}
+    regressions = []
+    for bench in current["benchmarks"]:
+        before = previous.get(bench["fullname"])
+        after = bench["stats"]["median"]
+        if before and after > before * (1 + tolerance):
+            regressions.append(
+                f"{bench['fullname']}: median {before * 1e3:.2f} ms -> {after * 1e3:.2f} ms (+{(after / before - 1):.0%})"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--scale", action="append", help=f"dataset size: {', '.join(SCALES)} or a row count (repeatable; default 1k)"
+    )
+    parser.add_argument("--rounds", type=int, help="timed rounds per benchmark (default depends on the scale)")
+    parser.add_argument("--seed", type=int, default=42, help="generator seed")
+    parser.add_argument("--work-dir", default=tempfile.gettempdir(), help="where datasets are cached")
+    parser.add_argument("--output", help="write the results JSON here")
+    parser.add_argument("--compare", help="earlier results JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed median slowdown for --compare")
+    args = parser.parse_args(argv)
+
+    # Per-call INFO logs from DatabaseManager would swamp the timings
+    logging.getLogger().setLevel(logging.WARNING)
+    results = run_suite(args.scale or ["1k"], rounds=args.rounds, work_dir=args.work_dir, seed=args.seed)
+
+    missing = sorted(set(public_app_api_methods()) - {
+        bench["name"].split("[")[0] for bench in results["benchmarks"] if bench["group"] == "app_api"
+    })
+    if missing:
+        print(f"AppAPI methods without a benchmark: {', '.join(missing)}", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=2)
+        print(f"Wrote {len(results['benchmarks'])} benchmarks to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            regressions = compare_results(json.load(baseline_file), results, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,59 +1,121 @@
+import logging
 import os
+import queue
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 
 DB_FILE = "reporter/data/kranos_data.db"
 
+# Connection tuning applied by get_connection(). WAL lets readers run alongside a
+# writer; busy_timeout makes a blocked writer wait instead of failing with
+# "database is locked".
+BUSY_TIMEOUT_MS = 5000
+CACHE_SIZE_KIB = 20000  # Passed as a negative cache_size, which SQLite reads as KiB
+MMAP_SIZE_BYTES = 256 * 1024 * 1024
+READER_POOL_SIZE = 4
 
-def create_database(db_name: str):
+
+def get_connection(
+    db_name: str = DB_FILE, check_same_thread: bool = True
+) -> sqlite3.Connection:
     """
-    Connects to an SQLite database and creates the necessary tables if they don't exist.
+    Opens an SQLite connection with the application's standard PRAGMAs applied:
+    WAL journaling, synchronous=NORMAL, busy_timeout, cache_size, mmap_size,
+    in-memory temp storage and foreign key enforcement.
     Args:
-        db_name (str): The name of the database file (e.g., 'kranos_data.db' or ':memory:').
+        db_name (str): The database file path (or ':memory:').
+        check_same_thread (bool): Passed through to sqlite3.connect; web handlers
+            that share a connection across threads pass False.
+    Returns:
+        sqlite3.Connection: The configured connection.
     """
-    try:
-        conn = sqlite3.connect(db_name)
-        cursor = conn.cursor()
+    conn = sqlite3.connect(
+        db_name,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        check_same_thread=check_same_thread,
+    )
+    conn.execute("PRAGMA journal_mode = WAL;")  # ':memory:' databases stay in 'memory' mode
+    conn.execute("PRAGMA synchronous = NORMAL;")
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS};")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KIB};")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE_BYTES};")
+    conn.execute("PRAGMA temp_store = MEMORY;")
+    conn.execute("PRAGMA foreign_keys = ON;")
+    return conn
 
-        # Create members table
-        cursor.execute(
-            """
-        CREATE TABLE IF NOT EXISTS members (
+
+class ConnectionPool:
+    """
+    A fixed set of connections to one database file: a single writer guarded by
+    a lock (SQLite allows one writer at a time anyway) and a queue of read-only
+    reader connections. Under WAL the readers never wait for the writer.
+    Not usable with ':memory:', where every connection is a separate database.
+    """
+
+    def __init__(self, db_name: str = DB_FILE, readers: int = READER_POOL_SIZE):
+        self.db_name = db_name
+        self._writer = get_connection(db_name, check_same_thread=False)
+        self._writer_lock = threading.RLock()
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._all_connections = [self._writer]
+        for _ in range(readers):
+            reader_conn = get_connection(db_name, check_same_thread=False)
+            reader_conn.execute("PRAGMA query_only = ON;")
+            self._readers.put(reader_conn)
+            self._all_connections.append(reader_conn)
+
+    @contextmanager
+    def writer(self):
+        """Checks out the writer connection, blocking while another thread holds it."""
+        with self._writer_lock:
+            yield self._writer
+
+    @contextmanager
+    def reader(self):
+        """Checks out a reader connection, blocking until one is free."""
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    def close(self):
+        for conn in self._all_connections:
+            conn.close()
+
+# Canonical table definitions. "{name}" lets a migration create a table under a temporary
+# name when it has to rebuild an existing one.
+TABLE_DEFINITIONS = {
+    "members": """
+        CREATE TABLE IF NOT EXISTS {name} (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT NOT NULL,
             phone TEXT NOT NULL UNIQUE,
             email TEXT,
-    join_date TEXT,
-    is_active BOOLEAN NOT NULL DEFAULT 1
+            join_date TEXT,
+            is_active BOOLEAN NOT NULL DEFAULT 1
         );
-        """
-        )
-
-        # Create pt_memberships table
-        cursor.execute(
-            """
-        CREATE TABLE IF NOT EXISTS pt_memberships (
+        """,
+    "group_plans": """
+        CREATE TABLE IF NOT EXISTS {name} (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            member_id INTEGER,
-            purchase_date TEXT,
-            amount_paid REAL,
-            sessions_total INTEGER,
-            sessions_remaining INTEGER,
-            FOREIGN KEY (member_id) REFERENCES members(id)
+            name TEXT NOT NULL,
+            duration_days INTEGER NOT NULL,
+            default_amount INTEGER NOT NULL,
+            display_name TEXT UNIQUE,
+            is_active BOOLEAN NOT NULL DEFAULT 1
         );
-        """
-        )
-
-        # Create group_class_memberships table
-        cursor.execute("DROP TABLE IF EXISTS group_class_memberships;") # Added this line
-        cursor.execute(
-            """
-        CREATE TABLE IF NOT EXISTS group_class_memberships (
+        """,
+    "group_class_memberships": """
+        CREATE TABLE IF NOT EXISTS {name} (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             member_id INTEGER,
             plan_id INTEGER,
             start_date TEXT,
             end_date TEXT,
-            amount_paid REAL,
+            amount_paid INTEGER,
             purchase_date TEXT,
             membership_type TEXT,
             is_active BOOLEAN NOT NULL DEFAULT 1,
@@ -61,100 +123,526 @@ def create_database(db_name: str):
             FOREIGN KEY (plan_id) REFERENCES group_plans(id) ON DELETE RESTRICT,
             UNIQUE (member_id, plan_id, start_date)
         );
+        """,
+    "pt_memberships": """
+        CREATE TABLE IF NOT EXISTS {name} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            member_id INTEGER,
+            purchase_date TEXT,
+            amount_paid INTEGER,
+            sessions_total INTEGER,
+            sessions_remaining INTEGER,
+            FOREIGN KEY (member_id) REFERENCES members(id)
+        );
+        """,
+}
+
+# Money column of each table. Databases created before the paise migration declared these
+# REAL and held rupees; _rebuild_table() converts them when it moves a table to INTEGER.
+MONEY_COLUMNS = {
+    "group_plans": "default_amount",
+    "group_class_memberships": "amount_paid",
+    "pt_memberships": "amount_paid",
+}
+
+# Secondary indexes backing the DatabaseManager read paths, grouped by the migration that adds them.
+BASE_INDEXES = [
+    ("idx_members_name", "members (name)"),
+    ("idx_group_plans_name", "group_plans (name)"),
+    ("idx_gcm_member_id", "group_class_memberships (member_id, start_date)"),
+    ("idx_gcm_plan_id", "group_class_memberships (plan_id)"),
+    ("idx_gcm_start_date", "group_class_memberships (start_date)"),
+    ("idx_gcm_purchase_date", "group_class_memberships (purchase_date)"),
+    ("idx_gcm_active_end_date", "group_class_memberships (is_active, end_date)"),
+    ("idx_pt_member_id", "pt_memberships (member_id)"),
+    ("idx_pt_purchase_date", "pt_memberships (purchase_date)"),
+]
+PURCHASE_DAY_INDEXES = [
+    ("idx_gcm_purchase_day", "group_class_memberships (purchase_day)"),
+    ("idx_pt_purchase_day", "pt_memberships (purchase_day)"),
+]
+# Composite purchase-day indexes let the financial report's UNION ALL merge two ordered
+# index range scans instead of sorting. They make PURCHASE_DAY_INDEXES redundant.
+REPORT_ORDER_INDEXES = [
+    ("idx_gcm_purchase_day_date", "group_class_memberships (purchase_day, purchase_date)"),
+    ("idx_pt_purchase_day_date", "pt_memberships (purchase_day, purchase_date)"),
+]
+# Case-insensitive name index for the member picker's prefix lookups; phone prefixes
+# range-scan the UNIQUE(phone) index.
+MEMBER_PREFIX_INDEXES = [
+    ("idx_members_name_nocase", "members (name COLLATE NOCASE)"),
+]
+# Every index of the current schema
+INDEXES = BASE_INDEXES + REPORT_ORDER_INDEXES + MEMBER_PREFIX_INDEXES
+
+# Tables whose purchase_date may hold either "YYYY-MM-DD" or "YYYY-MM-DD HH:MM:SS".
+# purchase_day mirrors it as a canonical "YYYY-MM-DD" so reports can range-scan it.
+PURCHASE_DAY_TABLES = ("group_class_memberships", "pt_memberships")
+
+
+def normalize_purchase_dates(conn: sqlite3.Connection):
+    """
+    Ensures every purchase table has a purchase_day column kept in sync with
+    purchase_date by triggers, and backfills rows that predate the column.
+    Does not commit; migrate_schema() runs it inside a migration's transaction.
+    Args:
+        conn (sqlite3.Connection): Connection to a database whose tables already exist.
+    """
+    cursor = conn.cursor()
+    for table in PURCHASE_DAY_TABLES:
+        if "purchase_day" not in _table_columns(conn, table):
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN purchase_day TEXT;")
+
+        cursor.execute(
+            f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_purchase_day_insert
+        AFTER INSERT ON {table}
+        BEGIN
+            UPDATE {table} SET purchase_day = date(NEW.purchase_date) WHERE rowid = NEW.rowid;
+        END;
         """
         )
-
-        # Create group_plans table
         cursor.execute(
-            """
-        CREATE TABLE IF NOT EXISTS group_plans (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            duration_days INTEGER NOT NULL,
-            default_amount REAL NOT NULL,
-            display_name TEXT UNIQUE,
-            is_active BOOLEAN NOT NULL DEFAULT 1
-        );
+            f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_purchase_day_update
+        AFTER UPDATE OF purchase_date ON {table}
+        BEGIN
+            UPDATE {table} SET purchase_day = date(NEW.purchase_date) WHERE rowid = NEW.rowid;
+        END;
         """
         )
-        conn.commit()
-    except sqlite3.Error as e:
-        if conn:  # If connection was established before error, close it
-            conn.close()
-        return None  # Return None if an error occurred
-    return conn
-
 
-if __name__ == "__main__":
-    initialize_database()
+        # One-time backfill; a no-op once every row carries its purchase_day.
+        cursor.execute(
+            f"UPDATE {table} SET purchase_day = date(purchase_date) "
+            "WHERE purchase_day IS NULL AND purchase_date IS NOT NULL;"
+        )
 
 
-def initialize_database():
-    conn = sqlite3.connect("kranos_data.db")
+def create_indexes(conn: sqlite3.Connection, indexes=INDEXES):
+    """
+    Creates the given secondary indexes (by default every index in INDEXES) if they don't exist.
+    Args:
+        conn (sqlite3.Connection): Connection to a database whose tables already exist.
+        indexes (list): (index_name, "table (columns)") pairs.
+    """
     cursor = conn.cursor()
+    for index_name, index_target in indexes:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {index_target};")
 
-    # Create Members table
-    cursor.execute(
-        """
-    CREATE TABLE IF NOT EXISTS members (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        phone TEXT,
-        email TEXT,
-        join_date TEXT,
-        is_active BOOLEAN DEFAULT TRUE
-    )
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> list:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table});")]
+
+
+def _unique_column_sets(conn: sqlite3.Connection, table: str) -> set:
+    """Returns the column tuples covered by each UNIQUE constraint or unique index on `table`."""
+    unique_sets = set()
+    for index_row in conn.execute(f"PRAGMA index_list({table});").fetchall():
+        if index_row[2]:  # "unique" flag
+            columns = conn.execute(f"PRAGMA index_info({index_row[1]});").fetchall()
+            unique_sets.add(tuple(column[2] for column in columns))
+    return unique_sets
+
+
+def _rebuild_table(conn: sqlite3.Connection, table: str, column_sources: dict = None):
+    """
+    Recreates `table` from TABLE_DEFINITIONS, copying every row across. Columns of the new
+    definition are filled from the same-named old column, or from column_sources[new_name].
+    Columns the canonical definition lacks (e.g. purchase_day) are carried over as well.
+    A money column not yet declared INTEGER holds rupees and is copied across as paise.
+    Follows SQLite's create-copy-drop-rename procedure, so it must run with foreign keys off.
     """
+    column_sources = column_sources or {}
+    old_column_types = {row[1]: row[2] for row in conn.execute(f"PRAGMA table_info({table});")}
+    old_columns = list(old_column_types)
+    new_table = f"{table}_rebuild"
+    conn.execute(f"DROP TABLE IF EXISTS {new_table};")
+    conn.execute(TABLE_DEFINITIONS[table].format(name=new_table))
+    new_columns = _table_columns(conn, new_table)
+    mapped_sources = set(column_sources.values())
+    for column in old_columns:
+        if column not in new_columns and column not in mapped_sources:
+            conn.execute(f"ALTER TABLE {new_table} ADD COLUMN {column} {old_column_types[column]};")
+            new_columns.append(column)
+
+    copies = [
+        (column, column_sources.get(column, column))
+        for column in new_columns
+        if column_sources.get(column, column) in old_columns
+    ]
+    money_column = MONEY_COLUMNS.get(table)
+    if money_column in old_columns and old_column_types[money_column].upper() != "INTEGER":
+        copies = [
+            (target, f"CAST(ROUND({source} * 100) AS INTEGER)" if target == money_column else source)
+            for target, source in copies
+        ]
+    conn.execute(
+        f"INSERT INTO {new_table} ({', '.join(target for target, _ in copies)}) "
+        f"SELECT {', '.join(source for _, source in copies)} FROM {table};"
     )
+    conn.execute(f"DROP TABLE {table};")
+    conn.execute(f"ALTER TABLE {new_table} RENAME TO {table};")
+
+
+def _migration_base_tables(conn: sqlite3.Connection):
+    for table, definition in TABLE_DEFINITIONS.items():
+        conn.execute(definition.format(name=table))
+    create_indexes(conn, BASE_INDEXES)
+
+
+def _migration_purchase_day(conn: sqlite3.Connection):
+    normalize_purchase_dates(conn)
+    create_indexes(conn, PURCHASE_DAY_INDEXES)
 
-    # Create Group Plans table
-    cursor.execute(
+
+def _migration_migration_sources(conn: sqlite3.Connection):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS migration_sources (
+            source_path TEXT PRIMARY KEY,
+            content_hash TEXT NOT NULL,
+            size_bytes INTEGER NOT NULL,
+            mtime REAL NOT NULL,
+            row_count INTEGER NOT NULL,
+            migrated_at TEXT NOT NULL
+        );
         """
-    CREATE TABLE IF NOT EXISTS group_plans (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL UNIQUE,
-        display_name TEXT,
-        default_amount REAL,
-        duration_days INTEGER,
-        is_active BOOLEAN DEFAULT TRUE
     )
+
+
+def _migration_unify_legacy_layout(conn: sqlite3.Connection):
     """
-    )
+    Databases created by the old initialize_database() used a different layout: pt_memberships
+    keyed by membership_id, plan names unique regardless of duration, no unique membership key
+    and optional member phones. Rebuilds each such table in the canonical layout, keeping all rows.
+    A copy that would violate a canonical constraint aborts the migration instead of dropping data.
+    """
+    rebuilt = False
+    if "membership_id" in _table_columns(conn, "pt_memberships"):
+        _rebuild_table(conn, "pt_memberships", {"id": "membership_id"})
+        rebuilt = True
+    if ("display_name",) not in _unique_column_sets(conn, "group_plans"):
+        _rebuild_table(conn, "group_plans")
+        rebuilt = True
+    if ("member_id", "plan_id", "start_date") not in _unique_column_sets(conn, "group_class_memberships"):
+        _rebuild_table(conn, "group_class_memberships")
+        rebuilt = True
+    if ("phone",) not in _unique_column_sets(conn, "members"):
+        _rebuild_table(conn, "members")
+        rebuilt = True
+    if rebuilt:
+        # Dropping the old tables also dropped their triggers and indexes
+        normalize_purchase_dates(conn)
+        create_indexes(conn, INDEXES)
+
+
+def _migration_money_to_paise(conn: sqlite3.Connection):
+    """Rebuilds every table whose money column is still declared REAL; see _rebuild_table()."""
+    rebuilt = False
+    for table, column in MONEY_COLUMNS.items():
+        column_types = {row[1]: row[2] for row in conn.execute(f"PRAGMA table_info({table});")}
+        if column_types[column].upper() != "INTEGER":
+            _rebuild_table(conn, table)
+            rebuilt = True
+    if rebuilt:
+        normalize_purchase_dates(conn)
+        create_indexes(conn, INDEXES)
+
+
+def _migration_report_order_indexes(conn: sqlite3.Connection):
+    create_indexes(conn, REPORT_ORDER_INDEXES)
+    for index_name, _ in PURCHASE_DAY_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {index_name};")
+
 
-    # Create Group Class Memberships table
-    cursor.execute(
+# Revenue rollup: one row per (day, type, plan_id) holding the number of purchases and their
+# summed amount_paid in paise. PT purchases have no plan and use plan_id 0. Purchases without
+# a purchase_date are left out, as they are from date-ranged reports.
+REVENUE_ROLLUP_SOURCES = {
+    # table: (type, plan_id expression)
+    "group_class_memberships": ("group", "COALESCE({row}.plan_id, 0)"),
+    "pt_memberships": ("pt", "0"),
+}
+
+# Fresh aggregation of the purchase tables in revenue_daily's shape
+REVENUE_DAILY_SELECT = """
+    SELECT date(purchase_date) AS day, 'group' AS type, COALESCE(plan_id, 0) AS plan_id,
+           COUNT(*) AS count, COALESCE(SUM(amount_paid), 0) AS amount
+    FROM group_class_memberships
+    WHERE date(purchase_date) IS NOT NULL
+    GROUP BY 1, 3
+    UNION ALL
+    SELECT date(purchase_date), 'pt', 0, COUNT(*), COALESCE(SUM(amount_paid), 0)
+    FROM pt_memberships
+    WHERE date(purchase_date) IS NOT NULL
+    GROUP BY 1
+"""
+
+
+def create_revenue_rollup(conn: sqlite3.Connection):
+    """
+    Creates revenue_daily and the INSERT, UPDATE and DELETE triggers that keep it in step
+    with the purchase tables. Rebuilding a purchase table drops its triggers, so call this
+    again after _rebuild_table(). Does not commit.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS revenue_daily (
+            day TEXT NOT NULL,
+            type TEXT NOT NULL,
+            plan_id INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            amount INTEGER NOT NULL,
+            PRIMARY KEY (day, type, plan_id)
+        ) WITHOUT ROWID;
         """
-    CREATE TABLE IF NOT EXISTS group_class_memberships (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        member_id INTEGER NOT NULL,
-        plan_id INTEGER NOT NULL,
-        start_date TEXT,
-        end_date TEXT,
-        purchase_date TEXT,
-        membership_type TEXT,  -- e.g., 'new', 'renewal'
-        amount_paid REAL,
-        is_active BOOLEAN DEFAULT TRUE, -- Added based on model
-        FOREIGN KEY (member_id) REFERENCES members (id),
-        FOREIGN KEY (plan_id) REFERENCES group_plans (id)
     )
+    for table, (line_type, plan_expression) in REVENUE_ROLLUP_SOURCES.items():
+        add_new = f"""
+            INSERT INTO revenue_daily (day, type, plan_id, count, amount)
+            SELECT date(NEW.purchase_date), '{line_type}', {plan_expression.format(row="NEW")},
+                   1, COALESCE(NEW.amount_paid, 0)
+            WHERE date(NEW.purchase_date) IS NOT NULL
+            ON CONFLICT (day, type, plan_id) DO UPDATE
+            SET count = count + 1, amount = amount + excluded.amount;
+        """
+        old_key = (
+            f"day = date(OLD.purchase_date) AND type = '{line_type}' "
+            f"AND plan_id = {plan_expression.format(row='OLD')}"
+        )
+        remove_old = f"""
+            UPDATE revenue_daily SET count = count - 1, amount = amount - COALESCE(OLD.amount_paid, 0)
+            WHERE {old_key};
+            DELETE FROM revenue_daily WHERE {old_key} AND count <= 0;
+        """
+        watched_columns = "purchase_date, amount_paid" + (", plan_id" if line_type == "group" else "")
+        conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_revenue_insert AFTER INSERT ON {table} "
+            f"BEGIN {add_new} END;"
+        )
+        conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_revenue_update AFTER UPDATE OF {watched_columns} ON {table} "
+            f"BEGIN {remove_old} {add_new} END;"
+        )
+        conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_revenue_delete AFTER DELETE ON {table} "
+            f"BEGIN {remove_old} END;"
+        )
+
+
+def rebuild_revenue_daily(conn: sqlite3.Connection):
+    """Recomputes revenue_daily from scratch out of the purchase tables. Does not commit."""
+    conn.execute("DELETE FROM revenue_daily;")
+    conn.execute(f"INSERT INTO revenue_daily (day, type, plan_id, count, amount) {REVENUE_DAILY_SELECT};")
+
+
+def _migration_revenue_daily(conn: sqlite3.Connection):
+    create_revenue_rollup(conn)
+    rebuild_revenue_daily(conn)
+
+
+# Trigram full-text index over the member columns front-desk lookups search. It is an
+# external-content table: it stores only the index and reads the text back from members.
+MEMBER_SEARCH_TABLE = "members_fts"
+MEMBER_SEARCH_COLUMNS = ("name", "phone", "email")
+
+
+def create_member_search(conn: sqlite3.Connection) -> bool:
     """
+    Creates the members_fts trigram index and the triggers that keep it in step with
+    members, then indexes the existing rows. Rebuilding members drops its triggers, so
+    call this again after _rebuild_table(). Does not commit.
+    Returns False, leaving the schema unchanged, when this SQLite lacks FTS5 or its trigram
+    tokenizer (SQLite < 3.34); member search then falls back to scanning members.
+    """
+    columns = ", ".join(MEMBER_SEARCH_COLUMNS)
+    new_values = ", ".join(f"NEW.{column}" for column in MEMBER_SEARCH_COLUMNS)
+    old_values = ", ".join(f"OLD.{column}" for column in MEMBER_SEARCH_COLUMNS)
+    try:
+        conn.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {MEMBER_SEARCH_TABLE} USING fts5("
+            f"{columns}, content='members', content_rowid='id', tokenize='trigram');"
+        )
+    except sqlite3.OperationalError as e:
+        logging.warning("Member search index not created (%s); member search will scan the members table.", e)
+        return False
+    add_new = f"INSERT INTO {MEMBER_SEARCH_TABLE} (rowid, {columns}) VALUES (NEW.id, {new_values});"
+    remove_old = (
+        f"INSERT INTO {MEMBER_SEARCH_TABLE} ({MEMBER_SEARCH_TABLE}, rowid, {columns}) "
+        f"VALUES ('delete', OLD.id, {old_values});"
     )
-
-    # Create PT Memberships table
-    # Assuming 'membership_id' in PTMembershipView is the primary key for this table
-    cursor.execute(
-        """
-    CREATE TABLE IF NOT EXISTS pt_memberships (
-        membership_id INTEGER PRIMARY KEY AUTOINCREMENT,
-        member_id INTEGER NOT NULL,
-        purchase_date TEXT,
-        sessions_total INTEGER,
-        sessions_remaining INTEGER,
-        amount_paid REAL,
-        FOREIGN KEY (member_id) REFERENCES members (id)
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS trg_members_search_insert AFTER INSERT ON members BEGIN {add_new} END;")
+    conn.execute(
+        f"CREATE TRIGGER IF NOT EXISTS trg_members_search_update AFTER UPDATE OF id, {columns} ON members "
+        f"BEGIN {remove_old} {add_new} END;"
     )
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS trg_members_search_delete AFTER DELETE ON members BEGIN {remove_old} END;")
+    conn.execute(f"INSERT INTO {MEMBER_SEARCH_TABLE} ({MEMBER_SEARCH_TABLE}) VALUES ('rebuild');")
+    return True
+
+
+def has_member_search(conn: sqlite3.Connection) -> bool:
+    """Whether the database has the members_fts index create_member_search() builds."""
+    return bool(_table_columns(conn, MEMBER_SEARCH_TABLE))
+
+
+def _migration_member_search(conn: sqlite3.Connection):
+    create_member_search(conn)
+
+
+def _migration_member_prefix_index(conn: sqlite3.Connection):
+    create_indexes(conn, MEMBER_PREFIX_INDEXES)
+
+
+# Ordered schema migrations; the 1-based position of a step is the PRAGMA user_version it
+# brings a database to. Steps are idempotent (safe on a database that already has their
+# effect) and must only ever be appended, never edited or reordered, once released.
+MIGRATIONS = [
+    ("Create base tables and indexes", _migration_base_tables),
+    ("Add trigger-maintained purchase_day columns", _migration_purchase_day),
+    ("Create migration_sources table", _migration_migration_sources),
+    ("Rebuild tables left in the legacy initialize_database() layout", _migration_unify_legacy_layout),
+    ("Store money as INTEGER paise instead of REAL rupees", _migration_money_to_paise),
+    ("Replace purchase_day indexes with (purchase_day, purchase_date)", _migration_report_order_indexes),
+    ("Add the trigger-maintained revenue_daily rollup", _migration_revenue_daily),
+    ("Add the members_fts trigram search index", _migration_member_search),
+    ("Add a case-insensitive members name index for prefix lookups", _migration_member_prefix_index),
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def migrate_schema(conn: sqlite3.Connection) -> list:
     """
-    )
+    Brings a database up to SCHEMA_VERSION by applying, in order, every step of MIGRATIONS
+    newer than its PRAGMA user_version. Each step runs in its own transaction together with
+    the user_version bump and a schema_migrations row recording how long it took; a failing
+    step is rolled back and its exception re-raised, leaving earlier steps applied.
+    Args:
+        conn (sqlite3.Connection): The connection to migrate.
+    Returns:
+        list: (version, description, seconds) for each step applied.
+    """
+    applied = []
+    if conn.execute("PRAGMA user_version;").fetchone()[0] >= SCHEMA_VERSION:
+        return applied
 
     conn.commit()
-    conn.close()
+    # Table rebuilds must not cascade deletes; PRAGMA foreign_keys is ignored inside a transaction
+    conn.execute("PRAGMA foreign_keys = OFF;")
+    try:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TEXT NOT NULL,
+                duration_ms REAL NOT NULL
+            );
+            """
+        )
+        conn.commit()
+        for version, (description, step) in enumerate(MIGRATIONS, start=1):
+            started = time.perf_counter()
+            conn.execute("BEGIN IMMEDIATE;")
+            try:
+                # Re-read under the write lock in case another process just applied this step
+                if conn.execute("PRAGMA user_version;").fetchone()[0] >= version:
+                    conn.rollback()
+                    continue
+                step(conn)
+                violations = conn.execute("PRAGMA foreign_key_check;").fetchall()
+                if violations:
+                    logging.warning(
+                        "Schema migration %d left %d foreign key violations, e.g. %s",
+                        version, len(violations), tuple(violations[0]),
+                    )
+                elapsed = time.perf_counter() - started
+                conn.execute(
+                    "INSERT OR REPLACE INTO schema_migrations (version, description, applied_at, duration_ms) "
+                    "VALUES (?, ?, datetime('now'), ?);",
+                    (version, description, elapsed * 1000),
+                )
+                conn.execute(f"PRAGMA user_version = {version};")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                logging.error("Schema migration %d (%s) failed and was rolled back.", version, description, exc_info=True)
+                raise
+            logging.info("Applied schema migration %d (%s) in %.1f ms.", version, description, elapsed * 1000)
+            applied.append((version, description, elapsed))
+    finally:
+        conn.execute("PRAGMA foreign_keys = ON;")
+    return applied
+
+
+def create_database(db_name: str):
+    """
+    Connects to an SQLite database and brings its schema up to date with migrate_schema().
+    Existing data is always kept.
+    Args:
+        db_name (str): The name of the database file (e.g., 'kranos_data.db' or ':memory:').
+    Returns:
+        sqlite3.Connection: The connection, or None if the database could not be opened or migrated.
+    """
+    conn = None
+    try:
+        conn = get_connection(db_name)
+        migrate_schema(conn)
+    except sqlite3.Error as e:
+        logging.error("Could not create or migrate database %s: %s", db_name, e)
+        if conn:  # If connection was established before error, close it
+            conn.close()
+        return None  # Return None if an error occurred
+    return conn
+
+
+def schema_is_current(db_name: str = DB_FILE) -> bool:
+    """
+    Checks whether a database file already has the current schema, i.e. whether
+    create_database() would have nothing to do.
+    Args:
+        db_name (str): The database file path.
+    Returns:
+        bool: True if the file exists and its PRAGMA user_version equals SCHEMA_VERSION.
+    """
+    if not os.path.exists(db_name):
+        return False
+    try:
+        conn = sqlite3.connect(db_name)
+    except sqlite3.Error:
+        return False
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    except sqlite3.Error:
+        return False
+    finally:
+        conn.close()
+
+
+def open_database(db_name: str = DB_FILE):
+    """
+    Returns a connection to db_name, running create_database() only if the schema
+    is missing or out of date.
+    Args:
+        db_name (str): The database file path.
+    """
+    if schema_is_current(db_name):
+        return get_connection(db_name)
+    return create_database(db_name)
+
+
+def initialize_database(db_name: str = DB_FILE):
+    """
+    Creates or upgrades db_name to the current schema. Kept for the old entry point,
+    which used to create a separate, differently shaped schema.
+    Args:
+        db_name (str): The database file path.
+    """
+    conn = create_database(db_name)
+    if conn:
+        conn.close()
+
+
+if __name__ == "__main__":
+    initialize_database()
@@ -1,7 +1,24 @@
+import bisect
+import functools
 import logging
+import math
+import os
+import re
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import date, datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .database import (
+    MEMBER_SEARCH_TABLE,
+    REVENUE_DAILY_SELECT,
+    ConnectionPool,
+    has_member_search,
+    rebuild_revenue_daily,
+)
 
 from .models import (  # Assuming Member dataclass exists
     GroupClassMembership,
@@ -10,24 +27,355 @@ from .models import (  # Assuming Member dataclass exists
     GroupPlanView,
     Member,
     MemberView,
+    Page,
     PTMembership,
     PTMembershipView,
-)
-
-# Basic logging configuration (can be overridden by application's config)
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    from_paise,
+    to_paise,
 )
 
 # This constant can remain as per original file analysis
 DB_FILE = "reporter/data/kranos_data.db"
 
+# Rows fetched per round trip by the streaming iter_* methods
+FETCH_BATCH_SIZE = 500
+
+# DatabaseManager calls slower than this many milliseconds go to the slow-query log.
+# KRANOS_SLOW_QUERY_MS overrides it for the app; DatabaseManager also takes it directly.
+SLOW_QUERY_MS = float(os.environ.get("KRANOS_SLOW_QUERY_MS", "250"))
+
+# Slow calls are logged here at WARNING with their latency, row count and SQL
+slow_query_log = logging.getLogger("reporter.slow_queries")
+
+# Upper bounds, in milliseconds, of the latency histogram buckets: from 0.01 ms, each about
+# 19% (2 ** 0.25) wider than the last, up to roughly 5 minutes. Slower calls share an
+# overflow bucket.
+LATENCY_BUCKETS_MS = tuple(0.01 * 2 ** (k / 4) for k in range(100))
+
+# String and numeric literals; the trace callback hands over SQL with the bound values
+# (phone numbers, names) filled in, and they are masked before the SQL is shown or logged.
+_SQL_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def _sql_shape(statement: str) -> str:
+    """The statement on one line with its literals replaced by '?'."""
+    return " ".join(_SQL_LITERAL.sub("?", statement).split())
+
+
+def _row_count(result: Any) -> Optional[int]:
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    if isinstance(result, Page):
+        return len(result.items)
+    return None
+
+
+@dataclass(slots=True)
+class _MethodStats:
+    calls: int = 0
+    rows: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+    statements: List[str] = field(default_factory=list)  # Executed by the latest call
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of calls, capped at the
+        slowest call seen; within one bucket width (~19%) of the exact value."""
+        rank = max(math.ceil(fraction * self.calls), 1)
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                if index == len(LATENCY_BUCKETS_MS):
+                    return self.max_ms
+                return min(LATENCY_BUCKETS_MS[index], self.max_ms)
+        return self.max_ms
+
+
+class QueryStats:
+    """
+    In-process latency histograms of DatabaseManager calls, one per method, with the
+    rows each method returned and the SQL its latest call ran. Calls slower than
+    slow_query_ms are also written to the slow-query log. Safe to share across threads.
+    """
+
+    def __init__(self, slow_query_ms: float = SLOW_QUERY_MS) -> None:
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._methods: Dict[str, _MethodStats] = {}
+
+    def record(
+        self, method: str, elapsed_ms: float, rows: Optional[int], statements: List[str]
+    ) -> None:
+        bucket = bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)
+        with self._lock:
+            stats = self._methods.get(method)
+            if stats is None:
+                stats = self._methods[method] = _MethodStats()
+            stats.calls += 1
+            stats.rows += rows or 0
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.buckets[bucket] += 1
+            stats.statements = statements
+        if elapsed_ms >= self.slow_query_ms:
+            slow_query_log.warning(
+                "%s took %.1f ms (%s rows): %s",
+                method,
+                elapsed_ms,
+                "-" if rows is None else rows,
+                "; ".join(dict.fromkeys(map(_sql_shape, statements))),
+            )
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """One entry per method, slowest p95 first, with latencies in milliseconds."""
+        with self._lock:
+            entries = [
+                {
+                    "method": method,
+                    "calls": stats.calls,
+                    "rows": stats.rows,
+                    "mean_ms": stats.total_ms / stats.calls,
+                    "p50_ms": stats.percentile(0.50),
+                    "p95_ms": stats.percentile(0.95),
+                    "p99_ms": stats.percentile(0.99),
+                    "max_ms": stats.max_ms,
+                    "sql": "; ".join(dict.fromkeys(map(_sql_shape, stats.statements))),
+                }
+                for method, stats in self._methods.items()
+            ]
+        return sorted(entries, key=lambda entry: entry["p95_ms"], reverse=True)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._methods.clear()
+
+
+def _uses_connection(write: bool):
+    """Runs the decorated DatabaseManager method with a connection checked out
+    for the calling thread (the pool's writer or one of its readers), and records
+    its latency, rows returned and SQL in the manager's QueryStats."""
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self._checkout(write):
+                statements = self._local.statements
+                first = len(statements)
+                result = None
+                started = time.perf_counter()
+                try:
+                    result = method(self, *args, **kwargs)
+                    return result
+                finally:
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    self.stats.record(
+                        method.__name__, elapsed_ms, _row_count(result), statements[first:]
+                    )
+
+        return wrapper
+
+    return decorator
+
+
+_reads = _uses_connection(write=False)
+_writes = _uses_connection(write=True)
+
+
+def _streams(method):
+    """Like _reads, for generator methods: the reader connection stays checked out
+    until the generator is exhausted or closed, not just until it is created. The
+    recorded latency is the time spent producing rows, not the time the caller
+    spends between them.
+    Callers must exhaust or close() the generator (or use contextlib.closing), not
+    leave it suspended. Until then it pins a pooled reader connection to the calling
+    thread, or, with a single connection, holds the manager lock and blocks every
+    other thread; only garbage collection would release it otherwise."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._checkout(False):
+            statements = self._local.statements
+            first = len(statements)
+            rows = 0
+            elapsed = 0.0
+            iterator = method(self, *args, **kwargs)
+            try:
+                while True:
+                    started = time.perf_counter()
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                    finally:
+                        elapsed += time.perf_counter() - started
+                    rows += 1
+                    yield item
+            finally:
+                iterator.close()
+                self.stats.record(method.__name__, elapsed * 1000, rows, statements[first:])
+
+    return wrapper
+
+
+def _fetch_batches(cursor: sqlite3.Cursor, batch_size: int) -> Iterator[Any]:
+    """Yields the rows of an executed cursor, fetching batch_size rows per round trip."""
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield from rows
+
+
+# Shortest search term the trigram index can look up; shorter terms are matched with LIKE
+TRIGRAM_LENGTH = 3
+
+
+def _like_escape(text: str) -> str:
+    """text with LIKE wildcards escaped, for patterns declared with ESCAPE '\\'."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# Appended to a prefix to bound a range scan over the strings that start with it; U+10FFFF
+# sorts after every other character in both BINARY and NOCASE order.
+PREFIX_RANGE_END = "\U0010ffff"
+
+
+def _member_prefix_condition(prefix: str) -> Tuple[str, list, str]:
+    """(condition, params, order by) for the members m whose phone starts with prefix, when
+    it starts with a digit or '+', or else whose name does, ignoring case. Either way the
+    condition is a range scan of an index (UNIQUE(phone) or idx_members_name_nocase) that
+    also yields the rows in order, so a LIMIT stops it after that many rows."""
+    if prefix[:1].isdigit() or prefix.startswith("+"):
+        column, order_by = "m.phone", "m.phone"
+    else:
+        column, order_by = "m.name COLLATE NOCASE", "m.name COLLATE NOCASE, m.id"
+    return f"{column} >= ? AND {column} < ?", [prefix, prefix + PREFIX_RANGE_END], order_by
+
+
+def _to_page(items: list, limit: int, cursor_of) -> Page:
+    """Builds a Page from up to limit + 1 fetched items; the extra item only
+    signals that another page exists."""
+    if len(items) > limit:
+        items = items[:limit]
+        return Page(items=items, next_cursor=cursor_of(items[-1]))
+    return Page(items=items, next_cursor=None)
+
+
+# SQL expressions turning a revenue_daily day ("YYYY-MM-DD") into its calendar period key
+REVENUE_PERIOD_KEYS = {
+    "month": "substr(day, 1, 7)",
+    "quarter": "substr(day, 1, 4) || '-Q' || ((CAST(substr(day, 6, 2) AS INTEGER) + 2) / 3)",
+    "year": "substr(day, 1, 4)",
+}
+
+
+# SQL expressions turning a revenue_daily day into the first day of its series bucket;
+# weeks start on Monday.
+REVENUE_BUCKET_STARTS = {
+    "day": "day",
+    "week": "date(day, 'weekday 0', '-6 days')",
+    "month": "date(day, 'start of month')",
+}
+
+
+def _empty_report_totals() -> Dict[str, Any]:
+    return {
+        "total": 0,
+        "by_type": {
+            "group": {"count": 0, "amount": 0},
+            "pt": {"count": 0, "amount": 0},
+        },
+        "by_plan": [],
+    }
+
 
 class DatabaseManager:
-    def __init__(self, connection: sqlite3.Connection):
-        self.conn = connection
-        self.conn.row_factory = sqlite3.Row
+    def __init__(
+        self,
+        connection: Optional[sqlite3.Connection] = None,
+        pool: Optional[ConnectionPool] = None,
+        slow_query_ms: float = SLOW_QUERY_MS,
+    ):
+        """Wraps either a single connection (calls are serialized by a lock) or a
+        ConnectionPool (reads run in parallel on reader connections, writes go
+        through the pool's single writer). Every call is timed into self.stats;
+        calls slower than slow_query_ms are written to the slow-query log."""
+        if (connection is None) == (pool is None):
+            raise ValueError("Provide exactly one of connection or pool.")
+        self._connection = connection
+        self.pool = pool
+        self.stats = QueryStats(slow_query_ms)
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._traced: set = set()
+        self._member_search: Optional[bool] = None  # Whether members_fts exists; checked on first use
+        if connection is not None:
+            connection.row_factory = sqlite3.Row
+            self._trace(connection)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """The connection checked out by the current thread, or the single
+        connection when not running inside a DatabaseManager method."""
+        checked_out = getattr(self._local, "conn", None)
+        if checked_out is not None:
+            return checked_out
+        if self._connection is None:
+            raise RuntimeError(
+                "No pooled connection is checked out on this thread; "
+                "access the database through DatabaseManager methods."
+            )
+        return self._connection
+
+    @contextmanager
+    def _checkout(self, write: bool):
+        current = getattr(self._local, "conn", None)
+        if current is not None and (self._local.is_writer or not write):
+            # Nested call on this thread: reuse what the outer call holds.
+            yield current
+            return
+
+        if self.pool is None:
+            source = self._single_connection()
+        elif write:
+            source = self.pool.writer()
+        else:
+            source = self.pool.reader()
+
+        with source as conn:
+            conn.row_factory = sqlite3.Row
+            if conn not in self._traced:
+                self._trace(conn)
+            local = self._local
+            previous = (current, getattr(local, "is_writer", False), getattr(local, "statements", None))
+            # Collects every statement run while checked out, for QueryStats
+            local.conn, local.is_writer, local.statements = conn, write or self.pool is None, []
+            try:
+                yield conn
+            finally:
+                local.conn, local.is_writer, local.statements = previous
+
+    def _trace(self, conn: sqlite3.Connection) -> None:
+        """Installs, once per connection, a trace callback that hands each statement to
+        the list of the thread that has the connection checked out. A callback set on
+        the connection later replaces it; QueryStats then records no SQL for it."""
+
+        def collect(statement: str) -> None:
+            statements = getattr(self._local, "statements", None)
+            if statements is not None:
+                statements.append(statement)
+
+        conn.set_trace_callback(collect)
+        self._traced.add(conn)
+
+    @contextmanager
+    def _single_connection(self):
+        with self._lock:
+            yield self._connection
 
+    @_writes
     def add_member(self, member: Member) -> Optional[Member]:
         """Adds a new member to the database.
         Sets join_date to current date and is_active to True by default if not provided.
@@ -40,7 +388,7 @@ class DatabaseManager:
             cursor.execute("SELECT id FROM members WHERE phone = ?", (member.phone,))
             if cursor.fetchone():
                 logging.warning(
-                    f"Attempt to add member with existing phone number: {member.phone}"
+                    "Attempt to add member with existing phone number: %s", member.phone
                 )
                 raise ValueError(f"Phone number {member.phone} already exists.")
 
@@ -62,17 +410,18 @@ class DatabaseManager:
             )
             self.conn.commit()
             member.id = cursor.lastrowid
-            logging.info(f"Member '{member.name}' added with ID {member.id}.")
+            logging.debug("Member '%s' added with ID %s.", member.name, member.id)
             return member
         except sqlite3.Error as e:
             self.conn.rollback()
             logging.error(
-                f"Database error in add_member for '{member.name}': {e}", exc_info=True
+                "Database error in add_member for '%s': %s", member.name, e, exc_info=True
             )
             return None
         except ValueError:  # Re-raise ValueError for phone uniqueness
             raise
 
+    @_writes
     def update_member(self, member: Member) -> bool:
         """Updates an existing member's details.
         If phone is provided, checks for uniqueness unless it's the member's current phone.
@@ -87,7 +436,7 @@ class DatabaseManager:
         current_member_data = cursor.fetchone()
 
         if not current_member_data:
-            logging.warning(f"Member with ID {member.id} not found for update.")
+            logging.warning("Member with ID %s not found for update.", member.id)
             return False
         current_phone = current_member_data["phone"]
 
@@ -110,7 +459,7 @@ class DatabaseManager:
                 )
                 if cursor.fetchone():
                     logging.warning(
-                        f"Attempt to update member {member.id} with existing phone number: {member.phone}"
+                        "Attempt to update member %s with existing phone number: %s", member.id, member.phone
                     )
                     raise ValueError(
                         f"Phone number {member.phone} already exists for another member."
@@ -124,7 +473,7 @@ class DatabaseManager:
                 params.append(member.phone)
 
             if not fields_to_update:
-                logging.info(f"No fields provided to update for member ID {member.id}.")
+                logging.debug("No fields provided to update for member ID %s.", member.id)
                 return True
 
             sql_update = (
@@ -138,56 +487,186 @@ class DatabaseManager:
             if cursor.rowcount == 0:
                 # This means either member not found or data was the same.
                 # We've already checked if member exists.
-                logging.info(
-                    f"Member ID {member.id} data was the same, no update performed."
+                logging.debug(
+                    "Member ID %s data was the same, no update performed.", member.id
                 )
                 return True  # Data was the same
 
-            logging.info(f"Member ID {member.id} updated successfully.")
+            logging.debug("Member ID %s updated successfully.", member.id)
             return True
         except sqlite3.Error as e:
             self.conn.rollback()
             logging.error(
-                f"Database error in update_member for ID {member.id}: {e}",
+                "Database error in update_member for ID %s: %s", member.id, e,
                 exc_info=True,
             )
             return False
         except ValueError:  # Re-raise ValueError for phone uniqueness
             raise
 
-    def get_all_members(self) -> List[Member]:
-        """Retrieves all members from the database."""
+    @_streams
+    def iter_members(self, batch_size: int = FETCH_BATCH_SIZE) -> Iterator[Member]:
+        """Yields all members ordered by name, fetched in batches of batch_size.
+        Exhaust or close() the iterator; see _streams."""
         try:
             cursor = self.conn.cursor()
             cursor.execute(
                 "SELECT id, name, phone, email, join_date, is_active FROM members ORDER BY name ASC"
             )
-            rows = cursor.fetchall()
-            return [Member(**row) for row in rows]
+            cursor.row_factory = Member.row_factory
+            yield from _fetch_batches(cursor, batch_size)
         except sqlite3.Error as e:
-            logging.error(f"Database error in get_all_members: {e}", exc_info=True)
+            logging.error("Database error in iter_members: %s", e, exc_info=True)
+            raise
+
+    @_reads
+    def get_all_members(self) -> List[Member]:
+        """Retrieves all members from the database."""
+        try:
+            return list(self.iter_members())
+        except sqlite3.Error:
             return []
 
-    def get_all_members_for_view(self) -> List[MemberView]:
-        """Retrieves all members formatted for view purposes."""
+    @_streams
+    def iter_members_for_view(self, batch_size: int = FETCH_BATCH_SIZE) -> Iterator[MemberView]:
+        """Yields all members formatted for view purposes, fetched in batches of batch_size.
+        Exhaust or close() the iterator; see _streams."""
         try:
             cursor = self.conn.cursor()
             cursor.execute(
                 "SELECT id, name, phone, email, join_date, is_active FROM members ORDER BY name ASC"
             )
-            rows = cursor.fetchall()
-            member_views = []
-            for row in rows:
-                member_data = dict(row)
-                # Convert is_active from integer (0 or 1) to boolean
-                member_data["is_active"] = bool(member_data["is_active"])
-                member_views.append(MemberView(**member_data))
-            logging.info(f"Successfully retrieved {len(member_views)} members for view.")
-            return member_views
+            # MemberView converts is_active from integer (0 or 1) to boolean
+            cursor.row_factory = MemberView.row_factory
+            yield from _fetch_batches(cursor, batch_size)
         except sqlite3.Error as e:
-            logging.error(f"Database error in get_all_members_for_view: {e}", exc_info=True)
+            logging.error("Database error in iter_members_for_view: %s", e, exc_info=True)
+            raise
+
+    @_reads
+    def get_all_members_for_view(self) -> List[MemberView]:
+        """Retrieves all members formatted for view purposes."""
+        try:
+            member_views = list(self.iter_members_for_view())
+        except sqlite3.Error:
+            return []
+        logging.debug("Successfully retrieved %s members for view.", len(member_views))
+        return member_views
+
+    @_reads
+    def get_members_page_for_view(
+        self, limit: int, after: Optional[Tuple[str, int]] = None
+    ) -> Page:
+        """Retrieves one page of members for view purposes, ordered by (name, id).
+        `after` is the next_cursor of the previous page."""
+        try:
+            cursor = self.conn.cursor()
+            sql_select = "SELECT id, name, phone, email, join_date, is_active FROM members"
+            params: list = []
+            if after is not None:
+                sql_select += " WHERE (name, id) > (?, ?)"
+                params.extend(after)
+            sql_select += " ORDER BY name ASC, id ASC LIMIT ?"
+            params.append(limit + 1)
+            cursor.execute(sql_select, params)
+            cursor.row_factory = MemberView.row_factory
+            member_views = cursor.fetchall()
+            return _to_page(member_views, limit, lambda m: (m.name, m.id))
+        except sqlite3.Error as e:
+            logging.error("Database error in get_members_page_for_view: %s", e, exc_info=True)
+            return Page(items=[])
+
+    def _has_member_search(self) -> bool:
+        if self._member_search is None:
+            self._member_search = has_member_search(self.conn)
+        return self._member_search
+
+    def _member_name_condition(self) -> str:
+        """SQL condition matching m.name against a LIKE pattern parameter; it goes through
+        the members_fts trigram index when the database has one."""
+        if self._has_member_search():
+            return f"m.id IN (SELECT rowid FROM {MEMBER_SEARCH_TABLE} WHERE name LIKE ?)"
+        return "m.name LIKE ?"
+
+    @_reads
+    def search_members(self, query: str, limit: int = 20) -> List[MemberView]:
+        """Members whose name, phone or email contains every whitespace-separated term of
+        query (ignoring case), best match first, at most limit of them.
+        Terms of three or more characters are looked up in the members_fts trigram index
+        and ranked by bm25, weighting name matches above phone and email; shorter terms
+        only filter those matches. A query made only of shorter terms instead matches
+        phones or names that start with it, as search_members_by_prefix() does."""
+        terms = query.split()
+        if not terms or limit <= 0:
+            return []
+        long_terms = [term for term in terms if len(term) >= TRIGRAM_LENGTH]
+        contains = "(m.name LIKE ? ESCAPE '\\' OR m.phone LIKE ? ESCAPE '\\' OR m.email LIKE ? ESCAPE '\\')"
+        sql_select = "SELECT m.id, m.name, m.phone, m.email, m.join_date, m.is_active"
+        conditions = []
+        params: list = []
+        if not long_terms:
+            sql_select += " FROM members m"
+            condition, prefix_params, order_by = _member_prefix_condition(" ".join(terms))
+            conditions.append(condition)
+            params.extend(prefix_params)
+        elif self._has_member_search():
+            sql_select += f" FROM {MEMBER_SEARCH_TABLE} JOIN members m ON m.id = {MEMBER_SEARCH_TABLE}.rowid"
+            conditions.append(f"{MEMBER_SEARCH_TABLE} MATCH ?")
+            # Each term as a quoted phrase, so FTS5 query syntax in the input is taken literally
+            params.append(" ".join('"' + term.replace('"', '""') + '"' for term in long_terms))
+            for term in terms:
+                if len(term) < TRIGRAM_LENGTH:
+                    conditions.append(contains)
+                    params.extend([f"%{_like_escape(term)}%"] * 3)
+            order_by = f"bm25({MEMBER_SEARCH_TABLE}, 10.0, 5.0, 1.0), m.name"
+        else:
+            sql_select += " FROM members m"
+            for term in terms:
+                conditions.append(contains)
+                params.extend([f"%{_like_escape(term)}%"] * 3)
+            order_by = "m.name"
+        sql_select += f" WHERE {' AND '.join(conditions)} ORDER BY {order_by} LIMIT ?"
+        params.append(limit)
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(sql_select, params)
+            cursor.row_factory = MemberView.row_factory
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.error("Database error in search_members for %r: %s", query, e, exc_info=True)
+            return []
+
+    @_reads
+    def search_members_by_prefix(
+        self, prefix: str, limit: int = 10, active_only: bool = False
+    ) -> List[MemberView]:
+        """The first limit members, in phone order, whose phone starts with prefix when it
+        starts with a digit or '+'; otherwise the first limit members, alphabetically, whose
+        name starts with prefix (ignoring case). Either is an index range scan that stops
+        after limit rows, so typeahead lookups stay fast however many members there are.
+        active_only leaves out inactive members."""
+        prefix = " ".join(prefix.split())
+        if not prefix or limit <= 0:
+            return []
+        condition, params, order_by = _member_prefix_condition(prefix)
+        sql_select = (
+            "SELECT m.id, m.name, m.phone, m.email, m.join_date, m.is_active FROM members m"
+            f" WHERE {condition}"
+        )
+        if active_only:
+            sql_select += " AND m.is_active = 1"
+        sql_select += f" ORDER BY {order_by} LIMIT ?"
+        params.append(limit)
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(sql_select, params)
+            cursor.row_factory = MemberView.row_factory
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.error("Database error in search_members_by_prefix for %r: %s", prefix, e, exc_info=True)
             return []
 
+    @_writes
     def delete_member(self, member_id: int) -> bool:
         """Deletes a member from the database by their ID.
         Returns True if deletion was successful, False otherwise.
@@ -200,18 +679,19 @@ class DatabaseManager:
             cursor.execute("DELETE FROM members WHERE id = ?", (member_id,))
             self.conn.commit()
             if cursor.rowcount == 0:
-                logging.warning(f"No member found with ID {member_id} to delete.")
+                logging.warning("No member found with ID %s to delete.", member_id)
                 return False
-            logging.info(f"Member ID {member_id} deleted successfully.")
+            logging.debug("Member ID %s deleted successfully.", member_id)
             return True
         except sqlite3.Error as e:
             self.conn.rollback()
             logging.error(
-                f"Database error in delete_member for ID {member_id}: {e}",
+                "Database error in delete_member for ID %s: %s", member_id, e,
                 exc_info=True,
             )
             return False
 
+    @_writes
     def add_group_plan(self, group_plan: GroupPlan) -> Optional[GroupPlan]:
         """Adds a new group_plan to the database.
         Generates display_name from name and duration_days if not provided.
@@ -234,7 +714,7 @@ class DatabaseManager:
             )
             if cursor.fetchone():
                 logging.warning(
-                    f"Attempt to add group_plan with existing display_name: {display_name}"
+                    "Attempt to add group_plan with existing display_name: %s", display_name
                 )
                 raise ValueError(f"Display name '{display_name}' already exists.")
 
@@ -243,7 +723,7 @@ class DatabaseManager:
                 (
                     group_plan.name,
                     group_plan.duration_days,
-                    group_plan.default_amount,
+                    to_paise(group_plan.default_amount),
                     display_name,
                     is_active_int,
                 ),
@@ -253,20 +733,21 @@ class DatabaseManager:
             group_plan.display_name = (
                 display_name  # Ensure display_name is set on the object
             )
-            logging.info(
-                f"Group Plan '{group_plan.name}' added with ID {group_plan.id}, display_name '{display_name}'."
+            logging.debug(
+                "Group Plan '%s' added with ID %s, display_name '%s'.", group_plan.name, group_plan.id, display_name
             )
             return group_plan
         except sqlite3.Error as e:
             self.conn.rollback()
             logging.error(
-                f"Database error in add_group_plan for '{group_plan.name}': {e}",
+                "Database error in add_group_plan for '%s': %s", group_plan.name, e,
                 exc_info=True,
             )
             return None
         except ValueError:  # Re-raise ValueError for display_name uniqueness
             raise
 
+    @_writes
     def update_group_plan(self, group_plan: GroupPlan) -> bool:
         """Updates an existing group_plan's details.
         If name or duration_days are changed, display_name is regenerated and its uniqueness checked.
@@ -285,7 +766,7 @@ class DatabaseManager:
             current_plan_row = cursor.fetchone()
             if not current_plan_row:
                 logging.warning(
-                    f"Group Plan with ID {group_plan.id} not found for update."
+                    "Group Plan with ID %s not found for update.", group_plan.id
                 )
                 return False
             current_name, current_duration_days, current_display_name = (
@@ -337,7 +818,7 @@ class DatabaseManager:
                     )
                     if cursor.fetchone():
                         logging.warning(
-                            f"Attempt to update group_plan {group_plan.id} with existing display_name: {new_display_name}"
+                            "Attempt to update group_plan %s with existing display_name: %s", group_plan.id, new_display_name
                         )
                         raise ValueError(
                             f"Display name '{new_display_name}' already exists for another group_plan."
@@ -358,7 +839,7 @@ class DatabaseManager:
                 )
                 if cursor.fetchone():
                     logging.warning(
-                        f"Attempt to update group_plan {group_plan.id} with existing display_name: {group_plan.display_name}"
+                        "Attempt to update group_plan %s with existing display_name: %s", group_plan.id, group_plan.display_name
                     )
                     raise ValueError(
                         f"Display name '{group_plan.display_name}' already exists for another group_plan."
@@ -368,15 +849,15 @@ class DatabaseManager:
 
             if group_plan.default_amount is not None:
                 fields_to_update.append("default_amount = ?")
-                params_for_update.append(group_plan.default_amount)
+                params_for_update.append(to_paise(group_plan.default_amount))
 
             if group_plan.is_active is not None:
                 fields_to_update.append("is_active = ?")
                 params_for_update.append(1 if group_plan.is_active else 0)
 
             if not fields_to_update:
-                logging.info(
-                    f"No fields provided to update for group_plan ID {group_plan.id}."
+                logging.debug(
+                    "No fields provided to update for group_plan ID %s.", group_plan.id
                 )
                 return True
 
@@ -389,58 +870,75 @@ class DatabaseManager:
             self.conn.commit()
 
             if cursor.rowcount == 0:
-                logging.info(
-                    f"Group Plan ID {group_plan.id} data was the same, no update performed."
+                logging.debug(
+                    "Group Plan ID %s data was the same, no update performed.", group_plan.id
                 )
                 return True
 
-            logging.info(
-                f"Group Plan ID {group_plan.id} updated successfully. New display_name: '{group_plan.display_name}'."
+            logging.debug(
+                "Group Plan ID %s updated successfully. New display_name: '%s'.", group_plan.id, group_plan.display_name
             )
             return True
         except sqlite3.Error as e:
             self.conn.rollback()
             logging.error(
-                f"Database error in update_group_plan for ID {group_plan.id}: {e}",
+                "Database error in update_group_plan for ID %s: %s", group_plan.id, e,
                 exc_info=True,
             )
             return False
         except ValueError:  # Re-raise ValueError for display_name uniqueness
             raise
 
-    def get_all_group_plans(self) -> List[GroupPlan]:
-        """Retrieves all group_plans from the database."""
+    @_streams
+    def iter_group_plans(self, batch_size: int = FETCH_BATCH_SIZE) -> Iterator[GroupPlan]:
+        """Yields all group_plans ordered by name, fetched in batches of batch_size.
+        Exhaust or close() the iterator; see _streams."""
         try:
             cursor = self.conn.cursor()
             cursor.execute(
                 "SELECT id, name, duration_days, default_amount, display_name, is_active FROM group_plans ORDER BY name ASC"
             )
-            rows = cursor.fetchall()
-            return [GroupPlan(**row) for row in rows]
+            cursor.row_factory = GroupPlan.row_factory
+            yield from _fetch_batches(cursor, batch_size)
         except sqlite3.Error as e:
-            logging.error(f"Database error in get_all_group_plans: {e}", exc_info=True)
+            logging.error("Database error in iter_group_plans: %s", e, exc_info=True)
+            raise
+
+    @_reads
+    def get_all_group_plans(self) -> List[GroupPlan]:
+        """Retrieves all group_plans from the database."""
+        try:
+            return list(self.iter_group_plans())
+        except sqlite3.Error:
             return []
 
-    def get_all_group_plans_for_view(self) -> List[GroupPlanView]:
-        """Retrieves all group plans formatted for view purposes."""
+    @_streams
+    def iter_group_plans_for_view(self, batch_size: int = FETCH_BATCH_SIZE) -> Iterator[GroupPlanView]:
+        """Yields all group plans formatted for view purposes, fetched in batches of batch_size.
+        Exhaust or close() the iterator; see _streams."""
         try:
             cursor = self.conn.cursor()
             cursor.execute(
                 "SELECT id, name, display_name, is_active, default_amount, duration_days FROM group_plans ORDER BY name ASC"
             )
-            rows = cursor.fetchall()
-            group_plan_views = []
-            for row in rows:
-                plan_data = dict(row)
-                # Convert is_active from integer (0 or 1) to boolean
-                plan_data["is_active"] = bool(plan_data["is_active"])
-                group_plan_views.append(GroupPlanView(**plan_data))
-            logging.info(f"Successfully retrieved {len(group_plan_views)} group plans for view.")
-            return group_plan_views
+            # GroupPlanView converts is_active from integer (0 or 1) to boolean
+            cursor.row_factory = GroupPlanView.row_factory
+            yield from _fetch_batches(cursor, batch_size)
         except sqlite3.Error as e:
-            logging.error(f"Database error in get_all_group_plans_for_view: {e}", exc_info=True)
+            logging.error("Database error in iter_group_plans_for_view: %s", e, exc_info=True)
+            raise
+
+    @_reads
+    def get_all_group_plans_for_view(self) -> List[GroupPlanView]:
+        """Retrieves all group plans formatted for view purposes."""
+        try:
+            group_plan_views = list(self.iter_group_plans_for_view())
+        except sqlite3.Error:
             return []
+        logging.debug("Successfully retrieved %s group plans for view.", len(group_plan_views))
+        return group_plan_views
 
+    @_writes
     def delete_group_plan(self, plan_id: int) -> bool:
         """Deletes a group_plan from the database by its ID.
         Returns True if deletion was successful, False otherwise.
@@ -452,18 +950,19 @@ class DatabaseManager:
             cursor.execute("DELETE FROM group_plans WHERE id = ?", (plan_id,))
             self.conn.commit()
             if cursor.rowcount == 0:
-                logging.warning(f"No group_plan found with ID {plan_id} to delete.")
+                logging.warning("No group_plan found with ID %s to delete.", plan_id)
                 return False
-            logging.info(f"Group Plan ID {plan_id} deleted successfully.")
+            logging.debug("Group Plan ID %s deleted successfully.", plan_id)
             return True
         except sqlite3.Error as e:
             self.conn.rollback()
             logging.error(
-                f"Database error in delete_group_plan for ID {plan_id}: {e}",
+                "Database error in delete_group_plan for ID %s: %s", plan_id, e,
                 exc_info=True,
             )
             return False
 
+    @_reads
     def get_group_plan_by_display_name(self, display_name: str) -> Optional[GroupPlan]:
         """Retrieves a specific group_plan by its display_name."""
         cursor = self.conn.cursor()
@@ -474,15 +973,16 @@ class DatabaseManager:
             )
             plan_row = cursor.fetchone()
             if plan_row:
-                return GroupPlan(**plan_row)
+                return GroupPlan.from_row(plan_row)
             return None
         except sqlite3.Error as e:
             logging.error(
-                f"Database error in get_group_plan_by_display_name for '{display_name}': {e}",
+                "Database error in get_group_plan_by_display_name for '%s': %s", display_name, e,
                 exc_info=True,
             )
             return None
 
+    @_reads
     def get_group_plan_by_id(self, plan_id: int) -> Optional[GroupPlan]:
         """Retrieves details for a specific group_plan by its ID."""
         cursor = self.conn.cursor()
@@ -493,15 +993,16 @@ class DatabaseManager:
             )
             plan_row = cursor.fetchone()
             if plan_row:
-                return GroupPlan(**plan_row)
+                return GroupPlan.from_row(plan_row)
             return None
         except sqlite3.Error as e:
             logging.error(
-                f"Database error in get_group_plan_by_id for plan_id {plan_id}: {e}",
+                "Database error in get_group_plan_by_id for plan_id %s: %s", plan_id, e,
                 exc_info=True,
             )
             return None
 
+    @_writes
     def find_or_create_group_plan(self, name: str, duration_days: int, price: float) -> Optional[int]:
         """
         Finds a group plan by name, duration, and price. If not found, creates a new one.
@@ -514,15 +1015,15 @@ class DatabaseManager:
             # The group_plans table has `default_amount` for price.
             cursor.execute(
                 "SELECT id FROM group_plans WHERE name = ? AND duration_days = ? AND default_amount = ?",
-                (name, duration_days, price),
+                (name, duration_days, to_paise(price)),
             )
             row = cursor.fetchone()
             if row:
-                logging.info(f"Found existing group plan ID {row['id']} for {name}, {duration_days} days, price {price}.")
+                logging.debug("Found existing group plan ID %s for %s, %s days, price %s.", row['id'], name, duration_days, price)
                 return row["id"]
             else:
                 # Plan not found, create a new one
-                logging.info(f"No existing plan found for {name}, {duration_days} days, price {price}. Creating new one.")
+                logging.debug("No existing plan found for %s, %s days, price %s. Creating new one.", name, duration_days, price)
                 # Create a GroupPlan object to pass to add_group_plan
                 # is_active defaults to True, display_name will be auto-generated by add_group_plan
                 new_plan = GroupPlan(
@@ -534,19 +1035,20 @@ class DatabaseManager:
                 )
                 added_plan_obj = self.add_group_plan(new_plan)
                 if added_plan_obj and added_plan_obj.id is not None:
-                    logging.info(f"Created new group plan ID {added_plan_obj.id}.")
+                    logging.debug("Created new group plan ID %s.", added_plan_obj.id)
                     return added_plan_obj.id
                 else:
-                    logging.error(f"Failed to create new group plan for {name}, {duration_days} days, price {price}.")
+                    logging.error("Failed to create new group plan for %s, %s days, price %s.", name, duration_days, price)
                     return None
         except sqlite3.Error as e:
-            logging.error(f"Database error in find_or_create_group_plan for '{name}': {e}", exc_info=True)
+            logging.error("Database error in find_or_create_group_plan for '%s': %s", name, e, exc_info=True)
             return None
         except ValueError as ve: # Catch ValueError from add_group_plan (e.g. duplicate display_name if logic changes)
-            logging.error(f"ValueError in find_or_create_group_plan for '{name}': {ve}", exc_info=True)
+            logging.error("ValueError in find_or_create_group_plan for '%s': %s", name, ve, exc_info=True)
             return None
 
 
+    @_writes
     def add_group_class_membership(
         self, membership: GroupClassMembership
     ) -> Optional[GroupClassMembership]:
@@ -562,7 +1064,7 @@ class DatabaseManager:
                 datetime.strptime(membership.start_date, "%Y-%m-%d")
                 datetime.strptime(membership.end_date, "%Y-%m-%d")
             except ValueError as ve:  # Handles date validation error specifically
-                logging.error(f"Invalid date format: {ve}")
+                logging.error("Invalid date format: %s", ve)
                 # Re-raise as a new ValueError with a more specific message to the caller
                 raise ValueError(
                     f"Invalid date format for start_date or end_date. Expected YYYY-MM-DD."
@@ -591,7 +1093,7 @@ class DatabaseManager:
                     membership.plan_id,
                     membership.start_date,
                     membership.end_date,
-                    membership.amount_paid,
+                    to_paise(membership.amount_paid),
                     purchase_date_to_use,
                     membership.membership_type,
                     is_active_int,
@@ -603,31 +1105,29 @@ class DatabaseManager:
                 purchase_date_to_use  # Ensure purchase_date is set on the object
             )
 
-            log_message = (
-                f"Group Class Membership record created for member ID {membership.member_id}, "
-                f"plan ID {membership.plan_id} with membership ID {membership.id}."
+            logging.debug(
+                "Group Class Membership record created for member ID %s, plan ID %s with membership ID %s."
+                " Payment Method (not stored): %s. Notes (not stored): %s.",
+                membership.member_id,
+                membership.plan_id,
+                membership.id,
+                membership.payment_method,
+                membership.notes,
             )
-            if membership.payment_method:
-                log_message += (
-                    f" Payment Method (not stored): {membership.payment_method}."
-                )
-            if membership.notes:
-                log_message += f" Notes (not stored): {membership.notes}."
-            logging.info(log_message)
 
             return membership
 
         except sqlite3.IntegrityError as ie:  # Aligned with the main try
             self.conn.rollback()
             logging.error(
-                f"DB integrity error creating group_class_membership for member {membership.member_id}, plan {membership.plan_id}: {ie}",
+                "DB integrity error creating group_class_membership for member %s, plan %s: %s", membership.member_id, membership.plan_id, ie,
                 exc_info=True,
             )
             raise  # Re-raise the IntegrityError to signal failure to caller
         except sqlite3.Error as e:  # Aligned with the main try
             self.conn.rollback()
             logging.error(
-                f"DB error (type: {type(e)}) creating group_class_membership for member {membership.member_id}, plan {membership.plan_id}: {e}",
+                "DB error (type: %s) creating group_class_membership for member %s, plan %s: %s", type(e), membership.member_id, membership.plan_id, e,
                 exc_info=True,
             )
             return None  # Or raise an AppAPI specific exception
@@ -638,11 +1138,15 @@ class DatabaseManager:
             # Logging is already done for date validation error.
             raise  # Re-raise to the caller
 
-    def get_all_group_class_memberships(
+    @_streams
+    def iter_group_class_memberships(
         self,
         # name_filter: Optional[str] = None, # Filtering by name requires a JOIN with members table
         status_filter: Optional[str] = None,  # 'Active', 'Inactive', or None
-    ) -> List[GroupClassMembership]:
+        batch_size: int = FETCH_BATCH_SIZE,
+    ) -> Iterator[GroupClassMembership]:
+        """Yields group class memberships, newest start date first, fetched in batches of batch_size.
+        Exhaust or close() the iterator; see _streams."""
         try:
             cursor = self.conn.cursor()
             # Removed JOINs with members and group_plans, and related fields (member_name, plan_name)
@@ -654,10 +1158,10 @@ class DatabaseManager:
                 gcm.plan_id,
                 gcm.start_date,
                 gcm.end_date,
-                gcm.is_active,
                 gcm.amount_paid,
+                gcm.membership_type,
                 gcm.purchase_date,
-                gcm.membership_type
+                gcm.is_active
             FROM group_class_memberships gcm
             """
             conditions = []
@@ -678,22 +1182,35 @@ class DatabaseManager:
             sql_select += " ORDER BY gcm.start_date DESC"
 
             cursor.execute(sql_select, params)
-            rows = cursor.fetchall()
-            # Assuming GroupClassMembership dataclass matches these fields
-            return [GroupClassMembership(**row) for row in rows]
+            # Columns are selected in GroupClassMembership field order
+            cursor.row_factory = GroupClassMembership.row_factory
+            yield from _fetch_batches(cursor, batch_size)
         except sqlite3.Error as e:
             logging.error(
-                f"Database error while fetching group_class_memberships: {e}",
+                "Database error while streaming group_class_memberships: %s", e,
                 exc_info=True,
             )
+            raise
+
+    @_reads
+    def get_all_group_class_memberships(
+        self,
+        status_filter: Optional[str] = None,  # 'Active', 'Inactive', or None
+    ) -> List[GroupClassMembership]:
+        try:
+            return list(self.iter_group_class_memberships(status_filter=status_filter))
+        except sqlite3.Error:
             return []
 
-    def get_all_group_class_memberships_for_view(
+    @_streams
+    def iter_group_class_memberships_for_view(
         self,
         name_filter: Optional[str] = None,
         status_filter: Optional[str] = None,  # 'Active', 'Inactive', or None
-    ) -> List[GroupClassMembershipView]:
-        """Retrieves all group class memberships formatted for view purposes, with optional filters."""
+        batch_size: int = FETCH_BATCH_SIZE,
+    ) -> Iterator[GroupClassMembershipView]:
+        """Yields group class memberships formatted for view purposes, with optional filters,
+        fetched in batches of batch_size. Exhaust or close() the iterator; see _streams."""
         try:
             cursor = self.conn.cursor()
             sql_select = """
@@ -717,7 +1234,7 @@ class DatabaseManager:
             params = []
 
             if name_filter:
-                conditions.append("m.name LIKE ?")
+                conditions.append(self._member_name_condition())
                 params.append(f"%{name_filter}%")
             if status_filter:
                 is_active_val = 1 if status_filter.lower() == "active" else 0
@@ -730,22 +1247,92 @@ class DatabaseManager:
             sql_select += " ORDER BY gcm.start_date DESC, m.name ASC"
 
             cursor.execute(sql_select, params)
-            rows = cursor.fetchall()
-            membership_views = []
-            for row in rows:
-                membership_data = dict(row)
-                membership_data["is_active"] = bool(membership_data["is_active"])
-                membership_views.append(GroupClassMembershipView(**membership_data))
-
-            logging.info(f"Successfully retrieved {len(membership_views)} group class memberships for view.")
-            return membership_views
+            cursor.row_factory = GroupClassMembershipView.row_factory
+            yield from _fetch_batches(cursor, batch_size)
         except sqlite3.Error as e:
             logging.error(
-                f"Database error while fetching group_class_memberships_for_view: {e}",
+                "Database error while streaming group_class_memberships_for_view: %s", e,
                 exc_info=True,
             )
+            raise
+
+    @_reads
+    def get_all_group_class_memberships_for_view(
+        self,
+        name_filter: Optional[str] = None,
+        status_filter: Optional[str] = None,  # 'Active', 'Inactive', or None
+    ) -> List[GroupClassMembershipView]:
+        """Retrieves all group class memberships formatted for view purposes, with optional filters."""
+        try:
+            membership_views = list(
+                self.iter_group_class_memberships_for_view(name_filter=name_filter, status_filter=status_filter)
+            )
+        except sqlite3.Error:
             return []
+        logging.debug("Successfully retrieved %s group class memberships for view.", len(membership_views))
+        return membership_views
+
+    @_reads
+    def get_group_class_memberships_page_for_view(
+        self,
+        limit: int,
+        after: Optional[Tuple[str, int]] = None,
+        name_filter: Optional[str] = None,
+        status_filter: Optional[str] = None,
+    ) -> Page:
+        """Retrieves one page of group class memberships for view purposes, ordered
+        by (start_date DESC, id DESC). `after` is the next_cursor of the previous page."""
+        try:
+            cursor = self.conn.cursor()
+            sql_select = """
+            SELECT
+                gcm.id,
+                gcm.member_id,
+                m.name AS member_name,
+                gcm.plan_id,
+                gp.name AS plan_name,
+                gcm.start_date,
+                gcm.end_date,
+                gcm.purchase_date,
+                gcm.membership_type,
+                gcm.is_active,
+                gcm.amount_paid
+            FROM group_class_memberships gcm
+            JOIN members m ON gcm.member_id = m.id
+            JOIN group_plans gp ON gcm.plan_id = gp.id
+            """
+            conditions = []
+            params: list = []
 
+            if after is not None:
+                conditions.append("(gcm.start_date, gcm.id) < (?, ?)")
+                params.extend(after)
+            if name_filter:
+                conditions.append(self._member_name_condition())
+                params.append(f"%{name_filter}%")
+            if status_filter:
+                is_active_val = 1 if status_filter.lower() == "active" else 0
+                conditions.append("gcm.is_active = ?")
+                params.append(is_active_val)
+
+            if conditions:
+                sql_select += " WHERE " + " AND ".join(conditions)
+
+            sql_select += " ORDER BY gcm.start_date DESC, gcm.id DESC LIMIT ?"
+            params.append(limit + 1)
+
+            cursor.execute(sql_select, params)
+            cursor.row_factory = GroupClassMembershipView.row_factory
+            membership_views = cursor.fetchall()
+            return _to_page(membership_views, limit, lambda m: (m.start_date, m.id))
+        except sqlite3.Error as e:
+            logging.error(
+                "Database error while fetching group_class_memberships page: %s", e,
+                exc_info=True,
+            )
+            return Page(items=[])
+
+    @_reads
     def get_group_class_memberships_by_member_id(
         self, member_id: int
     ) -> List[GroupClassMembership]:
@@ -770,14 +1357,15 @@ class DatabaseManager:
             """
             cursor.execute(sql_select, (member_id,))
             rows = cursor.fetchall()
-            return [GroupClassMembership(**row) for row in rows]
+            return [GroupClassMembership.from_row(row) for row in rows]
         except sqlite3.Error as e:
             logging.error(
-                f"Database error in get_group_class_memberships_by_member_id for member_id {member_id}: {e}",
+                "Database error in get_group_class_memberships_by_member_id for member_id %s: %s", member_id, e,
                 exc_info=True,
             )
             return []
 
+    @_writes
     def update_group_class_membership(self, membership: GroupClassMembership) -> bool:
         cursor = self.conn.cursor()
         try:  # Main try block
@@ -787,7 +1375,7 @@ class DatabaseManager:
                 datetime.strptime(membership.end_date, "%Y-%m-%d")
             except ValueError as ve:  # Specific to date validation
                 logging.error(
-                    f"Invalid date format for membership ID {membership.id}: {ve}"
+                    "Invalid date format for membership ID %s: %s", membership.id, ve
                 )
                 raise ValueError(
                     f"Invalid date format for start_date or end_date. Expected YYYY-MM-DD."
@@ -819,7 +1407,7 @@ class DatabaseManager:
                     membership.plan_id,
                     membership.start_date,
                     membership.end_date,
-                    membership.amount_paid,
+                    to_paise(membership.amount_paid),
                     membership.purchase_date,  # Assuming purchase_date can be updated
                     membership.membership_type,  # Assuming membership_type can be updated
                     is_active_int,
@@ -830,7 +1418,7 @@ class DatabaseManager:
 
             if cursor.rowcount == 0:
                 logging.warning(
-                    f"No group_class_membership record found with id {membership.id} to update, or data was the same."
+                    "No group_class_membership record found with id %s to update, or data was the same.", membership.id
                 )
                 # Check if the record actually exists to differentiate
                 cursor.execute(
@@ -841,15 +1429,15 @@ class DatabaseManager:
                     return False  # Record not found
                 return True  # Data was the same
 
-            logging.info(
-                f"Group Class Membership record {membership.id} updated successfully."
+            logging.debug(
+                "Group Class Membership record %s updated successfully.", membership.id
             )
             return True
 
         except sqlite3.Error as e:  # For DB errors
             self.conn.rollback()
             logging.error(
-                f"Database error while updating group_class_membership {membership.id}: {e}",
+                "Database error while updating group_class_membership %s: %s", membership.id, e,
                 exc_info=True,
             )
             return False
@@ -861,12 +1449,13 @@ class DatabaseManager:
             # For now, assume ValueErrors are pre-commit.
             if "Invalid date format" not in str(ve):
                 logging.error(
-                    f"Value error during update for membership ID {membership.id}: {ve}",
+                    "Value error during update for membership ID %s: %s", membership.id, ve,
                     exc_info=True,
                 )
             # If rollback is desired for all ValueErrors: self.conn.rollback()
             raise  # Re-raise to signal invalid input or issue to caller
 
+    @_writes
     def delete_group_class_membership(self, membership_id: int) -> bool:
         try:
             cursor = self.conn.cursor()
@@ -876,24 +1465,25 @@ class DatabaseManager:
 
             if cursor.rowcount == 0:
                 logging.warning(
-                    f"No group_class_membership record found with id {membership_id} to delete."
+                    "No group_class_membership record found with id %s to delete.", membership_id
                 )
                 return False  # No record found
 
-            logging.info(
-                f"Group Class Membership record {membership_id} deleted successfully."
+            logging.debug(
+                "Group Class Membership record %s deleted successfully.", membership_id
             )
             return True
 
         except sqlite3.Error as e:
             self.conn.rollback()
             logging.error(
-                f"Database error while deleting group_class_membership {membership_id}: {e}",
+                "Database error while deleting group_class_membership %s: %s", membership_id, e,
                 exc_info=True,
             )
             return False
 
     # Personal Training (PT) Membership CRUD operations
+    @_writes
     def add_pt_membership(self, pt_membership: PTMembership) -> Optional[PTMembership]:
         """Adds a new PT membership record.
         Sessions_remaining is set to sessions_total if not explicitly set otherwise (though typically they'd be same on creation).
@@ -916,34 +1506,36 @@ class DatabaseManager:
                 (
                     pt_membership.member_id,
                     pt_membership.purchase_date,
-                    pt_membership.amount_paid,
+                    to_paise(pt_membership.amount_paid),
                     pt_membership.sessions_total,
                     sessions_remaining_to_insert,
                 ),
             )
             self.conn.commit()
             pt_membership.id = cursor.lastrowid
-            logging.info(
-                f"PT Membership record created for member ID {pt_membership.member_id} with ID {pt_membership.id}."
+            logging.debug(
+                "PT Membership record created for member ID %s with ID %s.", pt_membership.member_id, pt_membership.id
             )
             return pt_membership
         except sqlite3.IntegrityError as ie:
             self.conn.rollback()
             logging.error(
-                f"DB integrity error creating PT membership for member {pt_membership.member_id}: {ie}",
+                "DB integrity error creating PT membership for member %s: %s", pt_membership.member_id, ie,
                 exc_info=True,
             )
             raise  # Re-raise the IntegrityError
         except sqlite3.Error as e:
             self.conn.rollback()
             logging.error(
-                f"DB error creating PT membership for member {pt_membership.member_id}: {e}",
+                "DB error creating PT membership for member %s: %s", pt_membership.member_id, e,
                 exc_info=True,
             )
             return None
 
-    def get_all_pt_memberships(self) -> List[PTMembership]:
-        """Retrieves all PT memberships from the database."""
+    @_streams
+    def iter_pt_memberships(self, batch_size: int = FETCH_BATCH_SIZE) -> Iterator[PTMembership]:
+        """Yields all PT memberships, newest purchase first, fetched in batches of batch_size.
+        Exhaust or close() the iterator; see _streams."""
         try:
             cursor = self.conn.cursor()
             # Removed JOIN with members and member_name field.
@@ -953,24 +1545,34 @@ class DatabaseManager:
                 pt.id,
                 pt.member_id,
                 pt.purchase_date,
+                pt.amount_paid,
                 pt.sessions_total,
-                pt.sessions_remaining,
-                pt.amount_paid
+                pt.sessions_remaining
             FROM pt_memberships pt
             ORDER BY pt.purchase_date DESC, pt.id DESC
             """
             cursor.execute(sql_select)
-            rows = cursor.fetchall()
-            # Map rows to PTMembership objects
-            return [PTMembership(**row) for row in rows]
+            # Columns are selected in PTMembership field order
+            cursor.row_factory = PTMembership.row_factory
+            yield from _fetch_batches(cursor, batch_size)
         except sqlite3.Error as e:
             logging.error(
-                f"Database error in get_all_pt_memberships: {e}", exc_info=True
+                "Database error in iter_pt_memberships: %s", e, exc_info=True
             )
+            raise
+
+    @_reads
+    def get_all_pt_memberships(self) -> List[PTMembership]:
+        """Retrieves all PT memberships from the database."""
+        try:
+            return list(self.iter_pt_memberships())
+        except sqlite3.Error:
             return []
 
-    def get_all_pt_memberships_for_view(self) -> List[PTMembershipView]:
-        """Retrieves all PT memberships formatted for view purposes."""
+    @_streams
+    def iter_pt_memberships_for_view(self, batch_size: int = FETCH_BATCH_SIZE) -> Iterator[PTMembershipView]:
+        """Yields all PT memberships formatted for view purposes, fetched in batches of batch_size.
+        Exhaust or close() the iterator; see _streams."""
         try:
             cursor = self.conn.cursor()
             sql_select = """
@@ -987,16 +1589,63 @@ class DatabaseManager:
             ORDER BY ptm.purchase_date DESC, m.name ASC
             """
             cursor.execute(sql_select)
-            rows = cursor.fetchall()
-            pt_membership_views = [PTMembershipView(**dict(row)) for row in rows]
-            logging.info(f"Successfully retrieved {len(pt_membership_views)} PT memberships for view.")
-            return pt_membership_views
+            cursor.row_factory = PTMembershipView.row_factory
+            yield from _fetch_batches(cursor, batch_size)
         except sqlite3.Error as e:
             logging.error(
-                f"Database error in get_all_pt_memberships_for_view: {e}", exc_info=True
+                "Database error in iter_pt_memberships_for_view: %s", e, exc_info=True
             )
+            raise
+
+    @_reads
+    def get_all_pt_memberships_for_view(self) -> List[PTMembershipView]:
+        """Retrieves all PT memberships formatted for view purposes."""
+        try:
+            pt_membership_views = list(self.iter_pt_memberships_for_view())
+        except sqlite3.Error:
             return []
+        logging.debug("Successfully retrieved %s PT memberships for view.", len(pt_membership_views))
+        return pt_membership_views
+
+    @_reads
+    def get_pt_memberships_page_for_view(
+        self, limit: int, after: Optional[Tuple[str, int]] = None
+    ) -> Page:
+        """Retrieves one page of PT memberships for view purposes, ordered by
+        (purchase_date DESC, id DESC). `after` is the next_cursor of the previous page."""
+        try:
+            cursor = self.conn.cursor()
+            sql_select = """
+            SELECT
+                ptm.id AS membership_id,
+                ptm.member_id,
+                m.name AS member_name,
+                ptm.purchase_date,
+                ptm.sessions_total,
+                ptm.sessions_remaining,
+                ptm.amount_paid
+            FROM pt_memberships ptm
+            JOIN members m ON ptm.member_id = m.id
+            """
+            params: list = []
+            if after is not None:
+                sql_select += " WHERE (ptm.purchase_date, ptm.id) < (?, ?)"
+                params.extend(after)
+            sql_select += " ORDER BY ptm.purchase_date DESC, ptm.id DESC LIMIT ?"
+            params.append(limit + 1)
+            cursor.execute(sql_select, params)
+            cursor.row_factory = PTMembershipView.row_factory
+            pt_membership_views = cursor.fetchall()
+            return _to_page(
+                pt_membership_views, limit, lambda m: (m.purchase_date, m.membership_id)
+            )
+        except sqlite3.Error as e:
+            logging.error(
+                "Database error in get_pt_memberships_page_for_view: %s", e, exc_info=True
+            )
+            return Page(items=[])
 
+    @_writes
     def delete_pt_membership(self, membership_id: int) -> bool:
         """Deletes a PT membership by its ID.
         Returns True if deletion was successful, False otherwise.
@@ -1007,19 +1656,20 @@ class DatabaseManager:
             self.conn.commit()
             if cursor.rowcount == 0:
                 logging.warning(
-                    f"No PT membership found with ID {membership_id} to delete."
+                    "No PT membership found with ID %s to delete.", membership_id
                 )
                 return False
-            logging.info(f"PT Membership ID {membership_id} deleted successfully.")
+            logging.debug("PT Membership ID %s deleted successfully.", membership_id)
             return True
         except sqlite3.Error as e:
             self.conn.rollback()
             logging.error(
-                f"Database error deleting PT membership ID {membership_id}: {e}",
+                "Database error deleting PT membership ID %s: %s", membership_id, e,
                 exc_info=True,
             )
             return False
 
+    @_writes
     def update_pt_membership(self, pt_membership: PTMembership) -> bool:
         """Updates an existing PT membership's details.
         All fields from the pt_membership object are used in the update.
@@ -1034,7 +1684,7 @@ class DatabaseManager:
             )
             if not cursor.fetchone():
                 logging.warning(
-                    f"PT Membership with ID {pt_membership.id} not found for update."
+                    "PT Membership with ID %s not found for update.", pt_membership.id
                 )
                 return False  # Return False if not found, before other ops
 
@@ -1043,7 +1693,7 @@ class DatabaseManager:
                 datetime.strptime(pt_membership.purchase_date, "%Y-%m-%d")
             except ValueError:  # Handles date validation error specifically
                 logging.error(
-                    f"Invalid purchase_date format: {pt_membership.purchase_date}. Expected YYYY-MM-DD."
+                    "Invalid purchase_date format: %s. Expected YYYY-MM-DD.", pt_membership.purchase_date
                 )
                 raise ValueError(
                     f"Invalid purchase_date format: {pt_membership.purchase_date}. Expected YYYY-MM-DD."
@@ -1051,7 +1701,7 @@ class DatabaseManager:
 
             if pt_membership.amount_paid < 0:
                 logging.error(
-                    f"Invalid amount_paid: {pt_membership.amount_paid}. Cannot be negative."
+                    "Invalid amount_paid: %s. Cannot be negative.", pt_membership.amount_paid
                 )
                 raise ValueError(
                     f"Invalid amount_paid: {pt_membership.amount_paid}. Cannot be negative."
@@ -1059,7 +1709,7 @@ class DatabaseManager:
 
             if pt_membership.sessions_total < 0:
                 logging.error(
-                    f"Invalid sessions_total: {pt_membership.sessions_total}. Cannot be negative."
+                    "Invalid sessions_total: %s. Cannot be negative.", pt_membership.sessions_total
                 )
                 raise ValueError(
                     f"Invalid sessions_total: {pt_membership.sessions_total}. Cannot be negative."
@@ -1067,7 +1717,7 @@ class DatabaseManager:
 
             if pt_membership.sessions_remaining < 0:
                 logging.error(
-                    f"Invalid sessions_remaining: {pt_membership.sessions_remaining}. Cannot be negative."
+                    "Invalid sessions_remaining: %s. Cannot be negative.", pt_membership.sessions_remaining
                 )
                 raise ValueError(
                     f"Invalid sessions_remaining: {pt_membership.sessions_remaining}. Cannot be negative."
@@ -1080,7 +1730,7 @@ class DatabaseManager:
             """
             params = (
                 pt_membership.purchase_date,
-                pt_membership.amount_paid,
+                to_paise(pt_membership.amount_paid),
                 pt_membership.sessions_total,
                 pt_membership.sessions_remaining,
                 pt_membership.id,
@@ -1090,19 +1740,19 @@ class DatabaseManager:
             self.conn.commit()
 
             if cursor.rowcount == 0:
-                logging.info(
-                    f"PT Membership ID {pt_membership.id} data was the same, no update performed."
+                logging.debug(
+                    "PT Membership ID %s data was the same, no update performed.", pt_membership.id
                 )
             else:
-                logging.info(
-                    f"PT Membership ID {pt_membership.id} updated successfully."
+                logging.debug(
+                    "PT Membership ID %s updated successfully.", pt_membership.id
                 )
             return True
 
         except sqlite3.Error as e:  # For DB errors
             self.conn.rollback()
             logging.error(
-                f"Database error in update_pt_membership for ID {pt_membership.id}: {e}",
+                "Database error in update_pt_membership for ID %s: %s", pt_membership.id, e,
                 exc_info=True,
             )
             return False
@@ -1117,74 +1767,224 @@ class DatabaseManager:
                 False  # Or re-raise ve if API contract prefers exceptions for bad input
             )
 
-    def generate_financial_report_data(
-        self, start_date: str, end_date: str
-    ) -> List[Dict]:
+    @_streams
+    def iter_financial_report_details(
+        self, start_date: str, end_date: str, batch_size: int = FETCH_BATCH_SIZE
+    ) -> Iterator[Dict[str, Any]]:
         """
-        Fetches raw transaction data from both group_class_memberships and pt_memberships
-        within the given date range.
-        Returns a list of dictionaries, where each dictionary represents a raw transaction.
+        Yields the group class and PT purchases made between start_date and end_date
+        (inclusive) as report lines, ordered by purchase_date, from one UNION ALL query
+        read in fetchmany batches. Each line has purchase_date, amount_paid (rupees), type,
+        member_name and item_name. Database errors are logged and re-raised, so a
+        consumer never mistakes a failed stream for a short one. Exhaust or close() the iterator; see _streams.
         """
-        transactions = []
-        cursor = self.conn.cursor()
-
         try:
-            # Query for group class memberships
-            sql_group_details = """
-            SELECT
-                gcm.purchase_date,
-                gcm.amount_paid,
-                'group' as type,
-                m.name as member_name,
-                gp.name as plan_name,
-                gcm.member_id,
-                gcm.plan_id
-            FROM group_class_memberships gcm
-            JOIN members m ON gcm.member_id = m.id
-            JOIN group_plans gp ON gcm.plan_id = gp.id
-            WHERE date(gcm.purchase_date) BETWEEN date(?) AND date(?)
-            """
-            cursor.execute(sql_group_details, (start_date, end_date))
-            column_names_group = [description[0] for description in cursor.description]
-            for row in cursor.fetchall():
-                transactions.append(dict(zip(column_names_group, row)))
-
-            # Query for PT memberships
-            sql_pt_details = """
-            SELECT
-                ptm.purchase_date,
-                ptm.amount_paid,
-                'pt' as type,
-                m.name as member_name,
-                ptm.sessions_total,
-                ptm.member_id
-            FROM pt_memberships ptm
-            JOIN members m ON ptm.member_id = m.id
-            WHERE date(ptm.purchase_date) BETWEEN date(?) AND date(?)
-            """
-            cursor.execute(sql_pt_details, (start_date, end_date))
-            column_names_pt = [description[0] for description in cursor.description]
-            for row in cursor.fetchall():
-                transactions.append(dict(zip(column_names_pt, row)))
+            # Each arm range-scans its (purchase_day, purchase_date) index in order, so
+            # SQLite merges the two sorted streams instead of sorting the union.
+            cursor = self.conn.execute(
+                """
+                SELECT
+                    gcm.purchase_day,
+                    gcm.purchase_date,
+                    gcm.amount_paid,
+                    'group' AS type,
+                    m.name AS member_name,
+                    gp.name AS item_name
+                FROM group_class_memberships gcm
+                JOIN members m ON gcm.member_id = m.id
+                JOIN group_plans gp ON gcm.plan_id = gp.id
+                WHERE gcm.purchase_day BETWEEN date(?) AND date(?)
+                UNION ALL
+                SELECT
+                    ptm.purchase_day,
+                    ptm.purchase_date,
+                    ptm.amount_paid,
+                    'pt' AS type,
+                    m.name AS member_name,
+                    COALESCE(ptm.sessions_total, 'N/A') || ' PT Sessions' AS item_name
+                FROM pt_memberships ptm
+                JOIN members m ON ptm.member_id = m.id
+                WHERE ptm.purchase_day BETWEEN date(?) AND date(?)
+                ORDER BY purchase_day, purchase_date
+                """,
+                (start_date, end_date, start_date, end_date),
+            )
+            for _, purchase_date, amount_paid, line_type, member_name, item_name in _fetch_batches(cursor, batch_size):
+                yield {
+                    "purchase_date": purchase_date,
+                    "amount_paid": from_paise(amount_paid),
+                    "type": line_type,
+                    "member_name": member_name,
+                    "item_name": item_name,
+                }
+        except sqlite3.Error as e:
+            logging.error(
+                "Database error while streaming financial report details for %s to %s: %s", start_date, end_date, e,
+                exc_info=True,
+            )
+            raise
 
-            # Sort all transactions by purchase_date
-            transactions.sort(key=lambda x: x["purchase_date"])
+    @_reads
+    def get_financial_report_details(self, start_date: str, end_date: str) -> List[Dict]:
+        """
+        Returns the lines of iter_financial_report_details() as a list, or [] on a
+        database error.
+        """
+        try:
+            return list(self.iter_financial_report_details(start_date, end_date))
+        except sqlite3.Error:
+            return []
 
-            return transactions
+    @_reads
+    def get_financial_report_totals(self, start_date: str, end_date: str) -> Dict[str, Any]:
+        """
+        Totals purchases made between start_date and end_date (inclusive) from the
+        revenue_daily rollup, so the cost grows with the number of days rather than
+        purchases. Amounts are integer paise. Returns
+        {"total": int,
+         "by_type": {"group": {"count", "amount"}, "pt": {"count", "amount"}},
+         "by_plan": [{"plan_id", "plan_name", "count", "amount"}, ...]}
+        with by_plan sorted by plan name. Returns empty totals on error.
+        """
+        try:
+            totals = _empty_report_totals()
+            cursor = self.conn.execute(
+                """
+                SELECT rd.type, rd.plan_id, gp.name, SUM(rd.count), SUM(rd.amount)
+                FROM revenue_daily rd
+                LEFT JOIN group_plans gp ON rd.type = 'group' AND gp.id = rd.plan_id
+                WHERE rd.day BETWEEN date(?) AND date(?)
+                GROUP BY rd.type, rd.plan_id
+                """,
+                (start_date, end_date),
+            )
+            for line_type, plan_id, plan_name, count, amount in cursor:
+                totals["total"] += amount
+                totals["by_type"][line_type]["count"] += count
+                totals["by_type"][line_type]["amount"] += amount
+                if line_type == "group":
+                    totals["by_plan"].append(
+                        {"plan_id": plan_id, "plan_name": plan_name, "count": count, "amount": amount}
+                    )
+            totals["by_plan"].sort(key=lambda plan: (plan["plan_name"] or "", plan["plan_id"]))
+            return totals
+        except sqlite3.Error as e:
+            logging.error(
+                "Database error while aggregating financial report totals for %s to %s: %s", start_date, end_date, e,
+                exc_info=True,
+            )
+            return _empty_report_totals()
 
+    @_reads
+    def get_revenue_by_period(
+        self, start_date: str, end_date: str, period: str = "month"
+    ) -> List[Dict[str, Any]]:
+        """
+        Sums the revenue_daily rollup between start_date and end_date (inclusive) per
+        calendar period ("month" -> "2024-05", "quarter" -> "2024-Q2", "year" -> "2024")
+        and purchase type. Returns [{"period", "type", "count", "amount"}, ...] ordered by
+        period then type, with amounts in paise. Raises ValueError for an unknown period.
+        """
+        if period not in REVENUE_PERIOD_KEYS:
+            raise ValueError(f"Invalid period '{period}'. Expected one of {', '.join(REVENUE_PERIOD_KEYS)}.")
+        try:
+            cursor = self.conn.execute(
+                f"""
+                SELECT {REVENUE_PERIOD_KEYS[period]} AS period, type, SUM(count), SUM(amount)
+                FROM revenue_daily
+                WHERE day BETWEEN date(?) AND date(?)
+                GROUP BY 1, 2
+                ORDER BY 1, 2
+                """,
+                (start_date, end_date),
+            )
+            return [
+                {"period": period_key, "type": line_type, "count": count, "amount": amount}
+                for period_key, line_type, count, amount in cursor
+            ]
         except sqlite3.Error as e:
             logging.error(
-                f"Database error while generating financial report data for {start_date} to {end_date}: {e}",
+                "Database error while summing revenue by %s for %s to %s: %s", period, start_date, end_date, e,
                 exc_info=True,
             )
             return []
-        except Exception as ex:
+
+    @_reads
+    def get_revenue_series(
+        self, start_date: str, end_date: str, granularity: str = "day"
+    ) -> List[Dict[str, Any]]:
+        """
+        Groups the revenue_daily rollup between start_date and end_date (inclusive) into
+        day, week or month buckets in one query. Returns
+        [{"period", "type", "plan_id", "plan_name", "count", "amount"}, ...] where period is
+        the bucket's first day (YYYY-MM-DD), plan_name is the plan's display name (None for
+        PT) and amounts are paise. Only buckets with purchases are returned.
+        Raises ValueError for an unknown granularity.
+        """
+        if granularity not in REVENUE_BUCKET_STARTS:
+            raise ValueError(
+                f"Invalid granularity '{granularity}'. Expected one of {', '.join(REVENUE_BUCKET_STARTS)}."
+            )
+        try:
+            cursor = self.conn.execute(
+                f"""
+                SELECT {REVENUE_BUCKET_STARTS[granularity]} AS period, rd.type, rd.plan_id,
+                       gp.display_name, SUM(rd.count), SUM(rd.amount)
+                FROM revenue_daily rd
+                LEFT JOIN group_plans gp ON rd.type = 'group' AND gp.id = rd.plan_id
+                WHERE rd.day BETWEEN date(?) AND date(?)
+                GROUP BY 1, rd.type, rd.plan_id
+                ORDER BY 1, rd.type, rd.plan_id
+                """,
+                (start_date, end_date),
+            )
+            return [
+                {
+                    "period": period,
+                    "type": line_type,
+                    "plan_id": plan_id,
+                    "plan_name": plan_name,
+                    "count": count,
+                    "amount": amount,
+                }
+                for period, line_type, plan_id, plan_name, count, amount in cursor
+            ]
+        except sqlite3.Error as e:
             logging.error(
-                f"Unexpected error while generating financial report data: {ex}",
+                "Database error while building the %s revenue series for %s to %s: %s", granularity, start_date, end_date, e,
                 exc_info=True,
             )
             return []
 
+    @_writes
+    def check_revenue_rollup(self, repair: bool = True) -> int:
+        """
+        Compares revenue_daily with a fresh aggregation of the purchase tables and returns
+        the number of rollup rows that differ. With repair=True a drifted rollup is rebuilt
+        from scratch. Returns -1 on a database error.
+        """
+        try:
+            mismatches = self.conn.execute(
+                f"""
+                SELECT
+                    (SELECT COUNT(*) FROM (
+                        SELECT day, type, plan_id, count, amount FROM revenue_daily
+                        EXCEPT SELECT * FROM ({REVENUE_DAILY_SELECT})))
+                  + (SELECT COUNT(*) FROM (
+                        SELECT * FROM ({REVENUE_DAILY_SELECT})
+                        EXCEPT SELECT day, type, plan_id, count, amount FROM revenue_daily))
+                """
+            ).fetchone()[0]
+            if mismatches and repair:
+                with self.conn:
+                    rebuild_revenue_daily(self.conn)
+                logging.warning("revenue_daily had %s stale rows and was rebuilt.", mismatches)
+            return mismatches
+        except sqlite3.Error as e:
+            logging.error("Database error while checking revenue_daily: %s", e, exc_info=True)
+            return -1
+
+    @_reads
     def generate_renewal_report_data(
         self, start_date_str: str, end_date_str: str
     ) -> list:
@@ -1219,19 +2019,23 @@ class DatabaseManager:
 
             # Fetch as a list of dictionaries or tuples.
             column_names = [description[0] for description in cursor.description]
-            renewal_list = [dict(zip(column_names, row)) for row in cursor.fetchall()]
+            renewal_list = []
+            for row in cursor:
+                renewal = dict(zip(column_names, row))
+                renewal["amount_paid"] = from_paise(renewal["amount_paid"])
+                renewal_list.append(renewal)
 
             return renewal_list
 
         except sqlite3.Error as e:
             logging.error(
-                f"Database error while generating renewal report data: {e}",
+                "Database error while generating renewal report data: %s", e,
                 exc_info=True,
             )
             return []
         except Exception as ex:
             logging.error(
-                f"Unexpected error while generating renewal report data: {ex}",
+                "Unexpected error while generating renewal report data: %s", ex,
                 exc_info=True,
             )
             return []
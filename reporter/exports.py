@@ -0,0 +1,114 @@
+"""
+Streaming report exports. Rows (mappings or DTOs) are consumed one at a time from an
+iterator, typically a DatabaseManager iter_* method, and written straight to a binary
+stream, either as CSV or as a write-only openpyxl workbook, so memory use does not grow
+with the report's size.
+"""
+
+import csv
+import io
+from typing import IO, Any, Iterable, List, Mapping, Tuple
+
+# (row key or DTO attribute, column header) pairs, in output order
+Column = Tuple[str, str]
+
+FINANCIAL_REPORT_COLUMNS: List[Column] = [
+    ("purchase_date", "Purchase Date"),
+    ("amount_paid", "Amount Paid (₹)"),
+    ("type", "Type"),
+    ("member_name", "Member Name"),
+    ("item_name", "Item/Plan Name"),
+]
+
+MEMBER_COLUMNS: List[Column] = [
+    ("id", "Member ID"),
+    ("name", "Name"),
+    ("phone", "Phone"),
+    ("email", "Email"),
+    ("join_date", "Join Date"),
+    ("is_active", "Active"),
+]
+
+GROUP_CLASS_MEMBERSHIP_COLUMNS: List[Column] = [
+    ("id", "Membership ID"),
+    ("member_name", "Member Name"),
+    ("plan_name", "Plan Name"),
+    ("start_date", "Start Date"),
+    ("end_date", "End Date"),
+    ("purchase_date", "Purchase Date"),
+    ("membership_type", "Membership Type"),
+    ("amount_paid", "Amount Paid (₹)"),
+    ("is_active", "Active"),
+]
+
+PT_MEMBERSHIP_COLUMNS: List[Column] = [
+    ("membership_id", "Membership ID"),
+    ("member_name", "Member Name"),
+    ("purchase_date", "Purchase Date"),
+    ("sessions_total", "Sessions Total"),
+    ("sessions_remaining", "Sessions Remaining"),
+    ("amount_paid", "Amount Paid (₹)"),
+]
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def _row_values(row: Any, columns: List[Column]) -> List[Any]:
+    if isinstance(row, Mapping):
+        return [row.get(key) for key, _ in columns]
+    return [getattr(row, key, None) for key, _ in columns]
+
+
+def write_csv(rows: Iterable[Any], columns: List[Column], stream: IO[bytes]) -> int:
+    """Writes a header line and one CSV line per row to a binary stream; returns the row count.
+    The output is UTF-8 with a BOM so Excel picks up the ₹ sign."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="", write_through=True)
+    try:
+        writer = csv.writer(text)
+        writer.writerow([header for _, header in columns])
+        row_count = 0
+        for row in rows:
+            writer.writerow(_row_values(row, columns))
+            row_count += 1
+        return row_count
+    finally:
+        text.detach()  # Leave the caller's stream open
+
+
+def write_xlsx(
+    rows: Iterable[Any],
+    columns: List[Column],
+    stream: IO[bytes],
+    sheet_name: str = "Report",
+) -> int:
+    """Writes a header row and one row per item into a single-sheet workbook on a binary
+    stream; returns the row count. A write-only workbook keeps just the current row in memory."""
+    from openpyxl import Workbook  # Deferred so importing this module never loads openpyxl
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_name)
+    sheet.append([header for _, header in columns])
+    row_count = 0
+    for row in rows:
+        sheet.append(_row_values(row, columns))
+        row_count += 1
+    workbook.save(stream)
+    return row_count
+
+
+def write_export(
+    rows: Iterable[Any],
+    columns: List[Column],
+    stream: IO[bytes],
+    export_format: str,
+    sheet_name: str = "Report",
+) -> int:
+    """Writes rows in export_format ("csv" or "xlsx"); raises ValueError for anything else."""
+    if export_format == "csv":
+        return write_csv(rows, columns, stream)
+    if export_format == "xlsx":
+        return write_xlsx(rows, columns, stream, sheet_name)
+    raise ValueError(f"Invalid export format '{export_format}'. Expected one of {', '.join(EXPORT_FORMATS)}.")
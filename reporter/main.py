@@ -1,3 +1,8 @@
+import time
+
+# Taken before the heavier imports below so the startup timings include them
+LAUNCH_STARTED = time.time()
+
 import sys
 import os
 # Add the project root to sys.path
@@ -9,13 +14,22 @@ if project_root not in sys.path:
 # The original script already had import os, subprocess, sys, importlib.util
 # So the primary change is the sys.path manipulation.
 
+import hashlib
 import importlib.util
+import logging
 import subprocess
 # os and sys were already imported by the new snippet
 
-from reporter.database import DB_FILE, initialize_database  # Updated database import
+from reporter.database import DB_FILE, create_database, schema_is_current
 from reporter.migrate_historical_data import migrate_historical_data
 
+# Holds the fingerprint of the requirements.txt + interpreter that check_and_install_requirements
+# last verified, so later launches can skip probing every package.
+DEPS_STAMP_FILE = os.path.join(project_root, ".deps_verified")
+# Environment variable carrying the launch time into the Streamlit process, which reports
+# the time to first page once it has rendered (see streamlit_ui/app.py).
+LAUNCH_STARTED_ENV = "KRANOS_LAUNCH_STARTED"
+
 # Removed old imports:
 # import sqlite3 # No longer directly used here
 # from reporter.database import create_database, seed_initial_plans # Replaced by initialize_database
@@ -38,9 +52,30 @@ def handle_database_migration():
         print(f"An exception occurred while trying to run the migration function: {e}")
 
 
+def requirements_fingerprint(requirements_path: str) -> str:
+    """
+    Hashes requirements.txt together with the interpreter path, so editing the
+    requirements or switching virtual environments invalidates the stamp.
+    """
+    digest = hashlib.sha256(sys.executable.encode())
+    with open(requirements_path, "rb") as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+
+def deps_already_verified(fingerprint: str) -> bool:
+    try:
+        with open(DEPS_STAMP_FILE, "r") as f:
+            return f.read().strip() == fingerprint
+    except OSError:
+        return False
+
+
 def check_and_install_requirements():
     """
     Checks if packages in requirements.txt are installed and installs them if not.
+    Returns immediately when DEPS_STAMP_FILE shows the same requirements were
+    already verified with this interpreter.
     """
     # Path to the requirements.txt file, make it absolute from script's location
     requirements_path = os.path.abspath(
@@ -53,6 +88,10 @@ def check_and_install_requirements():
         )
         return
 
+    fingerprint = requirements_fingerprint(requirements_path)
+    if deps_already_verified(fingerprint):
+        return
+
     with open(requirements_path, "r") as f:
         # Read package names, ignore comments and empty lines
         required_packages = [
@@ -105,10 +144,22 @@ def check_and_install_requirements():
                 "Please install the missing packages manually and restart the application."
             )
             sys.exit(1)
+    else:
+        try:
+            with open(DEPS_STAMP_FILE, "w") as f:
+                f.write(fingerprint)
+        except OSError as e:
+            print(f"Warning: Could not write dependency stamp '{DEPS_STAMP_FILE}': {e}")
 
 
 if __name__ == "__main__":
-    check_and_install_requirements()  # THIS IS THE NEW LINE
+    # Kept across the os.execv restart after installing packages, so that time counts too
+    os.environ.setdefault(LAUNCH_STARTED_ENV, str(LAUNCH_STARTED))
+    # INFO shows the schema and data migration progress during startup
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    check_and_install_requirements()
 
     # Print Python executable and version information
     print(f"Running with Python executable: {sys.executable}")
@@ -122,13 +173,19 @@ if __name__ == "__main__":
         os.makedirs(data_dir)
         print(f"Created data directory: {data_dir}")
 
-    # Initialize the database using the consistent function
-    initialize_database()
-    print(f"Database initialized at: {DB_FILE}")
+    # Schema setup only runs when the stored schema version is missing or stale
+    if schema_is_current(DB_FILE):
+        print(f"Database schema is up to date at: {DB_FILE}")
+    else:
+        conn = create_database(DB_FILE)
+        if conn:
+            conn.close()
+        print(f"Database initialized at: {DB_FILE}")
 
     handle_database_migration()  # Call the refactored function
 
-    print("Launching Streamlit app...")
+    startup_seconds = time.time() - float(os.environ[LAUNCH_STARTED_ENV])
+    print(f"Startup checks finished in {startup_seconds:.2f}s. Launching Streamlit app...")
     # Construct the absolute path to streamlit_ui/app.py
     # __file__ in main.py is reporter/main.py
     # os.path.dirname(__file__) is reporter/
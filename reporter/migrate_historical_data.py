@@ -1,456 +1,528 @@
-import csv
+from __future__ import annotations
+
+import hashlib
 import logging  # Added logging
 import os
 import sqlite3
-from datetime import datetime, timedelta
-
-import pandas as pd  # Ensure pandas is imported
+from dataclasses import dataclass
+from datetime import date
+from typing import TYPE_CHECKING, Optional
 
-from .database import DB_FILE, create_database
+from .database import DB_FILE, open_database
 from .database_manager import DatabaseManager
+from .models import PAISE_PER_RUPEE
+
+if TYPE_CHECKING:
+    # pandas is imported inside the functions that use it, so callers that only need
+    # migrate_historical_data() to find nothing has changed never pay for loading it.
+    import pandas as pd
 
 # Source CSV files (expected in the project root directory)
 GC_MEMBERS_CSV = "Kranos MMA Members.xlsx - GC.csv"
 PT_MEMBERS_CSV = "Kranos MMA Members.xlsx - PT.csv"
 
-# Basic logging configuration
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+# Keys per "IN (...)" lookup in the bulk loaders; below SQLite's default host-parameter limit
+LOOKUP_CHUNK_SIZE = 500
 
+# Bytes read per step when hashing source CSVs
+HASH_BLOCK_SIZE = 1024 * 1024
 
-def parse_date_dmy_to_ymd(date_str: str) -> str:
-    if not date_str:
-        return ""
-    try:
-        dt_obj = datetime.strptime(date_str, "%d/%m/%y").date()
-    except ValueError:
-        try:
-            dt_obj = datetime.strptime(date_str, "%d/%m/%Y").date()
-        except ValueError:
-            return ""
-    return dt_obj.strftime("%Y-%m-%d")
-
-
-def clean_amount(amount_str: str) -> float:
-    if not amount_str:
-        return 0.0
-    cleaned_str = amount_str.replace("₹", "").replace(",", "").strip()
-    try:
-        return float(cleaned_str)
-    except ValueError:
-        # Updated logging for consistency, though this function wasn't explicitly asked to be changed.
-        if cleaned_str == "-" or cleaned_str == "":
-            return 0.0
-        return 0.0  # Or raise error, depending on desired strictness
+# Failed rows quoted in full in each file's migration summary; the rest are only counted
+FAILED_ROW_SAMPLES = 5
 
 
-def migrate_gc_data(
-    db_mngr: DatabaseManager, processed_members: dict, earliest_start_dates: dict
-):  # group_plans_map removed, added earliest_start_dates
-    logging.info(f"Starting GC data migration from {GC_MEMBERS_CSV}...")
-    if not os.path.exists(GC_MEMBERS_CSV):
-        logging.error(f"GC CSV file not found at {GC_MEMBERS_CSV}")
-        return 0, 0
-
-    line_count = 0
-    success_count = 0
-    failed_rows = []
+def read_source_csv(csv_path: str) -> pd.DataFrame:
+    """Reads a source CSV once, keeping every column as text and empty cells as ''."""
+    import pandas as pd
 
-    with open(GC_MEMBERS_CSV, "r", encoding="utf-8-sig") as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            line_count += 1
-            try:
-                phone = row.get("Phone", "").strip()
-                name = row.get("Client Name", "").strip()
+    return pd.read_csv(
+        csv_path, dtype=str, keep_default_na=False, encoding="utf-8-sig"
+    )
 
-                if not phone or not name:
-                    failed_rows.append((line_count, row, "Missing name or phone"))
-                    continue
 
-                member_id = None
-                if phone in processed_members:
-                    member_id = processed_members[phone]
-                else:
-                    try:
-                        # phone from CSV is row.get('Phone', '').strip()
-                        # name from CSV is row.get('Client Name', '').strip()
-                        # email can be None
-                        member_join_date = earliest_start_dates.get(phone)
-                        # Create a Member object
-                        from .models import Member # Ensure Member is imported
-                        new_member_obj = Member(
-                            id=None, # id is None for new members
-                            name=name,
-                            phone=phone, # field name is 'phone' in Member dataclass
-                            email=row.get("Email"),
-                            join_date=member_join_date, # This will be used or overridden by add_member if None
-                            is_active=True # Default to active for migrated members
-                        )
-                        # logging.info(f"GC Member to add: {name}, Phone: {phone}, Raw Join Date from CSV: {row.get('Plan Start Date')}, Calculated Join Date: {member_join_date}, Member Obj: {new_member_obj}")
-                        added_member_obj = db_mngr.add_member(new_member_obj)
-                        if added_member_obj and added_member_obj.id is not None:
-                            member_id = added_member_obj.id
-                            processed_members[phone] = member_id
-                        else:
-                            logging.warning(
-                                f"Failed to add member (add_member returned None) for row {line_count}: {name}, {phone}"
-                            )
-                            failed_rows.append(
-                                (
-                                    line_count,
-                                    row,
-                                    "Failed to add member (add_member returned None)",
-                                )
-                            )
-                            continue
-                    except ValueError:  # Member with phone likely exists
-                        cursor = db_mngr.conn.cursor()
-                        cursor.execute(
-                            "SELECT id FROM members WHERE phone = ?", (phone,)
-                        )
-                        existing_member_row = cursor.fetchone()
-                        if existing_member_row:
-                            member_id = existing_member_row[0]
-                            processed_members[phone] = member_id
-                            logging.info(
-                                f"Found existing member by phone for row {line_count}: {name}, {phone}, ID: {member_id}"
-                            )
-                        else:
-                            logging.error(
-                                f"Member add failed (ValueError) and fetch failed for row {line_count}: {name}, {phone}"
-                            )
-                            failed_rows.append(
-                                (
-                                    line_count,
-                                    row,
-                                    "Member add failed (ValueError) and fetch failed",
-                                )
-                            )
-                            continue
-
-                if not member_id:
-                    logging.warning(
-                        f"Could not obtain member_id for row {line_count}: {name}, {phone}"
-                    )
-                    failed_rows.append((line_count, row, "Could not obtain member_id"))
-                    continue
+def _text_column(df: pd.DataFrame, column: str, default: str = "") -> pd.Series:
+    """Returns a stripped text column, or `default` for every row if the column is absent."""
+    import pandas as pd
 
-                # New ETL Logic for plan_id
-                plan_type = row.get("Plan Type")
-                plan_duration_str = row.get("Plan Duration")
-                try:
-                    plan_duration = int(plan_duration_str)
-                except (ValueError, TypeError):
-                    logging.warning(
-                        f"Could not parse plan duration for row {line_count}. Value was: '{plan_duration_str}'. Skipping row."
-                    )
-                    failed_rows.append(
-                        (line_count, row, f"Invalid Plan Duration: {plan_duration_str}")
-                    )
-                    continue
+    if column not in df.columns:
+        return pd.Series(default, index=df.index, dtype=object)
+    return df[column].fillna("").astype(str).str.strip()
 
-                raw_amount_val = row.get("Amount")
-                if raw_amount_val is None or (isinstance(raw_amount_val, str) and raw_amount_val.strip().lower() == 'none'):
-                    plan_price = 0.0
-                    logging.warning(
-                        f"Price value was None or 'None' for row {line_count}. Original: '{raw_amount_val}'. Setting price to 0.0."
-                    )
-                else:
-                    cleaned_amount_str = str(raw_amount_val).replace("₹", "").replace(",", "").strip()
-                    if not cleaned_amount_str or cleaned_amount_str == '-': # Handle empty or hyphen after cleaning
-                        plan_price = 0.0
-                        logging.warning(
-                            f"Price value became empty or hyphen after cleaning for row {line_count}. Original: '{raw_amount_val}'. Setting price to 0.0."
-                        )
-                    else:
-                        try:
-                            plan_price = float(cleaned_amount_str)
-                        except (ValueError, TypeError):
-                            logging.warning(
-                                f"Could not parse price for row {line_count} after cleaning. Original value: '{raw_amount_val}', Cleaned: '{cleaned_amount_str}'. Setting price to 0.0."
-                            )
-                            plan_price = 0.0
-
-                plan_id = db_mngr.find_or_create_group_plan(
-                    name=plan_type, duration_days=plan_duration, price=plan_price
-                )
-                if not plan_id:
-                    logging.warning(
-                        f"Could not find or create plan for row {line_count}. Plan: {plan_type}, Duration: {plan_duration}. Skipping row."
-                    )
-                    failed_rows.append(
-                        (
-                            line_count,
-                            row,
-                            f"Failed to find or create plan: {plan_type} / {plan_duration}",
-                        )
-                    )
-                    continue
 
-                # Need to fetch plan_duration_days from DB for end_date calculation,
-                # as find_or_create_group_plan only returns id.
-                # Alternatively, modify find_or_create_group_plan to return duration or a plan object.
-                # For now, let's assume duration_days from CSV (plan_duration) is sufficient if plan is newly created.
-                # If plan exists, its duration_days should match.
-                # This part might need adjustment if the price in CSV is different from DB plan price for existing plans.
-                # The prompt for find_or_create_group_plan uses price from CSV to create if not exists.
-
-                purchase_date_csv = row.get("Payment Date", "").strip()
-                start_date_csv = row.get("Plan Start Date", "").strip()
-                amount_csv = row.get("Amount", "").strip() # Corrected key to "Amount"
-                membership_type_csv = row.get("Membership Type", "Fresh").strip()
-                # plan_status_csv = row.get('Plan Status', 'EXPIRED').strip() # Removed
-
-                purchase_date = parse_date_dmy_to_ymd(purchase_date_csv)
-                start_date = parse_date_dmy_to_ymd(start_date_csv)
-                amount_paid = clean_amount(amount_csv)
-
-                db_membership_type = (
-                    "New" if membership_type_csv.lower() == "fresh" else "Renewal"
-                )
-                # db_is_active = 1 if plan_status_csv.lower() == "active" else 0 # Removed
+def parse_dates_dmy(values: pd.Series) -> pd.Series:
+    """Parses 'dd/mm/yy' or 'dd/mm/yyyy' strings to 'YYYY-MM-DD'; unparseable values become ''."""
+    import pandas as pd
 
-                if not start_date:
-                    logging.warning(
-                        f"Invalid start date for row {line_count}. Value: '{start_date_csv}'. Skipping."
-                    )
-                    failed_rows.append((line_count, row, "Invalid start date"))
-                    continue
-                if not purchase_date:  # If payment date is missing, use start date
-                    purchase_date = start_date
-                    logging.info(
-                        f"Purchase date missing for row {line_count}, using start date: {start_date}"
-                    )
+    values = values.fillna("").astype(str).str.strip()
+    parsed = pd.to_datetime(values, format="%d/%m/%y", errors="coerce")
+    parsed = parsed.fillna(pd.to_datetime(values, format="%d/%m/%Y", errors="coerce"))
+    return parsed.dt.strftime("%Y-%m-%d").fillna("")
 
-                cursor = db_mngr.conn.cursor()
-                # plan_duration_days is now plan_duration (parsed int from CSV)
-                start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
-                end_date_obj = start_date_obj + timedelta(
-                    days=plan_duration - 1
-                )  # Use plan_duration from CSV
-                end_date = end_date_obj.strftime("%Y-%m-%d")
 
-                sql_insert_gc = """
-                INSERT INTO group_class_memberships (
-                    member_id, plan_id, start_date, end_date, amount_paid,
-                    purchase_date, membership_type
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(member_id, plan_id, start_date) DO NOTHING;
-                """
-                cursor.execute(
-                    sql_insert_gc,
-                    (
-                        member_id,
-                        plan_id,
-                        start_date,
-                        end_date,
-                        amount_paid,
-                        purchase_date,
-                        db_membership_type,
-                    ),
-                )
-                if cursor.rowcount > 0:
-                    success_count += 1
-                db_mngr.conn.commit()
-
-            except Exception as e:
-                db_mngr.conn.rollback()
-                logging.error(
-                    f"Exception processing GC row {line_count}: {e} - Data: {dict(row)}",
-                    exc_info=True,
-                )
-                failed_rows.append((line_count, row, str(e)))
+def clean_amounts(values: pd.Series) -> pd.Series:
+    """Strips '₹' and thousands separators; empty, '-' or unparseable amounts become 0.0."""
+    import pandas as pd
 
-    logging.info(
-        f"GC data migration: Processed {line_count} rows. Migrated/updated: {success_count}. Failed: {len(failed_rows)}."
-    )
-    if failed_rows:
-        logging.warning("Failed GC rows details (first 5):")
-        for i, (r_num, r_data, r_error) in enumerate(failed_rows[:5]):
-            logging.warning(f"  GC Row {r_num}: {r_error} - Data: {dict(r_data)}")
-    return success_count, len(failed_rows)
+    cleaned = values.fillna("").astype(str).str.replace(r"[₹,]", "", regex=True).str.strip()
+    return pd.to_numeric(cleaned, errors="coerce").fillna(0.0).astype(float)
 
 
-def migrate_pt_data(
-    db_mngr: DatabaseManager, processed_members: dict, earliest_start_dates: dict
-):  # Added earliest_start_dates
-    logging.info(f"Starting PT data migration from {PT_MEMBERS_CSV}...")
+def amounts_in_paise(amounts: pd.Series) -> pd.Series:
+    """Converts rupee amounts from clean_amounts() to the integer paise stored in the database,
+    rounding the same way as models.to_paise()."""
+    return (amounts * PAISE_PER_RUPEE).round().astype("int64")
 
-    if not os.path.exists(PT_MEMBERS_CSV):
-        logging.error(f"PT CSV file not found at {PT_MEMBERS_CSV}")
-        return 0, 0
 
-    line_count = 0
-    success_count = 0
-    failed_rows = []
+def parse_whole_numbers(values: pd.Series) -> pd.Series:
+    """Parses integer strings; anything else becomes NaN (int() semantics, minus the exceptions)."""
+    import pandas as pd
 
-    with open(PT_MEMBERS_CSV, "r", encoding="utf-8-sig") as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            line_count += 1
-            try:
-                phone = row.get("Phone", "").strip()
-                name = row.get("Client Name", "").strip()
+    values = values.fillna("").astype(str).str.strip()
+    return pd.to_numeric(values.where(values.str.fullmatch(r"[+-]?\d+"), None), errors="coerce")
 
-                if not phone or not name:
-                    failed_rows.append((line_count, row, "Missing name or phone"))
-                    continue
 
-                member_id = None
-                if phone in processed_members:
-                    member_id = processed_members[phone]
-                else:
-                    try:
-                        member_join_date = earliest_start_dates.get(phone)
-                        # Create a Member object
-                        from .models import Member # Ensure Member is imported (already imported in the other block, but good for clarity)
-                        new_member_obj_pt = Member(
-                            id=None,
-                            name=name,
-                            phone=phone, # field name is 'phone'
-                            email=row.get("Email"),
-                            join_date=member_join_date,
-                            is_active=True
-                        )
-                        # logging.info(f"PT Member to add: {name}, Phone: {phone}, Raw Join Date from CSV: {row.get('Payment Date')}, Calculated Join Date: {member_join_date}, Member Obj: {new_member_obj_pt}")
-                        added_member_obj_pt = db_mngr.add_member(new_member_obj_pt)
-                        if added_member_obj_pt and added_member_obj_pt.id is not None:
-                            member_id = added_member_obj_pt.id
-                            processed_members[phone] = member_id
-                        else:
-                            logging.warning(
-                                f"Failed to add member (add_member returned None) for PT row {line_count}: {name}, {phone}"
-                            )
-                            failed_rows.append(
-                                (
-                                    line_count,
-                                    row,
-                                    "Failed to add member (add_member returned None)",
-                                )
-                            )
-                            continue
-                    except ValueError:  # Member with phone likely exists
-                        cursor = db_mngr.conn.cursor()
-                        cursor.execute(
-                            "SELECT id FROM members WHERE phone = ?", (phone,)
-                        )
-                        existing_member_row = cursor.fetchone()
-                        if existing_member_row:
-                            member_id = existing_member_row[0]
-                            processed_members[phone] = member_id
-                            logging.info(
-                                f"Found existing member by phone for PT row {line_count}: {name}, {phone}, ID: {member_id}"
-                            )
-                        else:
-                            logging.error(
-                                f"Member add failed (ValueError) and fetch failed for PT row {line_count}: {name}, {phone}"
-                            )
-                            failed_rows.append(
-                                (
-                                    line_count,
-                                    row,
-                                    "Member add failed (ValueError) and fetch failed for PT",
-                                )
-                            )
-                            continue
-
-                if not member_id:
-                    logging.warning(
-                        f"Could not obtain member_id for PT row {line_count}: {name}, {phone}"
-                    )
-                    failed_rows.append(
-                        (line_count, row, "Could not obtain member_id for PT")
-                    )
-                    continue
+def collect_earliest_start_dates(gc_df: Optional[pd.DataFrame], pt_df: Optional[pd.DataFrame]) -> dict:
+    """Maps each phone to its earliest GC 'Plan Start Date' or PT 'Payment Date' ('YYYY-MM-DD')."""
+    import pandas as pd
 
-                purchase_date_csv = row.get("Payment Date", "").strip()
-                amount_paid_csv = row.get("Amount Paid", "").strip()
-                sessions_csv = row.get("Session Count", "").strip()
-
-                purchase_date = parse_date_dmy_to_ymd(purchase_date_csv)
-                amount_paid = clean_amount(amount_paid_csv)
-                try:
-                    sessions_purchased = int(sessions_csv) if sessions_csv else 0
-                except ValueError:
-                    sessions_purchased = 0
-                    logging.warning(
-                        f"Invalid session count for PT row {line_count}. Value: '{sessions_csv}'. Setting to 0."
-                    )
+    frames = []
+    if gc_df is not None:
+        frames.append(pd.DataFrame({
+            "phone": _text_column(gc_df, "Phone"),
+            "date": parse_dates_dmy(_text_column(gc_df, "Plan Start Date")),
+        }))
+    if pt_df is not None:
+        frames.append(pd.DataFrame({
+            "phone": _text_column(pt_df, "Phone"),
+            "date": parse_dates_dmy(_text_column(pt_df, "Payment Date")),
+        }))
+    if not frames:
+        return {}
+    dates = pd.concat(frames, ignore_index=True)
+    dates = dates[(dates["phone"] != "") & (dates["date"] != "")]
+    # ISO dates sort lexically, so a string min is the earliest date
+    return dates.groupby("phone")["date"].min().to_dict()
 
-                if not purchase_date:
-                    logging.warning(
-                        f"Invalid purchase date for PT row {line_count}. Value: '{purchase_date_csv}'. Skipping."
-                    )
-                    failed_rows.append(
-                        (line_count, row, "Invalid purchase date for PT")
-                    )
-                    continue
 
-                cursor_check = db_mngr.conn.cursor()
-                # Check if a similar record already exists, now including new fields
-                # Defaulting notes to '' and sessions_remaining to sessions_purchased for the check
-                cursor_check.execute(
-                    """
-                    SELECT id FROM pt_memberships
-                    WHERE member_id = ? AND purchase_date = ? AND amount_paid = ? AND sessions_total = ? AND sessions_remaining = ?
-                """,
-                    (
-                        member_id,
-                        purchase_date,
-                        amount_paid,
-                        sessions_purchased, # For sessions_total
-                        sessions_purchased, # For sessions_remaining (as it's a new membership)
-                    ),
-                )
-                if cursor_check.fetchone():
-                    logging.info(
-                        f"Skipping existing PT record for member_id {member_id} on {purchase_date}"
-                    )
-                    continue
+def _flag_failures(reasons: pd.Series, mask: pd.Series, reason) -> None:
+    """Records `reason` for rows in `mask` that have not already failed an earlier check."""
+    newly_failed = mask & (reasons == "")
+    reasons[newly_failed] = reason if isinstance(reason, str) else reason[newly_failed]
 
-                # Call the updated method. DatabaseManager.add_pt_membership now handles setting
-                # sessions_total and sessions_remaining internally.
-                from .models import PTMembership # Ensure PTMembership is imported
-                new_pt_obj = PTMembership(
-                    id=None,
-                    member_id=member_id,
-                    purchase_date=purchase_date,
-                    amount_paid=amount_paid,
-                    sessions_total=sessions_purchased,
-                    sessions_remaining=sessions_purchased # For new memberships, remaining is total
-                )
-                added_pt_obj = db_mngr.add_pt_membership(new_pt_obj)
-                if added_pt_obj and added_pt_obj.id is not None:
-                    success_count += 1
-                else:
-                    failed_rows.append(
-                        (line_count, row, "add_pt_membership returned None or error")
-                    )
 
-            except Exception as e:
-                try:
-                    db_mngr.conn.rollback()
-                except Exception:
-                    pass
-                failed_rows.append((line_count, row, str(e)))
-                logging.error(
-                    f"Exception processing PT row {line_count}: {e} - Data: {dict(row)}",
-                    exc_info=True,
-                )
+def _pending_members(df: pd.DataFrame, phone: pd.Series, name: pd.Series, has_identity: pd.Series) -> dict:
+    """Maps each phone to the (name, email) of the first row it appears on."""
+    import pandas as pd
 
+    email = df["Email"] if "Email" in df.columns else pd.Series(None, index=df.index, dtype=object)
+    first_rows = pd.DataFrame({"phone": phone, "name": name, "email": email})[has_identity]
+    first_rows = first_rows.drop_duplicates("phone")
+    return {
+        row_phone: (row_name, row_email)
+        for row_phone, row_name, row_email in zip(first_rows["phone"], first_rows["name"], first_rows["email"])
+    }
+
+
+def _chunks(items: list, size: int = LOOKUP_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _resolve_members(
+    cursor: sqlite3.Cursor, pending_members: dict, member_ids: dict, earliest_start_dates: dict
+) -> None:
+    """Maps every phone in pending_members ({phone: (name, email)}) to a member id in member_ids.
+    Existing members are looked up in batches; the rest are inserted with a single executemany."""
+    unresolved = [phone for phone in pending_members if phone not in member_ids]
+    for chunk in _chunks(unresolved):
+        placeholders = ",".join("?" * len(chunk))
+        cursor.execute(f"SELECT phone, id FROM members WHERE phone IN ({placeholders})", chunk)
+        member_ids.update((row[0], row[1]) for row in cursor)
+
+    new_phones = [phone for phone in unresolved if phone not in member_ids]
+    today_iso = date.today().isoformat()
+    cursor.executemany(
+        "INSERT INTO members (name, phone, email, join_date, is_active) VALUES (?, ?, ?, ?, 1)",
+        [
+            (
+                pending_members[phone][0],
+                phone,
+                pending_members[phone][1],
+                earliest_start_dates.get(phone) or today_iso,
+            )
+            for phone in new_phones
+        ],
+    )
+    for chunk in _chunks(new_phones):
+        placeholders = ",".join("?" * len(chunk))
+        cursor.execute(f"SELECT phone, id FROM members WHERE phone IN ({placeholders})", chunk)
+        member_ids.update((row[0], row[1]) for row in cursor)
+
+
+def _resolve_group_plans(cursor: sqlite3.Cursor, plan_keys: list) -> dict:
+    """Maps each (name, duration_days, price in paise) key to a group plan id, creating missing plans
+    with a single executemany. Like find_or_create_group_plan, a key whose display name is
+    already taken by a plan with a different price maps to None."""
+    plan_ids = {}
+    taken_display_names = set()
+    cursor.execute("SELECT id, name, duration_days, default_amount, display_name FROM group_plans")
+    for row in cursor:
+        plan_ids.setdefault((row[1], row[2], row[3]), row[0])
+        taken_display_names.add(row[4])
+
+    new_plans = []
+    for key in plan_keys:
+        if key in plan_ids:
+            continue
+        name, duration_days, price = key
+        display_name = f"{name} - {duration_days} days"
+        if name is None or display_name in taken_display_names:
+            plan_ids[key] = None
+            continue
+        taken_display_names.add(display_name)
+        plan_ids[key] = None  # Filled in once the insert below has assigned an id
+        new_plans.append((name, duration_days, price, display_name))
+
+    cursor.executemany(
+        "INSERT INTO group_plans (name, duration_days, default_amount, display_name, is_active) VALUES (?, ?, ?, ?, 1)",
+        new_plans,
+    )
+    for chunk in _chunks([plan[3] for plan in new_plans]):
+        placeholders = ",".join("?" * len(chunk))
+        cursor.execute(
+            f"SELECT id, name, duration_days, default_amount FROM group_plans WHERE display_name IN ({placeholders})",
+            chunk,
+        )
+        for row in cursor:
+            plan_ids[(row[1], row[2], row[3])] = row[0]
+    return plan_ids
+
+
+def _log_migration_summary(
+    label: str, df: pd.DataFrame, line_count: int, success_count: int, reasons: pd.Series
+) -> int:
+    """Logs one summary for a migrated file: its counts, failures grouped by reason, and the
+    first FAILED_ROW_SAMPLES failed rows (1-based data row numbers). Row data is only built
+    for those samples, and not at all when warnings are disabled. Returns the failed count."""
+    failed = reasons[reasons != ""]
     logging.info(
-        f"PT data migration: Processed {line_count} rows. Migrated: {success_count}. Failed: {len(failed_rows)}."
+        "%s data migration: Processed %d rows. Migrated: %d. Failed: %d.",
+        label, line_count, success_count, len(failed),
+    )
+    if failed.empty or not logging.getLogger().isEnabledFor(logging.WARNING):
+        return len(failed)
+    # Reasons carry the offending value after a colon; group on the part before it
+    for reason, count in failed.str.split(":", n=1).str[0].value_counts().items():
+        logging.warning("Failed %s rows: %d x %s", label, count, reason)
+    for index, reason in failed.head(FAILED_ROW_SAMPLES).items():
+        logging.warning("  %s Row %d: %s - Data: %s", label, index + 1, reason, df.loc[index].to_dict())
+    return len(failed)
+
+
+@dataclass
+class SourceFile:
+    """A source CSV that needs migrating, as recorded in migration_sources once it has been loaded."""
+    path: str
+    content_hash: str
+    size_bytes: int
+    mtime: float
+    first_new_row: int = 0  # Leading rows already migrated; non-zero only when the file was appended to
+
+
+def _hash_file(csv_path: str, prefix_bytes: Optional[int] = None):
+    """Returns the SHA-256 of the file, and of its first `prefix_bytes` bytes (None if not requested)."""
+    full_hash = hashlib.sha256()
+    prefix_hash = hashlib.sha256() if prefix_bytes is not None else None
+    bytes_read = 0
+    with open(csv_path, "rb") as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b""):
+            full_hash.update(block)
+            if prefix_hash is not None and bytes_read < prefix_bytes:
+                prefix_hash.update(block[:prefix_bytes - bytes_read])
+            bytes_read += len(block)
+    return full_hash.hexdigest(), prefix_hash.hexdigest() if prefix_hash else None
+
+
+def _ends_with_newline(csv_path: str, size_bytes: int) -> bool:
+    with open(csv_path, "rb") as file:
+        file.seek(size_bytes - 1)
+        return file.read(1) == b"\n"
+
+
+def inspect_source(conn: sqlite3.Connection, csv_path: str, force: bool = False) -> Optional[SourceFile]:
+    """
+    Compares a source CSV with the state recorded by its last migration.
+    Returns None when the file is unchanged (same size and mtime, or same content hash).
+    Otherwise returns a SourceFile whose first_new_row is the number of rows already migrated
+    if the file has only been appended to, or 0 if it is new, rewritten, or `force` is set.
+    """
+    source_path = os.path.abspath(csv_path)
+    stat = os.stat(csv_path)
+    recorded = None
+    if not force:
+        recorded = conn.execute(
+            "SELECT content_hash, size_bytes, mtime, row_count FROM migration_sources WHERE source_path = ?",
+            (source_path,),
+        ).fetchone()
+    if recorded and recorded[1] == stat.st_size and recorded[2] == stat.st_mtime:
+        return None
+
+    grew = recorded is not None and 0 < recorded[1] < stat.st_size
+    content_hash, prefix_hash = _hash_file(csv_path, recorded[1] if grew else None)
+    if recorded and content_hash == recorded[0]:
+        # Touched but identical: store the new mtime so the next launch takes the fast path
+        conn.execute(
+            "UPDATE migration_sources SET mtime = ? WHERE source_path = ?", (stat.st_mtime, source_path)
+        )
+        conn.commit()
+        return None
+
+    first_new_row = 0
+    if grew and prefix_hash == recorded[0] and _ends_with_newline(csv_path, recorded[1]):
+        first_new_row = recorded[3]
+    return SourceFile(source_path, content_hash, stat.st_size, stat.st_mtime, first_new_row)
+
+
+def _record_source(cursor: sqlite3.Cursor, source: SourceFile, row_count: int) -> None:
+    cursor.execute(
+        """
+        INSERT INTO migration_sources (source_path, content_hash, size_bytes, mtime, row_count, migrated_at)
+        VALUES (?, ?, ?, ?, ?, datetime('now'))
+        ON CONFLICT(source_path) DO UPDATE SET
+            content_hash = excluded.content_hash,
+            size_bytes = excluded.size_bytes,
+            mtime = excluded.mtime,
+            row_count = excluded.row_count,
+            migrated_at = excluded.migrated_at
+        """,
+        (source.path, source.content_hash, source.size_bytes, source.mtime, row_count),
     )
-    if failed_rows:
-        logging.warning("Failed PT rows details (first 5):")
-        for i, (r_num, r_data, r_error) in enumerate(failed_rows[:5]):
-            logging.warning(f"  PT Row {r_num}: {r_error} - Data: {dict(r_data)}")
-    return success_count, len(failed_rows)
 
 
-def migrate_historical_data():
+def _pending_source(conn: sqlite3.Connection, csv_path: str, force: bool) -> Optional[SourceFile]:
+    if not os.path.exists(csv_path):
+        logging.warning("CSV file not found at %s; skipping it.", csv_path)
+        return None
+    source = inspect_source(conn, csv_path, force)
+    if source is None:
+        logging.info("%s is unchanged since the last migration; skipping it.", csv_path)
+    elif source.first_new_row:
+        logging.info("%s was appended to; migrating rows after row %d.", csv_path, source.first_new_row)
+    return source
+
+
+def migrate_gc_data(
+    db_mngr: DatabaseManager,
+    processed_members: dict,
+    earliest_start_dates: dict,
+    gc_df: Optional[pd.DataFrame] = None,
+    source: Optional[SourceFile] = None,
+):
+    """Bulk-loads GC rows (gc_df, or GC_MEMBERS_CSV when not given): every column is parsed and
+    validated vectorized, members and plans are resolved in memory, and all memberships are
+    inserted with executemany in one transaction. When `source` is given, its state is recorded
+    in migration_sources in the same transaction. Returns (success_count, failed_count)."""
+    import pandas as pd
+
+    logging.info("Starting GC data migration from %s...", GC_MEMBERS_CSV)
+    if gc_df is None:
+        if not os.path.exists(GC_MEMBERS_CSV):
+            logging.error("GC CSV file not found at %s", GC_MEMBERS_CSV)
+            return 0, 0
+        gc_df = read_source_csv(GC_MEMBERS_CSV)
+    line_count = len(gc_df)
+
+    phone = _text_column(gc_df, "Phone")
+    name = _text_column(gc_df, "Client Name")
+    plan_type = (
+        gc_df["Plan Type"] if "Plan Type" in gc_df.columns
+        else pd.Series(None, index=gc_df.index, dtype=object)
+    )
+    raw_duration = _text_column(gc_df, "Plan Duration", default="None")
+    duration = parse_whole_numbers(raw_duration)
+    amount = amounts_in_paise(clean_amounts(_text_column(gc_df, "Amount")))
+    start_date = parse_dates_dmy(_text_column(gc_df, "Plan Start Date"))
+    purchase_date = parse_dates_dmy(_text_column(gc_df, "Payment Date"))
+    purchase_date = purchase_date.where(purchase_date != "", start_date)  # Missing payment date: use start date
+    membership_type = _text_column(gc_df, "Membership Type", default="Fresh")
+
+    reasons = pd.Series("", index=gc_df.index, dtype=object)
+    has_identity = (phone != "") & (name != "")
+    _flag_failures(reasons, ~has_identity, "Missing name or phone")
+    _flag_failures(reasons, duration.isna(), "Invalid Plan Duration: " + raw_duration)
+    whole_duration = duration.fillna(0).astype(int)
+    plan_rows = reasons == ""
+    plan_keys = list(dict.fromkeys(zip(plan_type[plan_rows], whole_duration[plan_rows], amount[plan_rows])))
+    pending_members = _pending_members(gc_df, phone, name, has_identity)
+
+    member_ids = dict(processed_members)
+    success_count = 0
+    try:
+        with db_mngr.conn:  # Commits on success, rolls the whole file back on error
+            cursor = db_mngr.conn.cursor()
+            _resolve_members(cursor, pending_members, member_ids, earliest_start_dates)
+            plan_ids = _resolve_group_plans(cursor, plan_keys)
+
+            member_id = phone.map(member_ids)
+            plan_id = pd.Series(
+                [plan_ids.get(key) for key in zip(plan_type, whole_duration, amount)],
+                index=gc_df.index,
+                dtype=object,
+            )
+            _flag_failures(reasons, member_id.isna(), "Could not obtain member_id")
+            _flag_failures(
+                reasons,
+                plan_id.isna(),
+                "Failed to find or create plan: " + plan_type.astype(str) + " / " + whole_duration.astype(str),
+            )
+            _flag_failures(reasons, start_date == "", "Invalid start date")
+
+            ok = reasons == ""
+            end_date = (
+                pd.to_datetime(start_date[ok], format="%Y-%m-%d")
+                + pd.to_timedelta(whole_duration[ok] - 1, unit="D")
+            ).dt.strftime("%Y-%m-%d")
+            db_membership_type = membership_type[ok].str.lower().eq("fresh").map({True: "New", False: "Renewal"})
+            cursor.executemany(
+                """
+                INSERT INTO group_class_memberships (
+                    member_id, plan_id, start_date, end_date, amount_paid,
+                    purchase_date, membership_type
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(member_id, plan_id, start_date) DO NOTHING;
+                """,
+                zip(
+                    member_id[ok].astype(int).tolist(),
+                    plan_id[ok].astype(int).tolist(),
+                    start_date[ok].tolist(),
+                    end_date.tolist(),
+                    amount[ok].tolist(),
+                    purchase_date[ok].tolist(),
+                    db_membership_type.tolist(),
+                ),
+            )
+            # rowcount excludes rows skipped by ON CONFLICT DO NOTHING
+            success_count = max(cursor.rowcount, 0)
+            if source is not None:
+                _record_source(cursor, source, source.first_new_row + line_count)
+        processed_members.update(member_ids)
+    except sqlite3.Error as e:
+        logging.error("Bulk GC migration failed and was rolled back: %s", e, exc_info=True)
+        reasons[reasons == ""] = str(e)
+        success_count = 0
+
+    failed_count = _log_migration_summary("GC", gc_df, line_count, success_count, reasons)
+    return success_count, failed_count
+
+
+def migrate_pt_data(
+    db_mngr: DatabaseManager,
+    processed_members: dict,
+    earliest_start_dates: dict,
+    pt_df: Optional[pd.DataFrame] = None,
+    source: Optional[SourceFile] = None,
+):
+    """Bulk-loads PT rows (pt_df, or PT_MEMBERS_CSV when not given) the same way as
+    migrate_gc_data. Rows matching an existing PT record (or an earlier row of the same file)
+    are skipped without counting as failures. Returns (success_count, failed_count)."""
+    import pandas as pd
+
+    logging.info("Starting PT data migration from %s...", PT_MEMBERS_CSV)
+    if pt_df is None:
+        if not os.path.exists(PT_MEMBERS_CSV):
+            logging.error("PT CSV file not found at %s", PT_MEMBERS_CSV)
+            return 0, 0
+        pt_df = read_source_csv(PT_MEMBERS_CSV)
+    line_count = len(pt_df)
+
+    phone = _text_column(pt_df, "Phone")
+    name = _text_column(pt_df, "Client Name")
+    purchase_date = parse_dates_dmy(_text_column(pt_df, "Payment Date"))
+    amount = amounts_in_paise(clean_amounts(_text_column(pt_df, "Amount Paid")))
+    sessions_text = _text_column(pt_df, "Session Count")
+    sessions = parse_whole_numbers(sessions_text)
+    invalid_sessions = sessions.isna() & (sessions_text != "")
+    if invalid_sessions.any():
+        logging.warning(
+            "Invalid session count for %d PT rows (first: row %d). Setting to 0.",
+            invalid_sessions.sum(),
+            invalid_sessions.idxmax() + 1,
+        )
+    sessions = sessions.fillna(0).astype(int)
+
+    reasons = pd.Series("", index=pt_df.index, dtype=object)
+    has_identity = (phone != "") & (name != "")
+    _flag_failures(reasons, ~has_identity, "Missing name or phone")
+    _flag_failures(reasons, purchase_date == "", "Invalid purchase date for PT")
+    pending_members = _pending_members(pt_df, phone, name, has_identity)
+
+    member_ids = dict(processed_members)
+    success_count = 0
+    skipped_existing = 0
+    try:
+        with db_mngr.conn:  # Commits on success, rolls the whole file back on error
+            cursor = db_mngr.conn.cursor()
+            _resolve_members(cursor, pending_members, member_ids, earliest_start_dates)
+            member_id = phone.map(member_ids)
+            _flag_failures(reasons, member_id.isna(), "Could not obtain member_id for PT")
+
+            existing_records = set()
+            for chunk in _chunks(sorted({member_ids[p] for p in pending_members if p in member_ids})):
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(
+                    f"""
+                    SELECT member_id, purchase_date, amount_paid, sessions_total, sessions_remaining
+                    FROM pt_memberships WHERE member_id IN ({placeholders})
+                    """,
+                    chunk,
+                )
+                existing_records.update(tuple(row) for row in cursor)
+
+            ok = reasons == ""
+            records_to_insert = []
+            # New memberships start with sessions_remaining equal to sessions_total
+            for record in zip(
+                member_id[ok].astype(int).tolist(),
+                purchase_date[ok].tolist(),
+                amount[ok].tolist(),
+                sessions[ok].tolist(),
+                sessions[ok].tolist(),
+            ):
+                if record in existing_records:
+                    skipped_existing += 1
+                    continue
+                existing_records.add(record)
+                records_to_insert.append(record)
+
+            cursor.executemany(
+                """
+                INSERT INTO pt_memberships (member_id, purchase_date, amount_paid, sessions_total, sessions_remaining)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                records_to_insert,
+            )
+            success_count = len(records_to_insert)
+            if source is not None:
+                _record_source(cursor, source, source.first_new_row + line_count)
+        processed_members.update(member_ids)
+        if skipped_existing:
+            logging.info("Skipped %d PT rows already present in the database.", skipped_existing)
+    except sqlite3.Error as e:
+        logging.error("Bulk PT migration failed and was rolled back: %s", e, exc_info=True)
+        reasons[reasons == ""] = str(e)
+        success_count = 0
+
+    failed_count = _log_migration_summary("PT", pt_df, line_count, success_count, reasons)
+    return success_count, failed_count
+
+
+def migrate_historical_data(force: bool = False):
+    """
+    Loads the GC and PT source CSVs into DB_FILE. CSVs unchanged since their last migration
+    are skipped, and a CSV that has only been appended to has just its new rows loaded.
+    Args:
+        force (bool): Re-migrate every row regardless of the recorded source state.
+    """
     logging.info("Starting data migration script...")
     conn = None
     total_gc_success = 0
@@ -461,104 +533,56 @@ def migrate_historical_data():
         db_dir = os.path.dirname(DB_FILE)
         if db_dir and not os.path.exists(db_dir):
             os.makedirs(db_dir, exist_ok=True)
-            logging.info(f"Created database directory: {db_dir}")
+            logging.info("Created database directory: %s", db_dir)
 
-        conn = create_database(DB_FILE)
+        conn = open_database(DB_FILE)
 
         if conn is None:
             logging.error(
-                f"Failed to create or connect to database {DB_FILE}. Migration aborted."
+                "Failed to create or connect to database %s. Migration aborted.", DB_FILE
             )
         else:
-            conn.execute("PRAGMA foreign_keys = ON;")
             db_mngr = DatabaseManager(connection=conn)
-            logging.info(f"Connected to database: {DB_FILE}")
-
-            # --- Start of new logic for earliest_start_dates ---
-            gc_csv_path = GC_MEMBERS_CSV  # Using constant defined at the top
-            pt_csv_path = PT_MEMBERS_CSV  # Using constant defined at the top
-            earliest_start_dates = {}
-
-            if os.path.exists(gc_csv_path):
-                df_gc = pd.read_csv(gc_csv_path, dtype={"Phone": str}) # Ensure Phone is read as string
-                for index, row in df_gc.iterrows():
-                    phone = str(
-                        row.get("Phone", "") # row.get should be fine now as dtype is str
-                    ).strip()  # Changed 'Phone Number' to 'Phone'
-                    if not phone:
-                        continue  # Skip if phone is empty
-                    try:
-                        # Assuming 'Plan Start Date' is in 'dd/mm/yy' or 'dd/mm/yyyy'
-                        # parse_date_dmy_to_ymd handles both and returns 'YYYY-MM-DD' or empty
-                        start_date_iso = parse_date_dmy_to_ymd(
-                            str(row.get("Plan Start Date", "")).strip()
-                        )
-                        if start_date_iso:  # Only process if date is valid
-                            if phone in earliest_start_dates:
-                                if start_date_iso < earliest_start_dates[phone]:
-                                    earliest_start_dates[phone] = start_date_iso
-                            else:
-                                earliest_start_dates[phone] = start_date_iso
-                    except (
-                        Exception
-                    ) as e_gc_date:  # Catch generic exception for date processing
-                        logging.warning(
-                            f"Warning: Could not parse date for GC member {row.get('Client Name')} with phone {phone}: {row.get('Plan Start Date')}. Error: {e_gc_date}"
-                        )
-            else:
-                logging.warning(
-                    f"GC CSV file not found at {gc_csv_path} for earliest date processing."
-                )
+            logging.info("Connected to database: %s", DB_FILE)
 
-            if os.path.exists(pt_csv_path):
-                df_pt = pd.read_csv(pt_csv_path, dtype={"Phone": str}) # Ensure Phone is read as string
-                for index, row in df_pt.iterrows():
-                    phone = str(
-                        row.get("Phone", "") # row.get should be fine now as dtype is str
-                    ).strip()  # Changed 'Phone Number' to 'Phone'
-                    if not phone:
-                        continue
-                    try:
-                        # Assuming 'Payment Date' is in 'dd/mm/yy' or 'dd/mm/yyyy'
-                        payment_date_iso = parse_date_dmy_to_ymd(
-                            str(row.get("Payment Date", "")).strip()
-                        )
-                        if payment_date_iso:
-                            if phone in earliest_start_dates:
-                                if payment_date_iso < earliest_start_dates[phone]:
-                                    earliest_start_dates[phone] = payment_date_iso
-                            else:
-                                earliest_start_dates[phone] = payment_date_iso
-                    except Exception as e_pt_date:
-                        logging.warning(
-                            f"Warning: Could not parse date for PT member {row.get('Client Name')} with phone {phone}: {row.get('Payment Date')}. Error: {e_pt_date}"
-                        )
+            gc_source = _pending_source(conn, GC_MEMBERS_CSV, force)
+            pt_source = _pending_source(conn, PT_MEMBERS_CSV, force)
+            if gc_source is None and pt_source is None:
+                logging.info("No new or changed source CSVs; migration skipped.")
             else:
-                logging.warning(
-                    f"PT CSV file not found at {pt_csv_path} for earliest date processing."
-                )
-
-            # logging.info(f"Earliest start dates collected: {earliest_start_dates}") # Log the dictionary
-            # --- End of new logic for earliest_start_dates ---
-
-            processed_members = {}
-            total_gc_success, total_gc_failed = migrate_gc_data(
-                db_mngr, processed_members, earliest_start_dates
-            )
-            total_pt_success, total_pt_failed = migrate_pt_data(
-                db_mngr, processed_members, earliest_start_dates
-            )
+                # Each CSV is read exactly once; both feed the join dates even if only one changed
+                gc_df = read_source_csv(GC_MEMBERS_CSV) if os.path.exists(GC_MEMBERS_CSV) else None
+                pt_df = read_source_csv(PT_MEMBERS_CSV) if os.path.exists(PT_MEMBERS_CSV) else None
+                earliest_start_dates = collect_earliest_start_dates(gc_df, pt_df)
+
+                processed_members = {}
+                if gc_source is not None:
+                    total_gc_success, total_gc_failed = migrate_gc_data(
+                        db_mngr,
+                        processed_members,
+                        earliest_start_dates,
+                        gc_df.iloc[gc_source.first_new_row:],
+                        gc_source,
+                    )
+                if pt_source is not None:
+                    total_pt_success, total_pt_failed = migrate_pt_data(
+                        db_mngr,
+                        processed_members,
+                        earliest_start_dates,
+                        pt_df.iloc[pt_source.first_new_row:],
+                        pt_source,
+                    )
 
     except Exception as e:
         logging.critical(
-            f"A critical error occurred in migrate_historical_data: {e}", exc_info=True
+            "A critical error occurred in migrate_historical_data: %s", e, exc_info=True
         )
         if conn:
             try:
                 conn.rollback()
                 logging.info("Transaction rolled back due to error.")
             except Exception as rb_e:
-                logging.error(f"Error during rollback: {rb_e}", exc_info=True)
+                logging.error("Error during rollback: %s", rb_e, exc_info=True)
     finally:
         if conn:
             conn.close()
@@ -566,9 +590,13 @@ def migrate_historical_data():
 
     logging.info("Data migration script finished.")
     logging.info(
-        f"Summary: GC (Success: {total_gc_success}, Failed: {total_gc_failed}), PT (Success: {total_pt_success}, Failed: {total_pt_failed})"
+        "Summary: GC (Success: %d, Failed: %d), PT (Success: %d, Failed: %d)",
+        total_gc_success, total_gc_failed, total_pt_success, total_pt_failed,
     )
 
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
     migrate_historical_data()
@@ -1,9 +1,76 @@
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, fields
+from typing import Any, Callable, ClassVar, List, Mapping, Optional, Sequence, Tuple
+
+# Money is stored in the database as INTEGER paise; the dataclasses below carry rupees.
+PAISE_PER_RUPEE = 100
+
+
+def to_paise(amount: Optional[float]) -> Optional[int]:
+    """Converts a rupee amount to integer paise, rounded to the nearest paisa."""
+    if amount is None:
+        return None
+    return round(amount * PAISE_PER_RUPEE)
+
+
+def from_paise(paise: Optional[int]) -> Optional[float]:
+    """Converts integer paise read from the database back to rupees."""
+    if paise is None:
+        return None
+    return paise / PAISE_PER_RUPEE
+
+
+class _RowMapped:
+    """Builds a dataclass from a database row, converting money columns from paise and
+    flag columns to bool. from_row takes a sqlite3.Row (or mapping); from_values and
+    row_factory take the columns positionally, in field order, without building a dict."""
+
+    __slots__ = ()
+
+    money_fields: ClassVar[Tuple[str, ...]] = ()
+    bool_fields: ClassVar[Tuple[str, ...]] = ()
+
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any]):
+        data = dict(row)
+        for field_name in cls.money_fields:
+            if field_name in data:
+                data[field_name] = from_paise(data[field_name])
+        for field_name in cls.bool_fields:
+            if field_name in data:
+                data[field_name] = bool(data[field_name])
+        return cls(**data)
+
+    @classmethod
+    def _positional_converters(cls) -> Tuple[Tuple[int, Callable[[Any], Any]], ...]:
+        converters = cls.__dict__.get("_converters")
+        if converters is None:
+            positions = {field.name: index for index, field in enumerate(fields(cls))}
+            converters = tuple((positions[name], from_paise) for name in cls.money_fields) + tuple(
+                (positions[name], bool) for name in cls.bool_fields
+            )
+            cls._converters = converters
+        return converters
+
+    @classmethod
+    def from_values(cls, values: Sequence[Any]):
+        converters = cls._positional_converters()
+        if not converters:
+            return cls(*values)
+        values = list(values)
+        for index, convert in converters:
+            values[index] = convert(values[index])
+        return cls(*values)
+
+    @classmethod
+    def row_factory(cls, cursor, row: Tuple[Any, ...]):
+        """sqlite3 row factory for a query selecting exactly this class's fields, in order."""
+        return cls.from_values(row)
+
+
+@dataclass(slots=True)
+class MemberView(_RowMapped):
+    bool_fields = ("is_active",)
 
-
-@dataclass
-class MemberView:
     id: int
     name: str
     phone: str  # Assuming phone is stored as str, adjust if it's int
@@ -12,8 +79,8 @@ class MemberView:
     is_active: bool
 
 
-@dataclass
-class Member:
+@dataclass(slots=True)
+class Member(_RowMapped):
     id: Optional[int]
     name: str
     phone: str
@@ -22,8 +89,10 @@ class Member:
     is_active: bool
 
 
-@dataclass
-class GroupPlan:
+@dataclass(slots=True)
+class GroupPlan(_RowMapped):
+    money_fields = ("default_amount",)
+
     id: Optional[int]
     name: str
     duration_days: int
@@ -32,8 +101,11 @@ class GroupPlan:
     is_active: bool = True
 
 
-@dataclass
-class GroupPlanView:
+@dataclass(slots=True)
+class GroupPlanView(_RowMapped):
+    money_fields = ("default_amount",)
+    bool_fields = ("is_active",)
+
     id: int
     name: str
     display_name: str
@@ -42,8 +114,10 @@ class GroupPlanView:
     duration_days: int
 
 
-@dataclass
-class GroupClassMembership:
+@dataclass(slots=True)
+class GroupClassMembership(_RowMapped):
+    money_fields = ("amount_paid",)
+
     id: Optional[int]
     member_id: int
     plan_id: int
@@ -58,8 +132,11 @@ class GroupClassMembership:
     notes: Optional[str] = None
 
 
-@dataclass
-class GroupClassMembershipView:
+@dataclass(slots=True)
+class GroupClassMembershipView(_RowMapped):
+    money_fields = ("amount_paid",)
+    bool_fields = ("is_active",)
+
     id: int
     member_id: int
     member_name: str  # Denormalized for easy display
@@ -74,8 +151,10 @@ class GroupClassMembershipView:
     amount_paid: Optional[float] = None
 
 
-@dataclass
-class PTMembership:
+@dataclass(slots=True)
+class PTMembership(_RowMapped):
+    money_fields = ("amount_paid",)
+
     id: Optional[int]
     member_id: int
     purchase_date: str  # Assuming YYYY-MM-DD
@@ -84,8 +163,10 @@ class PTMembership:
     sessions_remaining: int  # Should typically be initialized to sessions_total
 
 
-@dataclass
-class PTMembershipView:
+@dataclass(slots=True)
+class PTMembershipView(_RowMapped):
+    money_fields = ("amount_paid",)
+
     membership_id: int  # This likely maps to PTMembership.id
     member_id: int
     member_name: str
@@ -93,3 +174,10 @@ class PTMembershipView:
     sessions_total: int
     sessions_remaining: int
     amount_paid: float
+
+
+@dataclass(slots=True)
+class Page:
+    items: List[Any]
+    # Keyset cursor of the last item; pass it back as `after` to fetch the next page.
+    next_cursor: Optional[Tuple[Any, ...]] = None
@@ -1,12 +1,15 @@
 import streamlit as st
 
 st.set_page_config(layout="wide")
-import io  # For Excel download
+import calendar
+import io  # For report downloads
+import logging
+import os
+import time
 from datetime import date, datetime
 
-import pandas as pd
-
 from reporter.app_api import AppAPI
+from reporter.database_manager import slow_query_log
 
 # Unused imports removed:
 # import sqlite3
@@ -14,7 +17,58 @@ from reporter.app_api import AppAPI
 from reporter.models import GroupPlanView  # DTOs
 from reporter.models import GroupClassMembershipView, MemberView, PTMembershipView
 
-api = AppAPI()
+
+
+# Warnings and errors only; per-call database logging is at DEBUG
+logging.basicConfig(
+    level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# Where DatabaseManager calls slower than the slow-query threshold are written: reporter/data,
+# found from this file so it does not depend on the directory Streamlit was started from
+SLOW_QUERY_LOG_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "slow_queries.log"
+)
+
+
+@st.cache_resource
+def get_api() -> AppAPI:
+    """One AppAPI (and connection pool / query cache) shared by every session and rerun."""
+    os.makedirs(os.path.dirname(SLOW_QUERY_LOG_FILE), exist_ok=True)
+    handler = logging.FileHandler(SLOW_QUERY_LOG_FILE, encoding="utf-8", delay=True)
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(message)s"))
+    slow_query_log.addHandler(handler)
+    return AppAPI()
+
+
+api = get_api()
+
+# Set by reporter/main.py to the launch time; used to report the time to first page
+LAUNCH_STARTED_ENV = "KRANOS_LAUNCH_STARTED"
+
+
+@st.cache_resource
+def launch_timings() -> dict:
+    """Startup timings of this server process, shared by every session; see report_time_to_first_page()."""
+    return {}
+
+
+def report_time_to_first_page() -> None:
+    """Records and logs (at INFO), once per server process, how long after launch the first
+    page finished rendering. Only apps started through reporter/main.py know their launch time."""
+    launch_started = os.environ.get(LAUNCH_STARTED_ENV)
+    timings = launch_timings()
+    if launch_started and "first_page_seconds" not in timings:
+        timings["first_page_seconds"] = time.time() - float(launch_started)
+        logging.info("Time to first page: %.2fs", timings["first_page_seconds"])
+
+# Rows per page in the keyset-paginated listings
+MEMBERSHIPS_PAGE_SIZE = 50
+MEMBERS_PAGE_SIZE = 50
+# Best matches listed for a member search
+MEMBER_SEARCH_LIMIT = 50
+# Most members a typeahead member picker offers, however many members exist
+MEMBER_PICKER_LIMIT = 10
 
 # Initialize session state keys to prevent KeyErrors and ensure defined starting states
 default_today = date.today()
@@ -107,6 +161,31 @@ if "renewals_report_data" not in st.session_state:
     st.session_state.renewals_report_data = None
 if "report_month_financial" not in st.session_state:
     st.session_state.report_month_financial = default_today.replace(day=1)
+if "financial_series_output" not in st.session_state:
+    st.session_state.financial_series_output = None
+if "report_trend_start" not in st.session_state:
+    # First day of the month 11 months back, so the default trend spans 12 calendar months
+    st.session_state.report_trend_start = date(
+        default_today.year - 1 if default_today.month < 12 else default_today.year,
+        default_today.month % 12 + 1,
+        1,
+    )
+if "report_trend_end" not in st.session_state:
+    st.session_state.report_trend_end = default_today
+
+# Keyset cursors of the pages before the current one, per paginated listing
+if "gc_page_cursors" not in st.session_state:
+    st.session_state.gc_page_cursors = []
+if "pt_page_cursors" not in st.session_state:
+    st.session_state.pt_page_cursors = []
+if "members_page_cursors" not in st.session_state:
+    st.session_state.members_page_cursors = []
+
+# Id of the membership row last loaded into the edit form from each selectable table
+if "gc_table_applied_id" not in st.session_state:
+    st.session_state.gc_table_applied_id = None
+if "pt_table_applied_id" not in st.session_state:
+    st.session_state.pt_table_applied_id = None
 
 # Key for radio button in memberships tab
 if "membership_mode_selector" not in st.session_state:
@@ -126,13 +205,169 @@ if "selected_plan_duration_display" not in st.session_state:
     st.session_state.selected_plan_duration_display = ""
 
 # Dynamic form keys for clearing/resetting forms (already initialized in the list above, e.g. gc_membership_form_key)
-# Widget keys like 'gc_membership_select_widget', 'pt_membership_select_widget', 'member_select_widget',
+# Widget keys like 'gc_membership_select_widget', 'pt_membership_select_widget', 'member_picker_select',
 # 'group_plan_select_widget', 'financial_report_month_selector' are generally managed by Streamlit.
 # Explicit initialization is mostly for custom logic state variables.
 
 # clear_membership_form_state, render_new_group_class_membership_form, and render_new_pt_membership_form removed.
 
 
+def current_page_cursor(cursors_key: str):
+    """Returns the `after` cursor for the page currently shown by a paginated listing."""
+    cursors = st.session_state[cursors_key]
+    return cursors[-1] if cursors else None
+
+
+def render_page_controls(cursors_key: str, next_cursor) -> None:
+    """Renders Previous/Next buttons for a keyset-paginated listing.
+    st.session_state[cursors_key] is the stack of cursors for the pages before the current one."""
+    cursors = st.session_state[cursors_key]
+    prev_col, page_col, next_col = st.columns([1, 2, 1])
+    with prev_col:
+        if st.button("◀ Previous", key=f"{cursors_key}_prev", disabled=not cursors):
+            cursors.pop()
+            st.rerun()
+    with page_col:
+        st.caption(f"Page {len(cursors) + 1}")
+    with next_col:
+        if st.button("Next ▶", key=f"{cursors_key}_next", disabled=next_cursor is None):
+            cursors.append(next_cursor)
+            st.rerun()
+
+
+def selected_table_row(table_event, rows):
+    """Returns the item behind the row selected in a selectable st.dataframe, or None."""
+    selected_positions = table_event.selection.rows if table_event else []
+    if selected_positions and selected_positions[0] < len(rows):
+        return rows[selected_positions[0]]
+    return None
+
+
+def render_member_picker(label: str, key: str, selected_id=None, active_only: bool = False, none_label=None):
+    """Renders a typeahead member picker: a text box for the start of a phone number or name
+    and a selectbox of the first MEMBER_PICKER_LIMIT members matching it, looked up on each
+    rerun, so the page never carries the full member list. The member last picked stays an
+    option while it is still selected_id; none_label adds a None option shown that way.
+    Returns the picked MemberView, or None."""
+    query = st.text_input(f"Find {label}", key=f"{key}_query", placeholder="Start of phone number or name")
+    matches = []
+    if query.strip():
+        try:
+            matches = api.search_members_by_prefix(query, limit=MEMBER_PICKER_LIMIT, active_only=active_only)
+        except Exception as e:
+            st.error(f"Error searching members: {e}")
+    options = {member.id: member for member in matches}
+    picked = st.session_state.get(f"{key}_picked")
+    if picked is not None and picked.id == selected_id and picked.id not in options:
+        options = {picked.id: picked, **options}
+    option_ids = ([None] if none_label else []) + list(options)
+    if not option_ids:
+        # No selectbox until there are matches: an empty one would keep None as its value
+        st.caption("No matching members." if query.strip() else "Type to list matching members.")
+        return None
+
+    def format_member(member_id):
+        if member_id is None:
+            return none_label
+        member = options[member_id]
+        return f"{member.name} ({member.phone or 'N/A'})"
+
+    picked_id = st.selectbox(
+        f"Select {label}",
+        options=option_ids,
+        format_func=format_member,
+        key=f"{key}_select",
+        index=option_ids.index(selected_id) if selected_id in option_ids else 0,
+    )
+    st.session_state[f"{key}_picked"] = options.get(picked_id)
+    return options.get(picked_id)
+
+
+def render_export_downloads(write_export, file_stem: str, key: str) -> None:
+    """Renders Excel and CSV download buttons for an export written by write_export(export_format, stream).
+    The file is only built, streaming from the database, when a button is clicked."""
+
+    def export(export_format: str):
+        def build() -> bytes:
+            output = io.BytesIO()
+            write_export(export_format, output)
+            return output.getvalue()
+
+        return build
+
+    excel_col, csv_col = st.columns(2)
+    excel_col.download_button(
+        label="Download as Excel",
+        data=export("xlsx"),
+        file_name=f"{file_stem}.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        key=f"{key}_xlsx",
+    )
+    csv_col.download_button(
+        label="Download as CSV",
+        data=export("csv"),
+        file_name=f"{file_stem}.csv",
+        mime="text/csv",
+        key=f"{key}_csv",
+    )
+
+
+def render_financial_report_downloads(start_date: date, end_date: date, file_stem: str, key: str) -> None:
+    """Renders the download buttons for the financial report lines in start_date..end_date."""
+    start_str, end_str = start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
+    render_export_downloads(
+        lambda export_format, output: api.export_financial_report(start_str, end_str, export_format, output),
+        file_stem,
+        key,
+    )
+
+
+def load_gc_membership_into_form(selected_data: GroupClassMembershipView) -> None:
+    """Populates the group class edit form from the selected membership row."""
+    st.session_state.show_add_new_gc_form = False
+    st.session_state.selected_gc_membership_id = selected_data.id
+    st.session_state.confirm_delete_gc_membership_id = None
+    st.session_state.show_gc_delete_confirmation_form = False
+    st.session_state.gc_membership_form_key = f"gc_form_{datetime.now().timestamp()}"
+    st.session_state.gc_member_id_form = selected_data.member_id
+    st.session_state.gc_member_name_display = selected_data.member_name or ""
+    st.session_state.gc_plan_id_form = selected_data.plan_id
+    start_date_val = selected_data.start_date
+    if isinstance(start_date_val, str):
+        st.session_state.gc_start_date_form = datetime.strptime(
+            start_date_val, "%Y-%m-%d"
+        ).date()
+    elif isinstance(start_date_val, date):
+        st.session_state.gc_start_date_form = start_date_val
+    else:
+        st.session_state.gc_start_date_form = date.today()
+    st.session_state.gc_amount_paid_form = selected_data.amount_paid or 0.0
+
+
+def load_pt_membership_into_form(selected_pt_data: PTMembershipView) -> None:
+    """Populates the PT edit form from the selected membership row."""
+    st.session_state.show_add_new_pt_form = False
+    st.session_state.selected_pt_membership_id = selected_pt_data.membership_id
+    st.session_state.confirm_delete_pt_membership_id = None
+    st.session_state.show_pt_delete_confirmation_form = False
+    st.session_state.pt_membership_form_key = f"pt_form_{datetime.now().timestamp()}"
+    st.session_state.pt_member_id_form = selected_pt_data.member_id
+    st.session_state.pt_member_name_display = selected_pt_data.member_name or ""
+    purchase_date_val = selected_pt_data.purchase_date
+    if isinstance(purchase_date_val, str):
+        st.session_state.pt_purchase_date_form = datetime.strptime(
+            purchase_date_val[:10], "%Y-%m-%d"
+        ).date()
+    elif isinstance(purchase_date_val, date):
+        st.session_state.pt_purchase_date_form = purchase_date_val
+    else:
+        st.session_state.pt_purchase_date_form = date.today()
+    st.session_state.pt_amount_paid_form = selected_pt_data.amount_paid or 0.0
+    st.session_state.pt_sessions_purchased_form = selected_pt_data.sessions_total or 1
+    if hasattr(selected_pt_data, "notes") and "pt_notes_form" in st.session_state:
+        st.session_state.pt_notes_form = selected_pt_data.notes or ""
+
+
 def render_memberships_tab():
     st.header("Manage Memberships")
 
@@ -158,13 +393,16 @@ def render_memberships_tab():
 
         with right_col:
             st.subheader("Existing Group Class Memberships")
+            gc_next_cursor = None
             try:
-                all_gc_memberships = api.get_all_group_class_memberships_for_view(
+                gc_page = api.get_group_class_memberships_page_for_view(
+                    MEMBERSHIPS_PAGE_SIZE,
+                    after=current_page_cursor("gc_page_cursors"),
                     name_filter=st.session_state.get("gc_name_filter"),
                     status_filter=st.session_state.get("gc_status_filter"),
                 )
-                if not all_gc_memberships:
-                    all_gc_memberships = []
+                all_gc_memberships = gc_page.items
+                gc_next_cursor = gc_page.next_cursor
             except Exception as e:
                 st.error(f"Error fetching group class memberships: {e}")
                 all_gc_memberships = []
@@ -188,74 +426,27 @@ def render_memberships_tab():
                 ]
 
             if prepared_data_for_gc_table:
-                st.dataframe(prepared_data_for_gc_table, use_container_width=True, hide_index=True)
+                st.caption("Select a row to edit the membership.")
+                gc_table_event = st.dataframe(
+                    prepared_data_for_gc_table,
+                    use_container_width=True,
+                    hide_index=True,
+                    on_select="rerun",
+                    selection_mode="single-row",
+                    key=f"gc_memberships_table_{len(st.session_state.gc_page_cursors)}",
+                )
+                selected_gc = selected_table_row(gc_table_event, all_gc_memberships)
+                if selected_gc is None:
+                    st.session_state.gc_table_applied_id = None
+                elif selected_gc.id != st.session_state.gc_table_applied_id:
+                    # Only a newly selected row loads the form, so edits survive reruns
+                    st.session_state.gc_table_applied_id = selected_gc.id
+                    load_gc_membership_into_form(selected_gc)
             elif not all_gc_memberships: # Ensure message shows if fetch was successful but empty
                 st.info("No group class memberships found.")
-
-            st.markdown("---")
-            st.write("**Select a Membership to Edit:**") # Changed header slightly for clarity
-
-            # This part remains for individual selection and editing
-            if not all_gc_memberships and not prepared_data_for_gc_table: # Redundant check, but safe
-                pass # Already handled by st.info above
-
-            gc_membership_options = {
-                m.id: f"{m.member_name} - {m.plan_name}" for m in all_gc_memberships
-            }
-
-            for m in all_gc_memberships:
-                display_text = f"{m.member_name} - {m.plan_name} (Start: {m.start_date}) - ID: {m.id}"
-                st.markdown(display_text)
-                if st.button(f"Select##GC{m.id}", key=f"select_gc_{m.id}"):
-                    st.session_state.selected_gc_membership_id = m.id
-                    st.session_state.confirm_delete_gc_membership_id = None
-                    st.session_state.gc_membership_form_key = (
-                        f"gc_form_{datetime.now().timestamp()}"
-                    )
-                    selected_data = next(
-                        (mem for mem in all_gc_memberships if mem.id == m.id), None
-                    )
-                    if selected_data:
-                        st.session_state.gc_member_id_form = selected_data.member_id
-                        st.session_state.gc_member_name_display = (
-                            selected_data.member_name or ""
-                        )
-                        st.session_state.gc_plan_id_form = selected_data.plan_id
-                        start_date_val = selected_data.start_date
-                        if isinstance(start_date_val, str):
-                            st.session_state.gc_start_date_form = datetime.strptime(
-                                start_date_val, "%Y-%m-%d"
-                            ).date()
-                        elif isinstance(start_date_val, date):
-                            st.session_state.gc_start_date_form = start_date_val
-                        else:
-                            st.session_state.gc_start_date_form = date.today()
-                        st.session_state.gc_amount_paid_form = (
-                            selected_data.amount_paid or 0.0
-                        )
-                    else:
-                        st.error(
-                            "Selected membership data not found. Please try again."
-                        )
-                        st.session_state.selected_gc_membership_id = "add_new"
-                st.markdown("---")
+            render_page_controls("gc_page_cursors", gc_next_cursor)
 
         with left_col:
-            try:
-                all_members_gc_form_data = api.get_all_members_for_view()
-                active_members_gc_list = [
-                    member
-                    for member in all_members_gc_form_data
-                    if member.is_active == 1
-                ]
-                member_options_for_select = {
-                    member.id: f"{member.name} (ID: {member.id})"
-                    for member in active_members_gc_list
-                }
-            except Exception as e:
-                st.error(f"Error fetching members for GC form: {e}")
-                member_options_for_select = {}
-
             try:
                 all_group_plans_gc_form_data = api.get_all_group_plans_for_view()
                 plan_options_for_select = {
@@ -269,13 +460,10 @@ def render_memberships_tab():
 
             if st.session_state.get("show_add_new_gc_form", False):
                 st.subheader("Add New Group Class Membership")
+                # Outside the form, so the matches follow the typed prefix
+                new_gc_member = render_member_picker("Member", key="new_gc_member", active_only=True)
+                new_gc_member_id = new_gc_member.id if new_gc_member else None
                 with st.form(key="add_new_gc_membership_form", clear_on_submit=True):
-                    new_gc_member_id = st.selectbox(
-                        "Select Member",
-                        options=list(member_options_for_select.keys()),
-                        format_func=lambda id_val: member_options_for_select[id_val],
-                        key="new_gc_member_select",
-                    )
                     new_gc_plan_id = st.selectbox(
                         "Select Group Plan",
                         options=list(plan_options_for_select.keys()),
@@ -526,10 +714,13 @@ def render_memberships_tab():
 
         with pt_right_col:
             st.subheader("Existing Personal Training Memberships")
+            pt_next_cursor = None
             try:
-                all_pt_memberships = api.get_all_pt_memberships_for_view()
-                if not all_pt_memberships:
-                    all_pt_memberships = []
+                pt_page = api.get_pt_memberships_page_for_view(
+                    MEMBERSHIPS_PAGE_SIZE, after=current_page_cursor("pt_page_cursors")
+                )
+                all_pt_memberships = pt_page.items
+                pt_next_cursor = pt_page.next_cursor
             except Exception as e:
                 st.error(f"Error fetching PT memberships: {e}")
                 all_pt_memberships = []
@@ -550,96 +741,30 @@ def render_memberships_tab():
                 ]
 
             if prepared_data_for_pt_table:
-                st.dataframe(prepared_data_for_pt_table, use_container_width=True, hide_index=True)
+                st.caption("Select a row to edit the PT membership.")
+                pt_table_event = st.dataframe(
+                    prepared_data_for_pt_table,
+                    use_container_width=True,
+                    hide_index=True,
+                    on_select="rerun",
+                    selection_mode="single-row",
+                    key=f"pt_memberships_table_{len(st.session_state.pt_page_cursors)}",
+                )
+                selected_pt = selected_table_row(pt_table_event, all_pt_memberships)
+                if selected_pt is None:
+                    st.session_state.pt_table_applied_id = None
+                elif selected_pt.membership_id != st.session_state.pt_table_applied_id:
+                    st.session_state.pt_table_applied_id = selected_pt.membership_id
+                    load_pt_membership_into_form(selected_pt)
             elif not all_pt_memberships: # Ensure message shows if fetch was successful but empty
                 st.info("No Personal Training memberships found.")
-
-            st.markdown("---")
-            st.write("**Select a PT Membership to Edit:**") # Changed header slightly for clarity
-
-            # This part remains for individual selection and editing
-            if not all_pt_memberships and not prepared_data_for_pt_table: # Redundant, but safe
-                pass # Already handled
-
-            pt_membership_options = {
-                pt_m.membership_id: f"{pt_m.member_name} - Sessions: {pt_m.sessions_remaining}/{pt_m.sessions_total}"
-                for pt_m in all_pt_memberships
-            }
-
-            for pt_m in all_pt_memberships:
-                display_text = (
-                    f"{pt_m.member_name} - Total: {pt_m.sessions_total}, Rem: {pt_m.sessions_remaining} "
-                    f"(Purchased: {pt_m.purchase_date}) - ID: {pt_m.membership_id}"
-                )
-                st.markdown(display_text)
-                if st.button(
-                    f"Select##PT{pt_m.membership_id}",
-                    key=f"select_pt_{pt_m.membership_id}",
-                ):
-                    st.session_state.selected_pt_membership_id = pt_m.membership_id
-                    st.session_state.confirm_delete_pt_membership_id = None
-                    st.session_state.pt_membership_form_key = (
-                        f"pt_form_{datetime.now().timestamp()}"
-                    )
-                    selected_pt_data = next(
-                        (
-                            m_pt
-                            for m_pt in all_pt_memberships
-                            if m_pt.membership_id == pt_m.membership_id
-                        ),
-                        None,
-                    )  # Shadowing m
-                    if selected_pt_data:
-                        st.session_state.pt_member_id_form = selected_pt_data.member_id
-                        st.session_state.pt_member_name_display = (
-                            selected_pt_data.member_name or ""
-                        )
-                        purchase_date_val = selected_pt_data.purchase_date
-                        if isinstance(purchase_date_val, str):
-                            st.session_state.pt_purchase_date_form = datetime.strptime(
-                                purchase_date_val, "%Y-%m-%d"
-                            ).date()
-                        elif isinstance(purchase_date_val, date):
-                            st.session_state.pt_purchase_date_form = purchase_date_val
-                        else:
-                            st.session_state.pt_purchase_date_form = date.today()
-
-                        st.session_state.pt_amount_paid_form = (
-                            selected_pt_data.amount_paid or 0.0
-                        )
-                        st.session_state.pt_sessions_purchased_form = (
-                            selected_pt_data.sessions_total or 1
-                        )
-                        if (
-                            hasattr(selected_pt_data, "notes")
-                            and "pt_notes_form" in st.session_state
-                        ):
-                            st.session_state.pt_notes_form = (
-                                selected_pt_data.notes or ""
-                            )
-                    else:
-                        st.error("Selected PT membership data not found.")
-                        st.session_state.selected_pt_membership_id = "add_new"
-                st.markdown("---")
+            render_page_controls("pt_page_cursors", pt_next_cursor)
 
         with pt_left_col:
-            try:
-                all_members_pt_form_data = api.get_all_members_for_view()
-                active_members_pt_list = [
-                    member
-                    for member in all_members_pt_form_data
-                    if member.is_active == 1
-                ]
-                member_options_for_pt_select = {
-                    member.id: f"{member.name} (ID: {member.id})"
-                    for member in active_members_pt_list
-                }
-            except Exception as e:
-                st.error(f"Error fetching members for PT form: {e}")
-                member_options_for_pt_select = {}
-
             if st.session_state.get("show_add_new_pt_form", False):
                 st.subheader("Add New PT Membership")
+                new_pt_member = render_member_picker("Member", key="new_pt_member", active_only=True)
+                new_pt_member_id = new_pt_member.id if new_pt_member else None
                 with st.form(
                     key=st.session_state.get(
                         "pt_add_form_key",
@@ -647,12 +772,6 @@ def render_memberships_tab():
                     ),
                     clear_on_submit=True,
                 ):
-                    new_pt_member_id = st.selectbox(
-                        "Select Member",
-                        options=list(member_options_for_pt_select.keys()),
-                        format_func=lambda id_val: member_options_for_pt_select[id_val],
-                        key="new_pt_member_select",
-                    )
                     new_pt_purchase_date = st.date_input(
                         "Purchase Date", value=date.today(), key="new_pt_purchase_date"
                     )
@@ -890,49 +1009,18 @@ def render_members_tab():
     left_col, right_col = st.columns([2.33, 1]) # Table/List on left (70%), Form on right (30%)
     with left_col:
         st.subheader("All Members")
-        try:
-            all_members = api.get_all_members_for_view()
-            if not all_members:
-                st.info("No members found. Add a member using the form on the right.")
-                all_members = []
-        except Exception as e:
-            st.error(f"Error fetching members: {e}")
-            all_members = []
-
-        member_options = {
-            member.id: f"{member.name} ({member.phone or 'N/A'})"
-            for member in all_members
-        }
-        member_options_list = [None] + list(member_options.keys())
-
-        def format_func_member(member_id):
-            if member_id is None:
-                return "➕ Add New Member"
-            return member_options.get(member_id, "Unknown Member")
-
-        selected_id_display = st.selectbox(
-            "Select Member (or Add New)",
-            options=member_options_list,
-            format_func=format_func_member,
-            key="member_select_widget",
-            index=(
-                member_options_list.index(st.session_state.member_selected_id)
-                if st.session_state.member_selected_id in member_options_list
-                else 0
-            ),
+        selected_member = render_member_picker(
+            "Member",
+            key="member_picker",
+            selected_id=st.session_state.member_selected_id,
+            none_label="➕ Add New Member",
         )
+        selected_id_display = selected_member.id if selected_member else None
         if selected_id_display != st.session_state.member_selected_id:
             st.session_state.member_selected_id = selected_id_display
             st.session_state.confirm_delete_member_id = None
             if st.session_state.member_selected_id is not None:
-                selected_member_data = next(
-                    (
-                        m
-                        for m in all_members
-                        if m.id == st.session_state.member_selected_id
-                    ),
-                    None,
-                )
+                selected_member_data = selected_member
                 if selected_member_data:
                     st.session_state.member_name = selected_member_data.name or ""
                     st.session_state.member_email = selected_member_data.email or ""
@@ -956,8 +1044,7 @@ def render_members_tab():
             else:
                 clear_member_form(clear_selection=False)
 
-        # Display all members in a table
-        if all_members:
+        def render_member_table(members):
             member_data_for_table = [
                 {
                     "ID": m.id,
@@ -967,11 +1054,37 @@ def render_members_tab():
                     "Join Date": m.join_date, # Ensure this is a string or date object
                     "Active": "Yes" if m.is_active else "No",
                 }
-                for m in all_members
+                for m in members
             ]
             st.dataframe(member_data_for_table, use_container_width=True, hide_index=True)
-        # The 'st.info("No members found...")' is already present if all_members is empty,
-        # so no need to duplicate it here. The initial fetch handles the case of no members.
+
+        # Display the best search matches, or else members one page at a time
+        member_search = st.text_input(
+            "Search Members", key="member_search_query", placeholder="Name, phone or email"
+        )
+        if member_search.strip():
+            try:
+                matches = api.search_members(member_search, limit=MEMBER_SEARCH_LIMIT)
+            except Exception as e:
+                st.error(f"Error searching members: {e}")
+                matches = []
+            if matches:
+                render_member_table(matches)
+            else:
+                st.info(f"No members match '{member_search.strip()}'.")
+        else:
+            try:
+                members_page = api.get_members_page_for_view(
+                    MEMBERS_PAGE_SIZE, after=current_page_cursor("members_page_cursors")
+                )
+            except Exception as e:
+                st.error(f"Error fetching members page: {e}")
+                members_page = None
+            if members_page is not None and members_page.items:
+                render_member_table(members_page.items)
+                render_page_controls("members_page_cursors", members_page.next_cursor)
+            elif members_page is not None:
+                st.info("No members found. Add a member using the form on the right.")
 
 
     with right_col:
@@ -1379,8 +1492,6 @@ def render_reporting_tab():
     if st.button("Generate Monthly Financial Report", key="generate_financial_report"):
         # Use the value from session state, which is synced with the widget
         start_date_financial = st.session_state.report_month_financial
-        import calendar
-
         last_day = calendar.monthrange(
             start_date_financial.year, start_date_financial.month
         )[1]
@@ -1418,8 +1529,22 @@ def render_reporting_tab():
             label=f"Total Income for {st.session_state.report_month_financial.strftime('%B %Y')}",
             value=f"₹{total_income:.2f}",
         )
+        revenue_by_type = summary_data.get("by_type", {})
+        if revenue_by_type:
+            group_col, pt_col = st.columns(2)
+            for col, line_type, label in (
+                (group_col, "group", "Group Classes"),
+                (pt_col, "pt", "Personal Training"),
+            ):
+                entry = revenue_by_type.get(line_type, {"count": 0, "revenue": 0.0})
+                col.metric(
+                    label=f"{label} ({entry['count']} sold)",
+                    value=f"₹{entry['revenue']:.2f}",
+                )
 
         if details_data:  # Only show dataframe and download if details exist
+            import pandas as pd  # Deferred so pages without a report never load pandas/openpyxl
+
             df_financial = pd.DataFrame(details_data)
             st.dataframe(
                 df_financial,
@@ -1437,20 +1562,12 @@ def render_reporting_tab():
                     "item_name": "Item/Plan Name",
                 },
             )
-            # Excel Download
-            output_excel = io.BytesIO()  # Renamed to avoid conflict
-            with pd.ExcelWriter(
-                output_excel, engine="openpyxl"
-            ) as writer:  # Use renamed
-                df_financial.to_excel(
-                    writer, index=False, sheet_name="Financial Report"
-                )
-            excel_data = output_excel.getvalue()
-            st.download_button(
-                label="Download Financial Report as Excel",
-                data=excel_data,  # Use the new variable name
-                file_name=f"financial_report_{st.session_state.report_month_financial.strftime('%Y_%m')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            report_month = st.session_state.report_month_financial
+            render_financial_report_downloads(
+                report_month,
+                date(report_month.year, report_month.month, calendar.monthrange(report_month.year, report_month.month)[1]),
+                f"financial_report_{report_month.strftime('%Y_%m')}",
+                key="financial_report_download",
             )
         # If no details but there was a summary (e.g. total income > 0 but no line items)
         elif total_income > 0:  # total_income is already calculated
@@ -1460,6 +1577,77 @@ def render_reporting_tab():
         # If financial_report_output exists but was empty (already handled by "No financial data found" above)
     st.divider()
 
+    st.subheader("Revenue Trend")
+    trend_cols = st.columns(3)
+    trend_start = trend_cols[0].date_input(
+        "From", value=st.session_state.report_trend_start, key="financial_trend_start"
+    )
+    trend_end = trend_cols[1].date_input(
+        "To", value=st.session_state.report_trend_end, key="financial_trend_end"
+    )
+    trend_granularity = trend_cols[2].selectbox(
+        "Group by",
+        options=["day", "week", "month"],
+        index=2,
+        format_func=str.capitalize,
+        key="financial_trend_granularity",
+    )
+    if (trend_start, trend_end) != (
+        st.session_state.report_trend_start,
+        st.session_state.report_trend_end,
+    ):
+        st.session_state.report_trend_start = trend_start
+        st.session_state.report_trend_end = trend_end
+        st.session_state.financial_series_output = None
+
+    if st.button("Show Revenue Trend", key="generate_financial_series"):
+        if trend_start > trend_end:
+            st.error("The 'From' date must not be after the 'To' date.")
+            st.session_state.financial_series_output = None
+        else:
+            try:
+                st.session_state.financial_series_output = api.generate_financial_report_series(
+                    start_date=trend_start.strftime("%Y-%m-%d"),
+                    end_date=trend_end.strftime("%Y-%m-%d"),
+                    granularity=trend_granularity,
+                )
+            except Exception as e:
+                st.error(f"Error generating revenue trend: {e}")
+                st.session_state.financial_series_output = None
+
+    series = st.session_state.financial_series_output
+    if series:
+        if not any(series["total"]):
+            st.info("No revenue in the selected range.")
+        else:
+            import pandas as pd  # Deferred, as for the financial report above
+
+            period_index = pd.to_datetime(series["periods"])
+            st.bar_chart(
+                pd.DataFrame(
+                    {
+                        "Group Classes": series["by_type"]["group"],
+                        "Personal Training": series["by_type"]["pt"],
+                    },
+                    index=period_index,
+                ),
+                y_label="Revenue (₹)",
+            )
+            if series["by_plan"]:
+                with st.expander("Group class revenue by plan"):
+                    st.line_chart(
+                        pd.DataFrame(series["by_plan"], index=period_index),
+                        y_label="Revenue (₹)",
+                    )
+            st.caption("Every purchase in the selected range:")
+            render_financial_report_downloads(
+                trend_start,
+                trend_end,
+                f"financial_report_{trend_start.strftime('%Y_%m_%d')}_to_{trend_end.strftime('%Y_%m_%d')}",
+                key="financial_trend_download",
+            )
+    st.divider()
+
     st.subheader("Upcoming Membership Renewals")
     if st.button("Generate Upcoming Renewals Report", key="generate_renewals_report"):
         try:
@@ -1481,6 +1669,8 @@ def render_reporting_tab():
 
     # Display logic based on session state
     if st.session_state.renewals_report_data:  # Check if data (even empty list) exists
+        import pandas as pd  # Deferred, as for the financial report above
+
         df_renewals = pd.DataFrame(st.session_state.renewals_report_data)
         st.dataframe(
             df_renewals,
@@ -1506,6 +1696,50 @@ def render_reporting_tab():
         st.session_state.renewals_report_data == []
     ):  # Explicitly check for empty list if already fetched
         st.info("No upcoming group class renewals found (e.g., in the next 30 days).")
+    st.divider()
+
+    st.subheader("Data Export")
+    export_tables = {
+        "members": "Members",
+        "group_class_memberships": "Group Class Memberships",
+        "pt_memberships": "PT Memberships",
+    }
+    export_table = st.selectbox(
+        "Table", options=list(export_tables), format_func=export_tables.get, key="data_export_table"
+    )
+    render_export_downloads(
+        lambda export_format, output: api.export_table(export_table, export_format, output),
+        f"{export_table}_{date.today().strftime('%Y_%m_%d')}",
+        key="data_export_download",
+    )
+
+
+def render_query_diagnostics():
+    """Per-method database latency; only shown when the page is opened with ?diagnostics=1."""
+    with st.expander("Query Diagnostics", expanded=True):
+        st.caption(
+            f"Calls slower than {api.db_manager.stats.slow_query_ms:g} ms are written to {SLOW_QUERY_LOG_FILE}. "
+            "Percentiles are accurate to within about 19%."
+        )
+        first_page_seconds = launch_timings().get("first_page_seconds")
+        if first_page_seconds is not None:
+            st.caption(f"Time to first page after launch: {first_page_seconds:.2f}s")
+        query_stats = api.get_query_stats()
+        if query_stats:
+            st.dataframe(
+                query_stats,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    column: st.column_config.NumberColumn(format="%.2f")
+                    for column in ("mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms")
+                },
+            )
+        else:
+            st.info("No database calls recorded yet.")
+        if st.button("Reset Statistics", key="query_diagnostics_reset"):
+            api.reset_query_stats()
+            st.rerun()
 
 
 tab_titles = ["Members", "Group Plans", "Memberships", "Reporting"]
@@ -1522,3 +1756,8 @@ with tab_memberships:
 
 with tab_reporting:
     render_reporting_tab()
+
+if st.query_params.get("diagnostics") == "1":
+    render_query_diagnostics()
+
+report_time_to_first_page()
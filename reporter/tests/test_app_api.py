@@ -0,0 +1,236 @@
+import csv
+import io
+
+import pytest
+from openpyxl import load_workbook
+
+from reporter.app_api import AppAPI, QueryCache
+from reporter.database import create_database
+from reporter.database_manager import DatabaseManager
+
+
+@pytest.fixture
+def api() -> AppAPI:
+    conn = create_database(":memory:")
+    api = AppAPI(db_manager=DatabaseManager(connection=conn))
+    yield api
+    conn.close()
+
+
+@pytest.fixture
+def executed_sql(api: AppAPI):
+    statements = []
+    api.db_manager.conn.set_trace_callback(statements.append)
+    yield statements
+    api.db_manager.conn.set_trace_callback(None)
+
+
+def _select_count(statements):
+    return sum(1 for sql in statements if sql.lstrip().upper().startswith("SELECT"))
+
+
+def test_repeated_view_reads_hit_database_once(api: AppAPI, executed_sql):
+    api.add_member(name="Cache Member", email="c@example.com", phone="4000", join_date="2024-01-01")
+    api.add_group_plan(name="Monthly", duration_days=30, default_amount=1000.0)
+    executed_sql.clear()
+
+    for _ in range(3):
+        api.get_all_members_for_view()
+        api.get_all_group_plans_for_view()
+        api.get_all_group_class_memberships_for_view(name_filter=None, status_filter=None)
+        api.get_all_pt_memberships_for_view()
+    assert _select_count(executed_sql) == 4
+
+    executed_sql.clear()
+    api.get_all_members_for_view()
+    api.get_all_pt_memberships_for_view()
+    assert executed_sql == []
+
+
+def test_writes_invalidate_dependent_queries(api: AppAPI, executed_sql):
+    member = api.add_member(name="Before", email=None, phone="4001", join_date="2024-01-01")
+    plan = api.add_group_plan(name="Monthly", duration_days=30, default_amount=1000.0)
+    api.create_group_class_membership(
+        member_id=member.id, plan_id=plan.id, start_date="2024-01-01",
+        amount_paid=1000.0, purchase_date="2024-01-01",
+    )
+    api.get_all_group_class_memberships_for_view()
+    api.get_all_group_plans_for_view()
+
+    api.update_member(member_id=member.id, name="After")
+    executed_sql.clear()
+
+    views = api.get_all_group_class_memberships_for_view()
+    assert [v.member_name for v in views] == ["After"]
+    assert _select_count(executed_sql) == 1
+
+    # group_plans was not touched by the member update, so it is still cached.
+    executed_sql.clear()
+    api.get_all_group_plans_for_view()
+    assert executed_sql == []
+
+
+def test_cache_keys_include_filters(api: AppAPI):
+    member = api.add_member(name="Filter Member", email=None, phone="4002", join_date="2024-01-01")
+    plan = api.add_group_plan(name="Monthly", duration_days=30, default_amount=1000.0)
+    api.create_group_class_membership(
+        member_id=member.id, plan_id=plan.id, start_date="2024-01-01",
+        amount_paid=1000.0, purchase_date="2024-01-01",
+    )
+    assert len(api.get_all_group_class_memberships_for_view(name_filter="Filter")) == 1
+    assert api.get_all_group_class_memberships_for_view(name_filter="Nobody") == []
+
+
+def test_cache_is_bounded_and_drops_stale_entries():
+    cache = QueryCache(max_entries=2)
+    for key in ("a", "b"):
+        cache.get_or_load(key, ("members",), lambda: [key])
+    cache.get_or_load("a", ("members",), lambda: pytest.fail("a should be cached"))
+    cache.get_or_load("c", ("group_plans",), lambda: ["c"])
+    # "b" was least recently used, so it made room for "c"
+    assert len(cache) == 2
+    assert cache.get_or_load("b", ("members",), lambda: ["reloaded"]) == ["reloaded"]
+
+    cache.invalidate(["members"])
+    assert len(cache) == 1  # Only the group_plans entry is still current
+
+
+def test_cached_results_are_copies(api: AppAPI):
+    api.add_member(name="Copy Member", email=None, phone="4004", join_date="2024-01-01")
+    page = api.get_members_page_for_view(10)
+    page.items.clear()
+    report = api.generate_financial_report("2024-03-01", "2024-03-31")
+    report["summary"]["total_revenue"] = -1
+    assert len(api.get_members_page_for_view(10).items) == 1
+    assert api.generate_financial_report("2024-03-01", "2024-03-31")["summary"]["total_revenue"] == 0
+
+
+def test_financial_report_lines_and_breakdown(api: AppAPI, executed_sql):
+    member = api.add_member(name="Report Member", email=None, phone="4003", join_date="2024-01-01")
+    plan = api.add_group_plan(name="Monthly", duration_days=30, default_amount=1000.0)
+    api.create_group_class_membership(
+        member_id=member.id, plan_id=plan.id, start_date="2024-03-05",
+        amount_paid=999.5, purchase_date="2024-03-05",
+    )
+    api.create_pt_membership(member_id=member.id, purchase_date="2024-03-01", amount_paid=0.5, sessions_total=8)
+    executed_sql.clear()
+
+    report = api.generate_financial_report("2024-03-01", "2024-03-31")
+    assert [(line["type"], line["item_name"], line["amount_paid"]) for line in report["details"]] == [
+        ("pt", "8 PT Sessions", 0.5),
+        ("group", "Monthly", 999.5),
+    ]
+    assert report["summary"]["total_revenue"] == 1000.0
+    assert report["summary"]["by_type"] == {
+        "group": {"count": 1, "revenue": 999.5},
+        "pt": {"count": 1, "revenue": 0.5},
+    }
+    assert report["summary"]["by_plan"] == [
+        {"plan_id": plan.id, "plan_name": "Monthly", "count": 1, "revenue": 999.5}
+    ]
+    # One query for the lines and one for the totals
+    assert _select_count(executed_sql) == 2
+
+
+def test_revenue_totals_by_quarter_follow_writes(api: AppAPI):
+    member = api.add_member(name="Quarter Member", email=None, phone="4004", join_date="2024-01-01")
+    plan = api.add_group_plan(name="Monthly", duration_days=30, default_amount=1000.0)
+    api.create_group_class_membership(
+        member_id=member.id, plan_id=plan.id, start_date="2024-02-01",
+        amount_paid=1000.0, purchase_date="2024-02-01",
+    )
+    api.create_pt_membership(member_id=member.id, purchase_date="2024-03-15", amount_paid=250.25, sessions_total=4)
+    assert api.get_revenue_totals("2024-01-01", "2024-12-31", period="quarter") == [
+        {
+            "period": "2024-Q1",
+            "count": 2,
+            "total_revenue": 1250.25,
+            "by_type": {"group": {"count": 1, "revenue": 1000.0}, "pt": {"count": 1, "revenue": 250.25}},
+        }
+    ]
+
+    api.create_pt_membership(member_id=member.id, purchase_date="2024-07-01", amount_paid=100.0, sessions_total=2)
+    totals = api.get_revenue_totals("2024-01-01", "2024-12-31", period="quarter")
+    assert [(entry["period"], entry["total_revenue"]) for entry in totals] == [("2024-Q1", 1250.25), ("2024-Q3", 100.0)]
+    assert api.check_revenue_rollup() == 0
+
+
+def test_financial_report_series_is_dense_and_single_query(api: AppAPI, executed_sql):
+    member = api.add_member(name="Series Member", email=None, phone="4005", join_date="2024-01-01")
+    gold = api.add_group_plan(name="Gold", duration_days=30, default_amount=1000.0)
+    silver = api.add_group_plan(name="Silver", duration_days=30, default_amount=500.0)
+    api.create_group_class_membership(
+        member_id=member.id, plan_id=gold.id, start_date="2024-01-15", amount_paid=1000.0, purchase_date="2024-01-15",
+    )
+    api.create_group_class_membership(
+        member_id=member.id, plan_id=silver.id, start_date="2024-03-31", amount_paid=500.0, purchase_date="2024-03-31",
+    )
+    api.create_pt_membership(member_id=member.id, purchase_date="2024-03-04", amount_paid=200.0, sessions_total=4)
+    executed_sql.clear()
+
+    monthly = api.generate_financial_report_series("2024-01-10", "2024-04-20", granularity="month")
+    assert _select_count(executed_sql) == 1
+    assert monthly == {
+        "granularity": "month",
+        "periods": ["2024-01-01", "2024-02-01", "2024-03-01", "2024-04-01"],
+        "total": [1000.0, 0.0, 700.0, 0.0],
+        "by_type": {"group": [1000.0, 0.0, 500.0, 0.0], "pt": [0.0, 0.0, 200.0, 0.0]},
+        "by_plan": {"Gold - 30 days": [1000.0, 0.0, 0.0, 0.0], "Silver - 30 days": [0.0, 0.0, 500.0, 0.0]},
+    }
+
+    # Weeks start on Monday: 2024-03-04 is a Monday, 2024-03-31 a Sunday
+    weekly = api.generate_financial_report_series("2024-03-01", "2024-03-31", granularity="week")
+    assert weekly["periods"] == ["2024-02-26", "2024-03-04", "2024-03-11", "2024-03-18", "2024-03-25"]
+    assert weekly["total"] == [0.0, 200.0, 0.0, 0.0, 500.0]
+
+    with pytest.raises(ValueError):
+        api.generate_financial_report_series("2024-01-01", "2024-12-31", granularity="year")
+
+
+@pytest.mark.parametrize("export_format", ["csv", "xlsx"])
+def test_export_financial_report_streams_report_lines(api: AppAPI, export_format):
+    member = api.add_member(name="Export Member", email=None, phone="4006", join_date="2024-01-01")
+    plan = api.add_group_plan(name="Monthly", duration_days=30, default_amount=1000.0)
+    api.create_group_class_membership(
+        member_id=member.id, plan_id=plan.id, start_date="2023-06-01", amount_paid=999.5, purchase_date="2023-06-01",
+    )
+    api.create_pt_membership(member_id=member.id, purchase_date="2024-03-01", amount_paid=250.0, sessions_total=8)
+
+    stream = io.BytesIO()
+    assert api.export_financial_report("2023-01-01", "2024-12-31", export_format, stream) == 2
+    if export_format == "csv":
+        rows = list(csv.reader(io.StringIO(stream.getvalue().decode("utf-8-sig"))))[1:]
+        assert rows == [
+            ["2023-06-01", "999.5", "group", "Export Member", "Monthly"],
+            ["2024-03-01", "250.0", "pt", "Export Member", "8 PT Sessions"],
+        ]
+    else:
+        stream.seek(0)
+        rows = list(load_workbook(stream)["Financial Report"].iter_rows(min_row=2, values_only=True))
+        assert rows == [
+            ("2023-06-01", 999.5, "group", "Export Member", "Monthly"),
+            ("2024-03-01", 250, "pt", "Export Member", "8 PT Sessions"),
+        ]
+
+    with pytest.raises(ValueError):
+        api.export_financial_report("2023-01-01", "2024-12-31", "pdf", io.BytesIO())
+
+
+def test_export_table_streams_view_rows(api: AppAPI):
+    member = api.add_member(name="Table Member", email="t@example.com", phone="4007", join_date="2024-01-01")
+    api.create_pt_membership(member_id=member.id, purchase_date="2024-03-01", amount_paid=250.5, sessions_total=8)
+
+    stream = io.BytesIO()
+    assert api.export_table("pt_memberships", "csv", stream) == 1
+    lines = list(csv.reader(io.StringIO(stream.getvalue().decode("utf-8-sig"))))
+    assert lines[0] == ["Membership ID", "Member Name", "Purchase Date", "Sessions Total", "Sessions Remaining", "Amount Paid (₹)"]
+    assert lines[1][1:] == ["Table Member", "2024-03-01", "8", "8", "250.5"]
+
+    stream = io.BytesIO()
+    assert api.export_table("members", "xlsx", stream) == 1
+    stream.seek(0)
+    rows = list(load_workbook(stream)["Members"].iter_rows(min_row=2, values_only=True))
+    assert rows == [(member.id, "Table Member", "4007", "t@example.com", "2024-01-01", True)]
+
+    with pytest.raises(ValueError):
+        api.export_table("group_plans", "csv", io.BytesIO())
@@ -0,0 +1,84 @@
+import json
+from datetime import date
+
+from reporter import migrate_historical_data
+from reporter.benchmarks import suite
+from reporter.benchmarks.generator import (
+    GeneratorConfig,
+    generate_members,
+    load_into_database,
+    write_source_csvs,
+)
+from reporter.database import create_database
+from reporter.database_manager import DatabaseManager
+
+CONFIG = GeneratorConfig(members=40, years=3, seed=7)
+
+
+def _totals(conn):
+    return {
+        table: tuple(conn.execute(f"SELECT COUNT(*), SUM(amount_paid) FROM {table}").fetchone())
+        for table in ("group_class_memberships", "pt_memberships")
+    }
+
+
+def test_generator_is_deterministic_with_renewal_chains():
+    histories = list(generate_members(CONFIG))
+    assert histories == list(generate_members(CONFIG))
+    assert histories != list(generate_members(GeneratorConfig(members=40, years=3, seed=8)))
+
+    assert any(len(history.memberships) > 1 for history in histories)
+    for history in histories:
+        types = [membership[5] for membership in history.memberships]
+        assert types[0] == "New" and set(types[1:]) <= {"Renewal"}
+        # Each renewal starts after the previous membership ended
+        for previous, current in zip(history.memberships, history.memberships[1:]):
+            assert current[1] > previous[2]
+        assert all(CONFIG.start_date.isoformat() <= membership[1] <= CONFIG.end_date.isoformat()
+                   for membership in history.memberships)
+
+
+def test_generated_csvs_migrate_to_the_directly_loaded_data(tmp_path):
+    direct = create_database(":memory:")
+    counts = load_into_database(direct, CONFIG)
+    assert counts["members"] == CONFIG.members
+    assert DatabaseManager(connection=direct).check_revenue_rollup(repair=False) == 0
+
+    gc_csv, pt_csv = write_source_csvs(str(tmp_path), CONFIG)
+    migrated = create_database(":memory:")
+    gc_df = migrate_historical_data.read_source_csv(gc_csv)
+    pt_df = migrate_historical_data.read_source_csv(pt_csv)
+    earliest_start_dates = migrate_historical_data.collect_earliest_start_dates(gc_df, pt_df)
+    db_manager = DatabaseManager(connection=migrated)
+    processed_members: dict = {}
+    assert migrate_historical_data.migrate_gc_data(db_manager, processed_members, earliest_start_dates, gc_df) == (
+        counts["group_class_memberships"], 0,
+    )
+    assert migrate_historical_data.migrate_pt_data(db_manager, processed_members, earliest_start_dates, pt_df) == (
+        counts["pt_memberships"], 0,
+    )
+    assert _totals(migrated) == _totals(direct)
+
+
+def test_suite_times_every_app_api_method(tmp_path):
+    results = suite.run_suite(["120"], rounds=1, work_dir=str(tmp_path))
+    json.dumps(results)  # The results document must serialize as-is
+
+    app_api_benchmarks = {
+        bench["name"].split("[")[0] for bench in results["benchmarks"] if bench["group"] == "app_api"
+    }
+    assert app_api_benchmarks == set(suite.public_app_api_methods())
+    groups = {bench["group"] for bench in results["benchmarks"]}
+    assert groups == {"app_api", "reports", "migration"}
+    bench = results["benchmarks"][0]
+    assert bench["params"]["end_date"] == date.today().replace(day=1).isoformat()
+    assert set(bench["stats"]) >= {"min", "max", "mean", "median", "stddev", "rounds"}
+
+
+def test_compare_results_flags_slower_medians():
+    def results(median):
+        return {"benchmarks": [{"fullname": "app_api::add_member[1k]", "stats": {"median": median}}]}
+
+    assert suite.compare_results(results(0.010), results(0.012), tolerance=0.25) == []
+    regressions = suite.compare_results(results(0.010), results(0.013), tolerance=0.25)
+    assert len(regressions) == 1 and "app_api::add_member[1k]" in regressions[0]
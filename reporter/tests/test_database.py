@@ -0,0 +1,326 @@
+import threading
+
+import pytest
+
+from reporter.database import (
+    BUSY_TIMEOUT_MS,
+    CACHE_SIZE_KIB,
+    MMAP_SIZE_BYTES,
+    SCHEMA_VERSION,
+    ConnectionPool,
+    create_database,
+    get_connection,
+    migrate_schema,
+    open_database,
+    schema_is_current,
+)
+from reporter import database
+from reporter.benchmarks.pool_throughput import run_mixed_workload
+from reporter.database_manager import DatabaseManager
+from reporter.models import GroupPlan, Member, PTMembership
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "factory_test.db")
+    create_database(path).close()
+    return path
+
+
+def test_get_connection_applies_pragmas(db_path):
+    conn = get_connection(db_path)
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == BUSY_TIMEOUT_MS
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -CACHE_SIZE_KIB
+        assert conn.execute("PRAGMA mmap_size").fetchone()[0] == MMAP_SIZE_BYTES
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+    finally:
+        conn.close()
+
+
+def test_reader_not_blocked_by_open_write_transaction(db_path):
+    writer = get_connection(db_path)
+    reader = get_connection(db_path)
+    try:
+        writer.execute(
+            "INSERT INTO members (name, phone, email, join_date, is_active) VALUES ('Committed', '1', NULL, '2024-01-01', 1)"
+        )
+        writer.commit()
+
+        # Leave a write transaction open; under WAL the reader still sees the last commit.
+        writer.execute(
+            "INSERT INTO members (name, phone, email, join_date, is_active) VALUES ('Pending', '2', NULL, '2024-01-01', 1)"
+        )
+        names = [row[0] for row in reader.execute("SELECT name FROM members")]
+        assert names == ["Committed"]
+        writer.commit()
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_pool_readers_finish_while_the_writer_is_held(db_path):
+    pool = ConnectionPool(db_path, readers=4)
+    db_manager = DatabaseManager(pool=pool)
+    readers = 4
+    try:
+        member = db_manager.add_member(
+            Member(id=None, name="Committed", phone="900", email=None, join_date="2024-01-01", is_active=True)
+        )
+        writer_held = threading.Event()
+        release_writer = threading.Event()
+        seen = []
+        errors = []
+
+        def hold_writer():
+            with pool.writer() as conn:
+                conn.execute(
+                    "INSERT INTO members (name, phone, email, join_date, is_active) VALUES ('Pending', '901', NULL, '2024-01-01', 1)"
+                )
+                writer_held.set()
+                release_writer.wait(timeout=5)
+                conn.rollback()
+
+        def read():
+            try:
+                writer_held.wait(timeout=5)
+                seen.append([view.name for view in db_manager.get_all_members_for_view()])
+            except Exception as exc:  # Collected so the main thread can report it
+                errors.append(exc)
+
+        writer = threading.Thread(target=hold_writer)
+        writer.start()
+        reader_threads = [threading.Thread(target=read) for _ in range(readers)]
+        for thread in reader_threads:
+            thread.start()
+        for thread in reader_threads:
+            thread.join(timeout=10)
+        # The readers finished while the writer still held its lock and an open transaction
+        assert not any(thread.is_alive() for thread in reader_threads) and writer.is_alive()
+        release_writer.set()
+        writer.join(timeout=5)
+
+        assert errors == []
+        assert seen == [[member.name]] * readers  # Only committed rows are visible
+    finally:
+        pool.close()
+
+
+def test_pool_concurrent_mixed_reads_and_writes(db_path):
+    pool = ConnectionPool(db_path, readers=4)
+    db_manager = DatabaseManager(pool=pool)
+    try:
+        member = db_manager.add_member(
+            Member(id=None, name="Stress", phone="999", email=None, join_date="2024-01-01", is_active=True)
+        )
+        errors, _ = run_mixed_workload(db_manager, member.id, threads=8, iterations=40)
+        assert errors == []  # No cursor-state or locking errors in any thread
+        # 8 threads x 10 writes each, each with its own id
+        memberships = db_manager.get_all_pt_memberships()
+        assert len(memberships) == 80 and len({m.id for m in memberships}) == 80
+        with pool.reader() as conn:
+            assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+            assert conn.execute("PRAGMA foreign_key_check").fetchall() == []
+    finally:
+        pool.close()
+
+
+def test_half_consumed_iterator_does_not_block_pooled_writes(db_path):
+    pool = ConnectionPool(db_path, readers=2)
+    db_manager = DatabaseManager(pool=pool)
+    try:
+        for n in range(3):
+            db_manager.add_member(
+                Member(id=None, name=f"Streamed {n}", phone=f"70{n}", email=None, join_date="2024-01-01", is_active=True)
+            )
+        members = db_manager.iter_members_for_view(batch_size=1)
+        assert next(members).name == "Streamed 0"  # Suspended holding a reader connection
+
+        added = []
+        writer = threading.Thread(
+            target=lambda: added.append(
+                db_manager.add_member(
+                    Member(id=None, name="Written", phone="799", email=None, join_date="2024-01-01", is_active=True)
+                )
+            )
+        )
+        writer.start()
+        writer.join(timeout=5)
+        assert not writer.is_alive() and added[0].id is not None
+
+        # The iterator reads its own snapshot, then hands its connection back when closed
+        assert [member.name for member in members] == ["Streamed 1", "Streamed 2"]
+        members.close()
+        assert len(db_manager.get_all_members()) == 4
+    finally:
+        pool.close()
+
+
+def test_pooled_manager_requires_checkout_for_conn(db_path):
+    pool = ConnectionPool(db_path, readers=1)
+    try:
+        db_manager = DatabaseManager(pool=pool)
+        with pytest.raises(RuntimeError):
+            db_manager.conn
+    finally:
+        pool.close()
+
+
+def test_open_database_skips_schema_setup_when_current(tmp_path):
+    path = str(tmp_path / "schema_test.db")
+    assert not schema_is_current(path)
+
+    conn = open_database(path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    conn.execute(
+        "INSERT INTO members (name, phone, email, join_date, is_active) VALUES ('Kept', '1', NULL, '2024-01-01', 1)"
+    )
+    conn.execute(
+        "INSERT INTO group_plans (name, duration_days, default_amount, display_name) VALUES ('Monthly', 30, 100, 'Monthly - 30 days')"
+    )
+    conn.execute(
+        "INSERT INTO group_class_memberships (member_id, plan_id, start_date, end_date, amount_paid, purchase_date, membership_type) "
+        "VALUES (1, 1, '2024-01-01', '2024-01-30', 100, '2024-01-01', 'New')"
+    )
+    conn.commit()
+    conn.close()
+    assert schema_is_current(path)
+
+    conn = open_database(path)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM group_class_memberships").fetchone()[0] == 1
+        conn.execute("PRAGMA user_version = 0")
+    finally:
+        conn.close()
+    assert not schema_is_current(path)
+
+
+def test_create_database_records_each_migration_with_timing(tmp_path):
+    conn = create_database(str(tmp_path / "fresh.db"))
+    try:
+        rows = conn.execute("SELECT version, description, duration_ms FROM schema_migrations ORDER BY version").fetchall()
+        assert [row[0] for row in rows] == list(range(1, SCHEMA_VERSION + 1))
+        assert all(row[1] and row[2] >= 0 for row in rows)
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        assert migrate_schema(conn) == []  # Nothing left to apply
+    finally:
+        conn.close()
+
+
+LEGACY_LAYOUT = [
+    "CREATE TABLE members (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, phone TEXT, email TEXT, join_date TEXT, is_active BOOLEAN DEFAULT TRUE)",
+    "CREATE TABLE group_plans (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE, display_name TEXT, default_amount REAL, duration_days INTEGER, is_active BOOLEAN DEFAULT TRUE)",
+    "CREATE TABLE group_class_memberships (id INTEGER PRIMARY KEY AUTOINCREMENT, member_id INTEGER NOT NULL, plan_id INTEGER NOT NULL, start_date TEXT, end_date TEXT, purchase_date TEXT, membership_type TEXT, amount_paid REAL, is_active BOOLEAN DEFAULT TRUE, FOREIGN KEY (member_id) REFERENCES members (id), FOREIGN KEY (plan_id) REFERENCES group_plans (id))",
+    "CREATE TABLE pt_memberships (membership_id INTEGER PRIMARY KEY AUTOINCREMENT, member_id INTEGER NOT NULL, purchase_date TEXT, sessions_total INTEGER, sessions_remaining INTEGER, amount_paid REAL, FOREIGN KEY (member_id) REFERENCES members (id))",
+    "INSERT INTO members (id, name, phone, join_date) VALUES (3, 'Legacy', '555', '2023-01-01')",
+    "INSERT INTO group_plans (id, name, display_name, default_amount, duration_days) VALUES (2, 'Monthly', 'Monthly - 30 days', 100.0, 30)",
+    "INSERT INTO group_class_memberships (id, member_id, plan_id, start_date, end_date, purchase_date, membership_type, amount_paid) VALUES (5, 3, 2, '2023-01-01', '2023-01-30', '2023-01-01 10:00:00', 'New', 100.0)",
+    "INSERT INTO pt_memberships (membership_id, member_id, purchase_date, sessions_total, sessions_remaining, amount_paid) VALUES (7, 3, '2023-02-01', 10, 4, 250.0)",
+]
+
+
+def test_legacy_layout_is_upgraded_in_place_without_data_loss(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    legacy = get_connection(path)
+    for statement in LEGACY_LAYOUT:
+        legacy.execute(statement)
+    legacy.commit()
+    legacy.close()
+
+    conn = create_database(path)
+    try:
+        assert conn.execute(
+            "SELECT id, member_id, sessions_remaining, amount_paid, purchase_day FROM pt_memberships"
+        ).fetchall() == [(7, 3, 4, 25000, "2023-02-01")]  # Rupees converted to paise
+        assert conn.execute(
+            "SELECT id, member_id, plan_id, purchase_day FROM group_class_memberships"
+        ).fetchall() == [(5, 3, 2, "2023-01-01")]
+        assert conn.execute("SELECT id, name, phone FROM members").fetchall() == [(3, "Legacy", "555")]
+        assert conn.execute("SELECT * FROM revenue_daily ORDER BY day").fetchall() == [
+            ("2023-01-01", "group", 2, 1, 10000),
+            ("2023-02-01", "pt", 0, 1, 25000),
+        ]
+        assert conn.execute("PRAGMA foreign_key_check").fetchall() == []
+        existing_indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {name for name, _ in database.INDEXES} <= existing_indexes
+    finally:
+        conn.close()
+
+    # The canonical layout now applies: same plan name with another duration, PT rows keyed by id
+    conn = get_connection(path)
+    db_manager = DatabaseManager(connection=conn)
+    try:
+        assert db_manager.add_group_plan(GroupPlan(id=None, name="Monthly", duration_days=60, default_amount=180.0)).id
+        created = db_manager.add_pt_membership(
+            PTMembership(id=None, member_id=3, purchase_date="2023-03-01 09:00:00", amount_paid=100.0, sessions_total=5, sessions_remaining=5)
+        )
+        assert created.id == 8
+        assert conn.execute("SELECT purchase_day FROM pt_memberships WHERE id = 8").fetchone()[0] == "2023-03-01"
+    finally:
+        conn.close()
+
+
+def test_failed_migration_step_is_rolled_back(tmp_path, monkeypatch):
+    conn = create_database(str(tmp_path / "rollback.db"))
+
+    def broken_step(step_conn):
+        step_conn.execute("CREATE TABLE half_done (id INTEGER)")
+        raise RuntimeError("step failed")
+
+    monkeypatch.setattr(database, "MIGRATIONS", database.MIGRATIONS + [("Broken step", broken_step)])
+    monkeypatch.setattr(database, "SCHEMA_VERSION", SCHEMA_VERSION + 1)
+    try:
+        with pytest.raises(RuntimeError):
+            database.migrate_schema(conn)
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'half_done'").fetchone() is None
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+    finally:
+        conn.close()
+
+
+def test_migrations_are_idempotent(db_path):
+    conn = get_connection(db_path)
+    try:
+        conn.execute("INSERT INTO members (name, phone, email, join_date, is_active) VALUES ('Kept', '1', NULL, '2024-01-01', 1)")
+        conn.execute("PRAGMA user_version = 0")
+        conn.commit()
+        assert [step[0] for step in migrate_schema(conn)] == list(range(1, SCHEMA_VERSION + 1))
+        assert conn.execute("SELECT name FROM members").fetchall() == [("Kept",)]
+    finally:
+        conn.close()
+
+
+def test_real_money_columns_are_converted_to_paise_once(tmp_path):
+    path = str(tmp_path / "rupees.db")
+    conn = create_database(path)
+    conn.execute("PRAGMA foreign_keys = OFF")
+    conn.execute("DROP TABLE pt_memberships")
+    conn.execute(
+        "CREATE TABLE pt_memberships (id INTEGER PRIMARY KEY AUTOINCREMENT, member_id INTEGER, purchase_date TEXT, "
+        "amount_paid REAL, sessions_total INTEGER, sessions_remaining INTEGER, purchase_day TEXT)"
+    )
+    conn.execute("INSERT INTO members (id, name, phone, join_date) VALUES (1, 'Rupee', '1', '2024-01-01')")
+    conn.execute(
+        "INSERT INTO pt_memberships (member_id, purchase_date, amount_paid, sessions_total, sessions_remaining, purchase_day) "
+        "VALUES (1, '2024-01-02', 1499.99, 10, 10, '2024-01-02'), (1, '2024-01-03', 0.1, 1, 1, '2024-01-03')"
+    )
+    conn.execute("PRAGMA user_version = 4")
+    conn.commit()
+    conn.close()
+
+    conn = create_database(path)
+    try:
+        converted = "SELECT typeof(amount_paid), amount_paid FROM pt_memberships ORDER BY id"
+        assert conn.execute(converted).fetchall() == [("integer", 149999), ("integer", 10)]
+        declared = {row[1]: row[2] for row in conn.execute("PRAGMA table_info(pt_memberships)")}
+        assert declared["amount_paid"] == "INTEGER"
+        # Re-running every step must not scale the amounts again
+        conn.execute("PRAGMA user_version = 0")
+        migrate_schema(conn)
+        assert conn.execute(converted).fetchall() == [("integer", 149999), ("integer", 10)]
+    finally:
+        conn.close()
@@ -6,8 +6,8 @@ import logging # For debugging test output if needed
 
 import pytest
 
-from reporter.database import create_database # Assuming this sets up the schema
-from reporter.database_manager import DatabaseManager
+from reporter.database import create_database, get_connection, normalize_purchase_dates # Assuming this sets up the schema
+from reporter.database_manager import DatabaseManager, QueryStats, _member_prefix_condition
 from reporter.models import (
     Member,
     GroupPlan,
@@ -30,9 +30,8 @@ TEST_DB_PATH = "test_app_manager.db" # Using a file DB for easier inspection if
 def db_manager():
     if os.path.exists(TEST_DB_PATH):
         os.remove(TEST_DB_PATH)
-    create_database(TEST_DB_PATH)
-    conn = sqlite3.connect(TEST_DB_PATH)
-    conn.execute("PRAGMA foreign_keys = ON;")
+    create_database(TEST_DB_PATH).close()
+    conn = get_connection(TEST_DB_PATH)
     manager = DatabaseManager(conn)
     yield manager
     if conn:
@@ -103,7 +102,7 @@ def test_create_group_class_membership_success(db_manager: DatabaseManager):
     assert record[1] == plan_id
     assert record[2] == start_date_val
     assert record[3] == end_date_val # Compare with calculated end_date_val
-    assert record[4] == amount_paid_val
+    assert record[4] == 10000  # amount_paid is stored in paise
     assert date.fromisoformat(record[5].split(" ")[0]) == date.today() # purchase_date check
     assert record[6] == "New"
     assert record[7] == 1
@@ -216,9 +215,8 @@ def test_add_group_class_membership_invalid_date_format(db_manager: DatabaseMana
 def test_generate_financial_report_empty(db_manager: DatabaseManager):
     start_period = past_date_str(30)
     end_period = today_str()
-    # generate_financial_report_data returns a list of transactions, not a dict with summary
-    report_data = db_manager.generate_financial_report_data(start_period, end_period)
-    assert report_data == []
+    assert db_manager.get_financial_report_details(start_period, end_period) == []
+    assert db_manager.get_financial_report_totals(start_period, end_period)["total"] == 0
 
 
 def test_generate_financial_report_with_data(db_manager: DatabaseManager):
@@ -303,10 +301,10 @@ def test_generate_financial_report_with_data(db_manager: DatabaseManager):
     report_end_date = today_str()
 
     # This test, as originally written, seems to test the AppAPI's processed output,
-    # not the raw output of db_manager.generate_financial_report_data.
-    # I will add a new test specifically for db_manager.generate_financial_report_data's raw output.
+    # not the raw output of db_manager.get_financial_report_details.
+    # I will add a new test specifically for db_manager.get_financial_report_details's raw output.
     # For now, I'll comment out the assertions that are specific to AppAPI's transformation.
-    # raw_report_data = db_manager.generate_financial_report_data(
+    # raw_report_data = db_manager.get_financial_report_details(
     #     report_start_date, report_end_date
     # )
     # print("Original test_generate_financial_report_with_data output:", raw_report_data) # Debugging line
@@ -319,47 +317,48 @@ def test_generate_financial_report_with_data(db_manager: DatabaseManager):
     # which are transformations done in AppAPI, not DatabaseManager.
     # So, this test needs to be re-evaluated or a new one created for DatabaseManager's raw output.
 
-def test_db_manager_generate_financial_report_data(db_manager: DatabaseManager):
+def test_db_manager_financial_report_details(db_manager: DatabaseManager):
     """
-    Tests the raw output of DatabaseManager.generate_financial_report_data.
+    Tests the report lines of DatabaseManager.get_financial_report_details and the
+    matching get_financial_report_totals.
     """
     cursor = db_manager.conn.cursor()
     # Sample Data
     m_report_1_id = cursor.execute("INSERT INTO members (name, phone, email, join_date, is_active) VALUES ('Report User One', 'R001', 'r1@rep.com', ?, 1)", (past_date_str(10),)).lastrowid
     m_report_2_id = cursor.execute("INSERT INTO members (name, phone, email, join_date, is_active) VALUES ('Report User Two', 'R002', 'r2@rep.com', ?, 1)", (past_date_str(10),)).lastrowid
 
-    gp_report_1_id = cursor.execute("INSERT INTO group_plans (name, duration_days, default_amount, display_name, is_active) VALUES ('Reporting Plan Alpha', 30, 150.0, 'Reporting Plan Alpha - 30 days', 1)").lastrowid
+    gp_report_1_id = cursor.execute("INSERT INTO group_plans (name, duration_days, default_amount, display_name, is_active) VALUES ('Reporting Plan Alpha', 30, 15000, 'Reporting Plan Alpha - 30 days', 1)").lastrowid
 
     # GCM within range
     gcm_purchase_date_in_range = past_date_str(15)
     gcm_start_date_in_range = past_date_str(15)
     gcm_end_date_in_range = (datetime.strptime(gcm_start_date_in_range, "%Y-%m-%d") + timedelta(days=30-1)).strftime("%Y-%m-%d")
     cursor.execute("INSERT INTO group_class_memberships (member_id, plan_id, start_date, end_date, amount_paid, purchase_date, membership_type, is_active) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                   (m_report_1_id, gp_report_1_id, gcm_start_date_in_range, gcm_end_date_in_range, 145.0, gcm_purchase_date_in_range, "New", 1))
+                   (m_report_1_id, gp_report_1_id, gcm_start_date_in_range, gcm_end_date_in_range, 14500, gcm_purchase_date_in_range, "New", 1))
 
     # GCM outside range (too old)
     gcm_purchase_date_old = past_date_str(45)
     gcm_start_date_old = past_date_str(45)
     gcm_end_date_old = (datetime.strptime(gcm_start_date_old, "%Y-%m-%d") + timedelta(days=30-1)).strftime("%Y-%m-%d")
     cursor.execute("INSERT INTO group_class_memberships (member_id, plan_id, start_date, end_date, amount_paid, purchase_date, membership_type, is_active) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                   (m_report_1_id, gp_report_1_id, gcm_start_date_old, gcm_end_date_old, 10.0, gcm_purchase_date_old, "New", 1))
+                   (m_report_1_id, gp_report_1_id, gcm_start_date_old, gcm_end_date_old, 1000, gcm_purchase_date_old, "New", 1))
 
     # PTM within range
     ptm_purchase_date_in_range = past_date_str(5)
     cursor.execute("INSERT INTO pt_memberships (member_id, purchase_date, amount_paid, sessions_total, sessions_remaining) VALUES (?, ?, ?, ?, ?)",
-                   (m_report_2_id, ptm_purchase_date_in_range, 80.0, 5, 5))
+                   (m_report_2_id, ptm_purchase_date_in_range, 8000, 5, 5))
 
     # PTM outside range (too new)
     ptm_purchase_date_new = future_date_str(5)
     cursor.execute("INSERT INTO pt_memberships (member_id, purchase_date, amount_paid, sessions_total, sessions_remaining) VALUES (?, ?, ?, ?, ?)",
-                   (m_report_2_id, ptm_purchase_date_new, 20.0, 2, 2))
+                   (m_report_2_id, ptm_purchase_date_new, 2000, 2, 2))
 
     db_manager.conn.commit()
 
     report_start = past_date_str(30)
     report_end = today_str()
 
-    transactions: List[Dict[str, Any]] = db_manager.generate_financial_report_data(report_start, report_end)
+    transactions: List[Dict[str, Any]] = db_manager.get_financial_report_details(report_start, report_end)
 
     assert len(transactions) == 2, "Should only include transactions within the date range"
 
@@ -370,18 +369,193 @@ def test_db_manager_generate_financial_report_data(db_manager: DatabaseManager):
     assert gcm_trans is not None
     assert gcm_trans['amount_paid'] == 145.0
     assert gcm_trans['member_name'] == 'Report User One'
-    assert gcm_trans['plan_name'] == 'Reporting Plan Alpha'
+    assert gcm_trans['item_name'] == 'Reporting Plan Alpha'
     assert gcm_trans['purchase_date'] == gcm_purchase_date_in_range
-    assert 'sessions_total' not in gcm_trans # Should not be present for group
+    assert set(gcm_trans) == {'purchase_date', 'amount_paid', 'type', 'member_name', 'item_name'}
 
     # Check PTM in range
     ptm_trans = next((t for t in transactions_sorted if t['type'] == 'pt'), None)
     assert ptm_trans is not None
     assert ptm_trans['amount_paid'] == 80.0
     assert ptm_trans['member_name'] == 'Report User Two'
-    assert ptm_trans['sessions_total'] == 5
+    assert ptm_trans['item_name'] == '5 PT Sessions'
     assert ptm_trans['purchase_date'] == ptm_purchase_date_in_range
-    assert 'plan_name' not in ptm_trans # Should not be present for PT
+
+    totals = db_manager.get_financial_report_totals(report_start, report_end)
+    assert totals["total"] == 14500 + 8000  # Paise, the same two purchases
+    assert totals["by_plan"] == [
+        {"plan_id": gp_report_1_id, "plan_name": "Reporting Plan Alpha", "count": 1, "amount": 14500}
+    ]
+
+
+def test_financial_report_includes_timestamped_purchase_dates(db_manager: DatabaseManager):
+    cursor = db_manager.conn.cursor()
+    m_id = cursor.execute("INSERT INTO members (name, phone, email, join_date, is_active) VALUES ('Stamp User', 'S001', 's1@rep.com', ?, 1)", (past_date_str(10),)).lastrowid
+    gp_id = cursor.execute("INSERT INTO group_plans (name, duration_days, default_amount, display_name, is_active) VALUES ('Stamp Plan', 30, 100.0, 'Stamp Plan - 30 days', 1)").lastrowid
+    cursor.execute("INSERT INTO group_class_memberships (member_id, plan_id, start_date, end_date, amount_paid, purchase_date, membership_type, is_active) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                   (m_id, gp_id, "2024-03-01", "2024-03-30", 100.0, "2024-03-31 18:45:00", "New", 1))
+    cursor.execute("INSERT INTO pt_memberships (member_id, purchase_date, amount_paid, sessions_total, sessions_remaining) VALUES (?, ?, ?, ?, ?)",
+                   (m_id, "2024-04-01 00:00:00", 50.0, 5, 5))
+    db_manager.conn.commit()
+
+    stored_days = cursor.execute("SELECT purchase_day FROM group_class_memberships UNION ALL SELECT purchase_day FROM pt_memberships").fetchall()
+    assert sorted(row[0] for row in stored_days) == ["2024-03-31", "2024-04-01"]
+
+    march = db_manager.get_financial_report_details("2024-03-01", "2024-03-31")
+    assert [t["type"] for t in march] == ["group"]
+    april = db_manager.get_financial_report_details("2024-04-01", "2024-04-30")
+    assert [t["type"] for t in april] == ["pt"]
+
+    # Editing purchase_date keeps purchase_day in step
+    cursor.execute("UPDATE pt_memberships SET purchase_date = '2024-03-15' WHERE member_id = ?", (m_id,))
+    db_manager.conn.commit()
+    march = db_manager.get_financial_report_details("2024-03-01", "2024-03-31")
+    assert [t["type"] for t in march] == ["pt", "group"]
+
+
+def test_financial_report_details_and_totals_come_from_sql(db_manager: DatabaseManager):
+    cursor = db_manager.conn.cursor()
+    m1 = cursor.execute("INSERT INTO members (name, phone, join_date) VALUES ('Union One', 'U001', '2024-01-01')").lastrowid
+    m2 = cursor.execute("INSERT INTO members (name, phone, join_date) VALUES ('Union Two', 'U002', '2024-01-01')").lastrowid
+    gold = cursor.execute("INSERT INTO group_plans (name, duration_days, default_amount, display_name) VALUES ('Gold', 30, 10000, 'Gold - 30 days')").lastrowid
+    silver = cursor.execute("INSERT INTO group_plans (name, duration_days, default_amount, display_name) VALUES ('Silver', 30, 5000, 'Silver - 30 days')").lastrowid
+    gcm_sql = "INSERT INTO group_class_memberships (member_id, plan_id, start_date, end_date, amount_paid, purchase_date, membership_type) VALUES (?, ?, ?, ?, ?, ?, 'New')"
+    cursor.execute(gcm_sql, (m1, gold, "2024-05-02", "2024-05-31", 10000, "2024-05-02 18:00:00"))
+    cursor.execute(gcm_sql, (m2, gold, "2024-05-09", "2024-06-07", 9950, "2024-05-09"))
+    cursor.execute(gcm_sql, (m2, silver, "2024-05-02", "2024-05-31", 5000, "2024-05-02 09:00:00"))
+    cursor.execute(gcm_sql, (m1, silver, "2024-06-01", "2024-06-30", 5000, "2024-06-01"))  # Outside the range
+    pt_sql = "INSERT INTO pt_memberships (member_id, purchase_date, amount_paid, sessions_total, sessions_remaining) VALUES (?, ?, ?, ?, ?)"
+    cursor.execute(pt_sql, (m1, "2024-05-02 12:30:00", 2500, 10, 10))
+    cursor.execute(pt_sql, (m2, "2024-05-31", 1250, 5, 5))
+    db_manager.conn.commit()
+
+    details = db_manager.get_financial_report_details("2024-05-01", "2024-05-31")
+    assert [(d["purchase_date"], d["type"], d["item_name"]) for d in details] == [
+        ("2024-05-02 09:00:00", "group", "Silver"),
+        ("2024-05-02 12:30:00", "pt", "10 PT Sessions"),
+        ("2024-05-02 18:00:00", "group", "Gold"),
+        ("2024-05-09", "group", "Gold"),
+        ("2024-05-31", "pt", "5 PT Sessions"),
+    ]
+    assert details[0] == {
+        "purchase_date": "2024-05-02 09:00:00",
+        "amount_paid": 50.0,
+        "type": "group",
+        "member_name": "Union Two",
+        "item_name": "Silver",
+    }
+
+    totals = db_manager.get_financial_report_totals("2024-05-01", "2024-05-31")
+    assert totals["total"] == 10000 + 9950 + 5000 + 2500 + 1250
+    assert totals["by_type"] == {"group": {"count": 3, "amount": 24950}, "pt": {"count": 2, "amount": 3750}}
+    assert totals["by_plan"] == [
+        {"plan_id": gold, "plan_name": "Gold", "count": 2, "amount": 19950},
+        {"plan_id": silver, "plan_name": "Silver", "count": 1, "amount": 5000},
+    ]
+    assert db_manager.get_financial_report_totals("2023-01-01", "2023-12-31")["total"] == 0
+
+
+def _rollup(db_manager: DatabaseManager):
+    return [tuple(row) for row in db_manager.conn.execute("SELECT * FROM revenue_daily ORDER BY day, type, plan_id")]
+
+
+def test_revenue_daily_follows_purchase_writes(db_manager: DatabaseManager):
+    member = db_manager.add_member(
+        Member(id=None, name="Rollup User", phone="RD01", email=None, join_date="2024-01-01", is_active=True)
+    )
+    gold = db_manager.add_group_plan(GroupPlan(id=None, name="Gold", duration_days=30, default_amount=100.0))
+    silver = db_manager.add_group_plan(GroupPlan(id=None, name="Silver", duration_days=30, default_amount=50.0))
+    gcm = db_manager.add_group_class_membership(
+        GroupClassMembership(
+            id=None, member_id=member.id, plan_id=gold.id, start_date="2024-01-10", end_date="2024-02-08",
+            amount_paid=100.0, membership_type="New", purchase_date="2024-01-10 10:00:00",
+        )
+    )
+    for purchase_date in ("2024-01-10", "2024-01-10"):
+        db_manager.add_pt_membership(
+            PTMembership(id=None, member_id=member.id, purchase_date=purchase_date, amount_paid=25.5, sessions_total=4, sessions_remaining=4)
+        )
+    assert _rollup(db_manager) == [("2024-01-10", "group", gold.id, 1, 10000), ("2024-01-10", "pt", 0, 2, 5100)]
+
+    # Moving a purchase to another plan and day moves its contribution
+    gcm.plan_id, gcm.purchase_date, gcm.amount_paid = silver.id, "2024-04-02", 50.0
+    assert db_manager.update_group_class_membership(gcm)
+    pt_id = db_manager.get_all_pt_memberships()[0].id
+    db_manager.conn.execute("UPDATE pt_memberships SET sessions_remaining = 1 WHERE id = ?", (pt_id,))  # Not revenue
+    assert db_manager.delete_pt_membership(pt_id)
+    assert _rollup(db_manager) == [("2024-01-10", "pt", 0, 1, 2550), ("2024-04-02", "group", silver.id, 1, 5000)]
+
+    assert db_manager.get_revenue_by_period("2024-01-01", "2024-12-31", "quarter") == [
+        {"period": "2024-Q1", "type": "pt", "count": 1, "amount": 2550},
+        {"period": "2024-Q2", "type": "group", "count": 1, "amount": 5000},
+    ]
+    assert db_manager.get_revenue_by_period("2024-01-01", "2024-12-31", "year") == [
+        {"period": "2024", "type": "group", "count": 1, "amount": 5000},
+        {"period": "2024", "type": "pt", "count": 1, "amount": 2550},
+    ]
+    assert [row["period"] for row in db_manager.get_revenue_by_period("2024-01-01", "2024-03-31")] == ["2024-01"]
+    with pytest.raises(ValueError):
+        db_manager.get_revenue_by_period("2024-01-01", "2024-12-31", "fortnight")
+
+    # Deleting the member cascades to its group memberships and their revenue
+    db_manager.conn.execute("DELETE FROM pt_memberships")
+    db_manager.conn.execute("DELETE FROM members")
+    db_manager.conn.commit()
+    assert _rollup(db_manager) == []
+    assert db_manager.check_revenue_rollup() == 0
+
+
+def test_check_revenue_rollup_rebuilds_drifted_rollup(db_manager: DatabaseManager):
+    member = db_manager.add_member(
+        Member(id=None, name="Drift User", phone="RD02", email=None, join_date="2024-01-01", is_active=True)
+    )
+    db_manager.add_pt_membership(
+        PTMembership(id=None, member_id=member.id, purchase_date="2024-02-01", amount_paid=10.0, sessions_total=1, sessions_remaining=1)
+    )
+    expected = _rollup(db_manager)
+    db_manager.conn.execute("UPDATE revenue_daily SET amount = amount + 1")
+    db_manager.conn.execute("INSERT INTO revenue_daily VALUES ('2024-03-01', 'pt', 0, 1, 1)")
+    db_manager.conn.commit()
+
+    assert db_manager.check_revenue_rollup(repair=False) == 3
+    assert db_manager.check_revenue_rollup() == 3
+    assert _rollup(db_manager) == expected
+    assert db_manager.check_revenue_rollup() == 0
+
+
+def test_money_round_trips_through_integer_paise(db_manager: DatabaseManager):
+    member = db_manager.add_member(
+        Member(id=None, name="Paise User", phone="P001", email=None, join_date="2024-01-01", is_active=True)
+    )
+    plan_id = db_manager.find_or_create_group_plan("Paise Plan", 30, 1499.99)
+    assert db_manager.find_or_create_group_plan("Paise Plan", 30, 1499.99) == plan_id
+    assert db_manager.get_group_plan_by_id(plan_id).default_amount == 1499.99
+
+    for amount in (0.1, 0.2):
+        db_manager.add_pt_membership(
+            PTMembership(id=None, member_id=member.id, purchase_date="2024-01-05", amount_paid=amount, sessions_total=1, sessions_remaining=1)
+        )
+    stored = db_manager.conn.execute("SELECT typeof(amount_paid), amount_paid FROM pt_memberships ORDER BY id").fetchall()
+    assert [tuple(row) for row in stored] == [("integer", 10), ("integer", 20)]
+    assert [m.amount_paid for m in db_manager.get_all_pt_memberships()] == [0.2, 0.1]
+    # Summed exactly in SQL: 0.1 + 0.2 rupees is 30 paise, not 0.30000000000000004
+    assert db_manager.get_financial_report_totals("2024-01-01", "2024-01-31")["total"] == 30
+
+
+def test_normalize_purchase_dates_backfills_existing_rows():
+    conn = get_connection(":memory:")
+    conn.execute("CREATE TABLE members (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, phone TEXT NOT NULL UNIQUE, email TEXT, join_date TEXT, is_active BOOLEAN NOT NULL DEFAULT 1)")
+    conn.execute("CREATE TABLE group_class_memberships (id INTEGER PRIMARY KEY AUTOINCREMENT, member_id INTEGER, plan_id INTEGER, start_date TEXT, end_date TEXT, amount_paid REAL, purchase_date TEXT, membership_type TEXT, is_active BOOLEAN NOT NULL DEFAULT 1)")
+    conn.execute("CREATE TABLE pt_memberships (id INTEGER PRIMARY KEY AUTOINCREMENT, member_id INTEGER, purchase_date TEXT, amount_paid REAL, sessions_total INTEGER, sessions_remaining INTEGER)")
+    conn.execute("INSERT INTO group_class_memberships (member_id, plan_id, start_date, end_date, amount_paid, purchase_date, membership_type) VALUES (1, 1, '2024-01-01', '2024-01-30', 10.0, '2024-01-02 09:30:00', 'New')")
+    conn.execute("INSERT INTO pt_memberships (member_id, purchase_date, amount_paid, sessions_total, sessions_remaining) VALUES (1, '2024-02-03', 20.0, 4, 4)")
+    conn.commit()
+
+    normalize_purchase_dates(conn)
+
+    assert conn.execute("SELECT purchase_day FROM group_class_memberships").fetchone()[0] == "2024-01-02"
+    assert conn.execute("SELECT purchase_day FROM pt_memberships").fetchone()[0] == "2024-02-03"
+    conn.close()
 
 
 def test_generate_renewal_report_empty(db_manager: DatabaseManager):
@@ -610,7 +784,7 @@ def test_add_pt_membership(db_manager: DatabaseManager):
     assert record[0] == m_id
     assert record[1] == 10  # sessions_total
     assert record[2] == 10  # sessions_remaining
-    assert record[3] == 150.0  # amount_paid
+    assert record[3] == 15000  # amount_paid, in paise
     # assert record[4] == "Initial PT package" # Notes check already removed
 
 
@@ -703,10 +877,10 @@ def test_get_all_members_for_view(db_manager: DatabaseManager):
 def test_get_all_group_plans_for_view(db_manager: DatabaseManager):
     cursor = db_manager.conn.cursor()
     p1_id = cursor.execute(
-        "INSERT INTO group_plans (name, duration_days, default_amount, display_name, is_active) VALUES ('Plan Alpha', 30, 100.0, 'Plan Alpha - 30 days', 1)"
+        "INSERT INTO group_plans (name, duration_days, default_amount, display_name, is_active) VALUES ('Plan Alpha', 30, 10000, 'Plan Alpha - 30 days', 1)"
     ).lastrowid
     p2_id = cursor.execute(
-        "INSERT INTO group_plans (name, duration_days, default_amount, display_name, is_active) VALUES ('Plan Beta', 90, 250.0, 'Plan Beta - 90 days', 0)"
+        "INSERT INTO group_plans (name, duration_days, default_amount, display_name, is_active) VALUES ('Plan Beta', 90, 25000, 'Plan Beta - 90 days', 0)"
     ).lastrowid
     db_manager.conn.commit()
 
@@ -742,8 +916,8 @@ def test_get_all_group_class_memberships_for_view(db_manager: DatabaseManager):
     m_gc_3_id = cursor.execute("INSERT INTO members (name, phone, email, join_date, is_active) VALUES ('Filter Test Charlie', 'FTC03', 'ftc@example.com', ?, 0)", (past_date_str(20),)).lastrowid
 
     # Plan Data
-    p_gc_1_id = cursor.execute("INSERT INTO group_plans (name, duration_days, default_amount, display_name, is_active) VALUES ('GC Plan Gold', 30, 100.0, 'GC Plan Gold - 30 days', 1)").lastrowid
-    p_gc_2_id = cursor.execute("INSERT INTO group_plans (name, duration_days, default_amount, display_name, is_active) VALUES ('GC Plan Silver', 60, 180.0, 'GC Plan Silver - 60 days', 1)").lastrowid
+    p_gc_1_id = cursor.execute("INSERT INTO group_plans (name, duration_days, default_amount, display_name, is_active) VALUES ('GC Plan Gold', 30, 10000, 'GC Plan Gold - 30 days', 1)").lastrowid
+    p_gc_2_id = cursor.execute("INSERT INTO group_plans (name, duration_days, default_amount, display_name, is_active) VALUES ('GC Plan Silver', 60, 18000, 'GC Plan Silver - 60 days', 1)").lastrowid
     db_manager.conn.commit()
 
     # Membership Data
@@ -752,21 +926,21 @@ def test_get_all_group_class_memberships_for_view(db_manager: DatabaseManager):
     gcm1_end = (datetime.strptime(gcm1_start, "%Y-%m-%d") + timedelta(days=30-1)).strftime("%Y-%m-%d")
     gcm1_purchase = past_date_str(15)
     cursor.execute("INSERT INTO group_class_memberships (member_id, plan_id, start_date, end_date, amount_paid, purchase_date, membership_type, is_active) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                   (m_gc_1_id, p_gc_1_id, gcm1_start, gcm1_end, 95.0, gcm1_purchase, "New", 1))
+                   (m_gc_1_id, p_gc_1_id, gcm1_start, gcm1_end, 9500, gcm1_purchase, "New", 1))
 
     # Inactive membership for GC Member Bravo
     gcm2_start = past_date_str(45)
     gcm2_end = (datetime.strptime(gcm2_start, "%Y-%m-%d") + timedelta(days=60-1)).strftime("%Y-%m-%d")
     gcm2_purchase = past_date_str(45)
     cursor.execute("INSERT INTO group_class_memberships (member_id, plan_id, start_date, end_date, amount_paid, purchase_date, membership_type, is_active) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                   (m_gc_2_id, p_gc_2_id, gcm2_start, gcm2_end, 170.0, gcm2_purchase, "New", 0))
+                   (m_gc_2_id, p_gc_2_id, gcm2_start, gcm2_end, 17000, gcm2_purchase, "New", 0))
 
     # Active membership for Filter Test Charlie (member is inactive, but this GCM record is active)
     gcm3_start = past_date_str(10)
     gcm3_end = (datetime.strptime(gcm3_start, "%Y-%m-%d") + timedelta(days=30-1)).strftime("%Y-%m-%d")
     gcm3_purchase = past_date_str(10)
     cursor.execute("INSERT INTO group_class_memberships (member_id, plan_id, start_date, end_date, amount_paid, purchase_date, membership_type, is_active) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                   (m_gc_3_id, p_gc_1_id, gcm3_start, gcm3_end, 90.0, gcm3_purchase, "Renewal", 1))
+                   (m_gc_3_id, p_gc_1_id, gcm3_start, gcm3_end, 9000, gcm3_purchase, "Renewal", 1))
     db_manager.conn.commit()
 
     # Test 1: Get all (no filters)
@@ -842,3 +1016,244 @@ def test_delete_pt_membership(db_manager: DatabaseManager):
 
     not_deleted = db_manager.delete_pt_membership(9999)  # Non-existent ID
     assert not_deleted is False
+
+
+def test_group_class_memberships_keyset_pages_cover_all_rows(db_manager: DatabaseManager):
+    cursor = db_manager.conn.cursor()
+    m_id = cursor.execute("INSERT INTO members (name, phone, email, join_date, is_active) VALUES ('Pager', 'P001', NULL, '2024-01-01', 1)").lastrowid
+    gp_id = cursor.execute("INSERT INTO group_plans (name, duration_days, default_amount, display_name, is_active) VALUES ('Page Plan', 30, 10.0, 'Page Plan - 30 days', 1)").lastrowid
+    start_dates = ["2024-01-01", "2024-01-01", "2024-02-01", "2024-02-01", "2024-02-01", "2024-03-01", "2024-04-01"]
+    for plan_offset, start in enumerate(start_dates):
+        # Distinct plan ids keep (member_id, plan_id, start_date) unique while repeating start dates
+        plan_id = gp_id if plan_offset == 0 else cursor.execute(
+            "INSERT INTO group_plans (name, duration_days, default_amount, display_name, is_active) VALUES (?, 30, 10.0, ?, 1)",
+            (f"Page Plan {plan_offset}", f"Page Plan {plan_offset} - 30 days"),
+        ).lastrowid
+        cursor.execute("INSERT INTO group_class_memberships (member_id, plan_id, start_date, end_date, amount_paid, purchase_date, membership_type, is_active) VALUES (?, ?, ?, ?, 10.0, ?, 'New', 1)",
+                       (m_id, plan_id, start, start, start))
+    db_manager.conn.commit()
+
+    seen = []
+    after = None
+    pages = 0
+    while True:
+        page = db_manager.get_group_class_memberships_page_for_view(3, after=after)
+        assert len(page.items) <= 3
+        seen.extend(page.items)
+        pages += 1
+        if page.next_cursor is None:
+            break
+        after = page.next_cursor
+
+    assert pages == 3
+    assert len({m.id for m in seen}) == len(start_dates)
+    keys = [(m.start_date, m.id) for m in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_members_and_pt_keyset_pages(db_manager: DatabaseManager):
+    cursor = db_manager.conn.cursor()
+    for i in range(5):
+        # Duplicate names exercise the id tie-breaker
+        m_id = cursor.execute("INSERT INTO members (name, phone, email, join_date, is_active) VALUES (?, ?, NULL, '2024-01-01', 1)",
+                              ("Same Name" if i < 3 else f"Other {i}", f"K00{i}")).lastrowid
+        cursor.execute("INSERT INTO pt_memberships (member_id, purchase_date, amount_paid, sessions_total, sessions_remaining) VALUES (?, '2024-05-01', 10.0, 1, 1)", (m_id,))
+    db_manager.conn.commit()
+
+    first = db_manager.get_members_page_for_view(2)
+    second = db_manager.get_members_page_for_view(2, after=first.next_cursor)
+    third = db_manager.get_members_page_for_view(2, after=second.next_cursor)
+    names = [m.name for m in first.items + second.items + third.items]
+    assert names == ["Other 3", "Other 4", "Same Name", "Same Name", "Same Name"]
+    assert third.next_cursor is None
+
+    pt_first = db_manager.get_pt_memberships_page_for_view(4)
+    pt_rest = db_manager.get_pt_memberships_page_for_view(4, after=pt_first.next_cursor)
+    assert len(pt_first.items) == 4 and len(pt_rest.items) == 1
+    assert pt_rest.next_cursor is None
+
+
+def test_iter_methods_stream_what_get_all_returns(db_manager: DatabaseManager):
+    cursor = db_manager.conn.cursor()
+    plan_id = cursor.execute("INSERT INTO group_plans (name, duration_days, default_amount, display_name, is_active) VALUES ('Stream Plan', 30, 1000, 'Stream Plan - 30 days', 1)").lastrowid
+    for i in range(5):
+        m_id = cursor.execute("INSERT INTO members (name, phone, email, join_date, is_active) VALUES (?, ?, NULL, '2024-01-01', ?)",
+                              (f"Streamer {i}", f"S00{i}", i % 2)).lastrowid
+        cursor.execute("INSERT INTO group_class_memberships (member_id, plan_id, start_date, end_date, amount_paid, purchase_date, membership_type, is_active) VALUES (?, ?, ?, '2024-12-31', 1000, ?, 'New', ?)",
+                       (m_id, plan_id, f"2024-0{i + 1}-01", f"2024-0{i + 1}-01", i % 2))
+        cursor.execute("INSERT INTO pt_memberships (member_id, purchase_date, amount_paid, sessions_total, sessions_remaining) VALUES (?, ?, 50025, 10, 10)",
+                       (m_id, f"2024-0{i + 1}-15"))
+    db_manager.conn.commit()
+
+    # A batch size that doesn't divide the row count exercises the final short batch
+    assert list(db_manager.iter_members(batch_size=2)) == db_manager.get_all_members()
+    assert list(db_manager.iter_members_for_view(batch_size=2)) == db_manager.get_all_members_for_view()
+    assert list(db_manager.iter_group_plans(batch_size=2)) == db_manager.get_all_group_plans()
+    assert list(db_manager.iter_group_plans_for_view(batch_size=2)) == db_manager.get_all_group_plans_for_view()
+    active = list(db_manager.iter_group_class_memberships(status_filter="Active", batch_size=2))
+    assert active == db_manager.get_all_group_class_memberships(status_filter="Active")
+    assert len(active) == 2
+    assert list(db_manager.iter_group_class_memberships_for_view(name_filter="Streamer", batch_size=2)) == (
+        db_manager.get_all_group_class_memberships_for_view(name_filter="Streamer")
+    )
+    pt_views = list(db_manager.iter_pt_memberships_for_view(batch_size=2))
+    assert pt_views == db_manager.get_all_pt_memberships_for_view()
+    assert [view.amount_paid for view in pt_views] == [500.25] * 5
+    assert list(db_manager.iter_pt_memberships(batch_size=2)) == db_manager.get_all_pt_memberships()
+
+
+def test_iter_memory_is_bounded_by_batch_size(db_manager: DatabaseManager):
+    import tracemalloc
+
+    cursor = db_manager.conn.cursor()
+    m_id = cursor.execute("INSERT INTO members (name, phone, email, join_date, is_active) VALUES ('Bulk', 'B001', NULL, '2024-01-01', 1)").lastrowid
+    plan_id = cursor.execute("INSERT INTO group_plans (name, duration_days, default_amount, display_name, is_active) VALUES ('Bulk Plan', 30, 1000, 'Bulk Plan - 30 days', 1)").lastrowid
+    start = date(2000, 1, 1)
+    cursor.executemany(
+        "INSERT INTO group_class_memberships (member_id, plan_id, start_date, end_date, amount_paid, purchase_date, membership_type, is_active) VALUES (?, ?, ?, ?, 1000, ?, 'Renewal', 1)",
+        (
+            (m_id, plan_id, (start + timedelta(days=i)).isoformat(), (start + timedelta(days=i + 29)).isoformat(), (start + timedelta(days=i)).isoformat())
+            for i in range(3000)
+        ),
+    )
+    db_manager.conn.commit()
+
+    def peak(consume) -> int:
+        tracemalloc.start()
+        try:
+            consume()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    listed = peak(lambda: db_manager.get_all_group_class_memberships_for_view())
+    streamed = peak(lambda: sum(1 for _ in db_manager.iter_group_class_memberships_for_view(batch_size=50)))
+    assert streamed * 5 < listed, (streamed, listed)
+
+
+def test_dtos_are_slotted_and_built_positionally():
+    view = GroupClassMembershipView.from_values(
+        (7, 1, "Member", 2, "Plan", "2024-01-01", "2024-01-30", "2024-01-01", "New", 1, 99999)
+    )
+    assert view.is_active is True and view.amount_paid == 999.99
+    assert view == GroupClassMembershipView.from_row(
+        {"id": 7, "member_id": 1, "member_name": "Member", "plan_id": 2, "plan_name": "Plan",
+         "start_date": "2024-01-01", "end_date": "2024-01-30", "purchase_date": "2024-01-01",
+         "membership_type": "New", "is_active": 1, "amount_paid": 99999}
+    )
+    assert Member.from_values((1, "Member", "555", None, "2024-01-01", 1)).is_active == 1
+    for dto in (view, Member(None, "Member", "555", None, None, True), PTMembershipView(1, 1, "M", "2024-01-01", 1, 1, 10.0)):
+        assert not hasattr(dto, "__dict__")
+
+
+def test_query_stats_record_latency_rows_and_masked_sql(db_manager: DatabaseManager, caplog):
+    db_manager.stats.slow_query_ms = 0  # Every call counts as slow
+    with caplog.at_level(logging.WARNING, logger="reporter.slow_queries"):
+        for i in range(3):
+            db_manager.add_member(Member(id=None, name=f"Stats {i}", phone=f"55501{i}", email=f"stats{i}@example.com", join_date="2024-01-01", is_active=True))
+        assert len(db_manager.get_all_members_for_view()) == 3
+        assert sum(1 for _ in db_manager.iter_members(batch_size=2)) == 3
+
+    stats = {entry["method"]: entry for entry in db_manager.stats.snapshot()}
+    assert stats["add_member"]["calls"] == 3
+    assert "INSERT INTO members (name, phone, email, join_date, is_active) VALUES (?, ?, ?, ?, ?)" in stats["add_member"]["sql"]
+    assert "55501" not in stats["add_member"]["sql"]
+    view = stats["get_all_members_for_view"]
+    assert view["calls"] == 1 and view["rows"] == 3 and "FROM members" in view["sql"]
+    assert 0 < view["p50_ms"] <= view["p95_ms"] <= view["p99_ms"] <= view["max_ms"]
+    assert stats["iter_members"]["rows"] == 3
+    slow = [record.getMessage() for record in caplog.records if record.name == "reporter.slow_queries"]
+    assert len(slow) == 3 + 2 + 1  # get_all_members_for_view logs its inner iter_members_for_view too
+    assert all("55501" not in message for message in slow)
+
+    db_manager.stats.reset()
+    assert db_manager.stats.snapshot() == []
+
+
+def test_query_stats_percentiles_are_within_one_bucket():
+    stats = QueryStats(slow_query_ms=float("inf"))
+    for elapsed_ms in range(1, 101):
+        stats.record("method", float(elapsed_ms), None, [])
+    (entry,) = stats.snapshot()
+    for percentile, exact in (("p50_ms", 50), ("p95_ms", 95), ("p99_ms", 99)):
+        assert exact <= entry[percentile] <= exact * 1.19, (percentile, entry[percentile])
+    assert entry["max_ms"] == 100 and entry["mean_ms"] == 50.5
+
+
+def test_search_members_uses_the_trigram_index_and_follows_writes(db_manager: DatabaseManager):
+    for name, phone, email in [
+        ("Aarav Sharma", "9876500001", "aarav@example.com"),
+        ("Diya Sharma", "9876500002", None),
+        ("Al Khan", "9123400003", "khan@example.com"),
+        ("Rohan 50%_Off", "9000000004", None),
+    ]:
+        db_manager.add_member(Member(id=None, name=name, phone=phone, email=email, join_date="2024-01-01", is_active=True))
+
+    def names(query, limit=20):
+        return sorted(member.name for member in db_manager.search_members(query, limit))
+
+    assert names("sharma") == ["Aarav Sharma", "Diya Sharma"]
+    assert names("SHAR d") == ["Diya Sharma"]  # Short terms filter the indexed matches
+    assert names("9876500") == ["Aarav Sharma", "Diya Sharma"]
+    assert names("khan@exa") == ["Al Khan"]
+    assert names("al k") == ["Al Khan"]  # Only short terms: name or phone prefix
+    assert names("50%") == ["Rohan 50%_Off"] and names("a%") == []  # Wildcards are literal
+    assert names('"sha') == [] and names("") == []
+    assert len(db_manager.search_members("sharma", limit=1)) == 1
+    assert isinstance(db_manager.search_members("khan")[0], MemberView)
+
+    db_manager.update_member(Member(id=1, name="Aarav Verma", phone=None, email=None, join_date=None, is_active=None))
+    db_manager.delete_member(2)
+    assert names("sharma") == [] and names("verma") == ["Aarav Verma"]
+    # Raises if the index has drifted from the members table
+    db_manager.conn.execute("INSERT INTO members_fts (members_fts, rank) VALUES ('integrity-check', 1)")
+
+
+def test_membership_name_filter_goes_through_the_search_index(db_manager: DatabaseManager):
+    member = db_manager.add_member(Member(id=None, name="Filter Target", phone="5550100", email=None, join_date="2024-01-01", is_active=True))
+    other = db_manager.add_member(Member(id=None, name="Someone Else", phone="5550101", email=None, join_date="2024-01-01", is_active=True))
+    plan = db_manager.add_group_plan(GroupPlan(id=None, name="Monthly", duration_days=30, default_amount=1000.0))
+    for member_id in (member.id, other.id):
+        db_manager.add_group_class_membership(
+            GroupClassMembership(id=None, member_id=member_id, plan_id=plan.id, start_date="2024-01-01", end_date="2024-01-30",
+                                 amount_paid=1000.0, membership_type="New", purchase_date="2024-01-01")
+        )
+    executed_sql = []
+    db_manager.conn.set_trace_callback(executed_sql.append)
+    try:
+        views = db_manager.get_all_group_class_memberships_for_view(name_filter="target")
+        page = db_manager.get_group_class_memberships_page_for_view(10, name_filter="get tar")
+    finally:
+        db_manager.conn.set_trace_callback(None)
+    assert [view.member_name for view in views] == ["Filter Target"]
+    assert page.items == []  # The filter stays a substring match on the whole name
+    assert all("members_fts" in sql for sql in executed_sql if "JOIN members m" in sql)
+
+
+def test_search_members_by_prefix_range_scans_phone_or_name(db_manager: DatabaseManager):
+    for name, phone, is_active in [
+        ("arjun Mehta", "9876500001", True),
+        ("Arjun Rao", "9876500002", False),
+        ("Arya Singh", "9123400003", True),
+        ("Barun Arjun", "+919000000004", True),
+    ]:
+        db_manager.add_member(Member(id=None, name=name, phone=phone, email=None, join_date="2024-01-01", is_active=is_active))
+
+    def names(prefix, limit=10, active_only=False):
+        return [member.name for member in db_manager.search_members_by_prefix(prefix, limit, active_only)]
+
+    assert names("ARJ") == ["arjun Mehta", "Arjun Rao"]  # Name prefix, ignoring case
+    assert names("  arjun   r ") == ["Arjun Rao"]
+    assert names("ar", limit=2) == ["arjun Mehta", "Arjun Rao"]
+    assert names("ar", active_only=True) == ["arjun Mehta", "Arya Singh"]
+    assert names("98765") == ["arjun Mehta", "Arjun Rao"]  # Phone prefix, in phone order
+    assert names("+91") == ["Barun Arjun"]
+    assert names("a%") == [] and names(" ") == [] and names("ar", limit=0) == []
+
+    for prefix, index_name in [("Arj", "idx_members_name_nocase"), ("98765", "sqlite_autoindex_members")]:
+        condition, params, order_by = _member_prefix_condition(prefix)
+        plan = db_manager.conn.execute(
+            f"EXPLAIN QUERY PLAN SELECT m.id FROM members m WHERE {condition} ORDER BY {order_by}", params
+        ).fetchall()
+        # A single index range search that also yields the order: no scan and no sort
+        assert len(plan) == 1 and plan[0][3].startswith("SEARCH m USING") and index_name in plan[0][3]
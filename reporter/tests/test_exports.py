@@ -0,0 +1,70 @@
+import csv
+import io
+import tempfile
+import tracemalloc
+
+import pytest
+from openpyxl import load_workbook
+
+from reporter.exports import FINANCIAL_REPORT_COLUMNS, write_csv, write_export, write_xlsx
+
+
+def _report_rows(count: int):
+    for index in range(count):
+        yield {
+            "purchase_date": f"2024-{index % 12 + 1:02d}-{index % 28 + 1:02d}",
+            "amount_paid": 1000.0 + index % 7,
+            "type": "group" if index % 2 else "pt",
+            "member_name": f"Member {index}",
+            "item_name": "Monthly",
+        }
+
+
+def _peak_bytes(write, row_count: int) -> int:
+    with tempfile.TemporaryFile() as sink:
+        tracemalloc.start()
+        try:
+            write(_report_rows(row_count), FINANCIAL_REPORT_COLUMNS, sink)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+
+def test_csv_export_round_trips():
+    stream = io.BytesIO()
+    assert write_csv(_report_rows(3), FINANCIAL_REPORT_COLUMNS, stream) == 3
+    assert not stream.closed
+
+    lines = list(csv.reader(io.StringIO(stream.getvalue().decode("utf-8-sig"))))
+    assert lines[0] == ["Purchase Date", "Amount Paid (₹)", "Type", "Member Name", "Item/Plan Name"]
+    assert lines[1:] == [
+        ["2024-01-01", "1000.0", "pt", "Member 0", "Monthly"],
+        ["2024-02-02", "1001.0", "group", "Member 1", "Monthly"],
+        ["2024-03-03", "1002.0", "pt", "Member 2", "Monthly"],
+    ]
+
+
+def test_xlsx_export_round_trips():
+    stream = io.BytesIO()
+    assert write_xlsx(_report_rows(2), FINANCIAL_REPORT_COLUMNS, stream, sheet_name="Financial Report") == 2
+
+    stream.seek(0)
+    sheet = load_workbook(stream)["Financial Report"]
+    assert list(sheet.iter_rows(values_only=True)) == [
+        ("Purchase Date", "Amount Paid (₹)", "Type", "Member Name", "Item/Plan Name"),
+        ("2024-01-01", 1000, "pt", "Member 0", "Monthly"),
+        ("2024-02-02", 1001, "group", "Member 1", "Monthly"),
+    ]
+
+
+def test_unknown_export_format_is_rejected():
+    with pytest.raises(ValueError):
+        write_export(_report_rows(1), FINANCIAL_REPORT_COLUMNS, io.BytesIO(), "pdf")
+
+
+@pytest.mark.parametrize("write", [write_csv, write_xlsx])
+def test_export_memory_does_not_grow_with_row_count(write):
+    small = _peak_bytes(write, 500)
+    large = _peak_bytes(write, 5_000)
+    # Ten times the rows; holding them all would add well over a megabyte
+    assert large < small + 256 * 1024, (small, large)
@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# Libraries that must only be loaded by the code paths that need them (reports, exports, migration)
+HEAVY_LIBRARIES = ("pandas", "openpyxl", "numpy")
+
+
+def _loaded_modules(module: str) -> list:
+    """Names in sys.modules after importing module in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-c", f"import sys, {module}; print('\\n'.join(sys.modules))"],
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT,
+        check=True,
+    )
+    return result.stdout.split()
+
+
+@pytest.mark.parametrize(
+    "module",
+    ["reporter.app_api", "reporter.database_manager", "reporter.exports", "reporter.migrate_historical_data"],
+)
+def test_module_import_stays_light(module):
+    heavy = sorted(name for name in _loaded_modules(module) if name.split(".")[0] in HEAVY_LIBRARIES)
+    assert heavy == [], f"importing {module} loads {heavy}"
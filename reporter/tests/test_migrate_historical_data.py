@@ -1,9 +1,25 @@
+import csv
 import os
+import shutil
 import sqlite3
+import tempfile
 import unittest
+
+import pandas as pd
 from unittest.mock import patch
 
-from reporter.migrate_historical_data import migrate_historical_data, GC_MEMBERS_CSV, PT_MEMBERS_CSV
+from reporter.migrate_historical_data import (
+    amounts_in_paise,
+    clean_amounts,
+    collect_earliest_start_dates,
+    FAILED_ROW_SAMPLES,
+    migrate_gc_data,
+    migrate_historical_data,
+    migrate_pt_data,
+    parse_dates_dmy,
+    GC_MEMBERS_CSV,
+    PT_MEMBERS_CSV,
+)
 from reporter.database import DB_FILE, create_database
 from reporter.database_manager import DatabaseManager
 
@@ -78,8 +94,8 @@ class TestMigrateHistoricalData(unittest.TestCase):
         group_plans_rows = cursor.fetchall()
         group_plans = [tuple(row) for row in group_plans_rows] # Convert rows to tuples
         self.assertEqual(len(group_plans), 2, f"Expected 2 group plans, got {len(group_plans)}")
-        self.assertEqual(group_plans[0], ("MMA Focus", 90, 2500.0)) # Assertion data is correct
-        self.assertEqual(group_plans[1], ("MMA Mastery", 30, 1000.0)) # Assertion data is correct
+        self.assertEqual(group_plans[0], ("MMA Focus", 90, 250000)) # Assertion data is correct
+        self.assertEqual(group_plans[1], ("MMA Mastery", 30, 100000)) # Assertion data is correct
 
         # Check group_class_memberships table
         cursor.execute("SELECT id FROM members WHERE phone = '1234567890'") # Test User One
@@ -107,9 +123,9 @@ class TestMigrateHistoricalData(unittest.TestCase):
         gc_memberships = [tuple(row) for row in gc_memberships_rows] # Convert rows to tuples
         self.assertEqual(len(gc_memberships), 2, f"Expected 2 GC memberships, got {len(gc_memberships)}")
         # Member One, MMA Mastery
-        self.assertEqual(gc_memberships[0], (member_one_id, mma_mastery_plan_id, "2024-01-01", "2024-01-30", 1000.0, "2024-01-01", "New"))
+        self.assertEqual(gc_memberships[0], (member_one_id, mma_mastery_plan_id, "2024-01-01", "2024-01-30", 100000, "2024-01-01", "New"))
         # Member Two, MMA Focus
-        self.assertEqual(gc_memberships[1], (member_two_id, mma_focus_plan_id, "2024-01-15", "2024-04-13", 2500.0, "2024-01-15", "New"))
+        self.assertEqual(gc_memberships[1], (member_two_id, mma_focus_plan_id, "2024-01-15", "2024-04-13", 250000, "2024-01-15", "New"))
 
         # Check pt_memberships table
         cursor.execute("SELECT id FROM members WHERE phone = '1122334455'") # Test User Three
@@ -122,10 +138,153 @@ class TestMigrateHistoricalData(unittest.TestCase):
         pt_memberships = [tuple(row) for row in pt_memberships_rows] # Convert rows to tuples
         self.assertEqual(len(pt_memberships), 2, f"Expected 2 PT memberships, got {len(pt_memberships)}")
         # Test User One PT data
-        self.assertEqual(pt_memberships[0], (member_one_id, "2024-01-02", 500.0, 10, 10))
+        self.assertEqual(pt_memberships[0], (member_one_id, "2024-01-02", 50000, 10, 10))
         # Test User Three PT data
-        self.assertEqual(pt_memberships[1], (member_three_id, "2024-02-10", 1500.0, 20, 20))
+        self.assertEqual(pt_memberships[1], (member_three_id, "2024-02-10", 150000, 20, 20))
+
+
+    def _write_csv(self, header, rows):
+        handle = tempfile.NamedTemporaryFile(
+            "w", suffix=".csv", delete=False, newline="", encoding="utf-8"
+        )
+        with handle:
+            writer = csv.writer(handle)
+            writer.writerow(header)
+            writer.writerows(rows)
+        self.addCleanup(os.remove, handle.name)
+        return handle.name
+
+    def test_bulk_load_counts_failures_and_is_idempotent(self):
+        gc_csv = self._write_csv(
+            ["Client Name", "Phone", "Plan Type", "Plan Duration", "Plan Start Date", "Payment Date", "Amount", "Membership Type"],
+            [
+                ["Bulk A", "7001", "Monthly", "30", "01/01/24", "01/01/24", "₹1,000", "Fresh"],
+                ["Bulk B", "7002", "Monthly", "30", "05/01/2024", "", "1000", "Renewal"],
+                ["Bulk C", "7003", "Monthly", "abc", "05/01/24", "05/01/24", "1000", "Fresh"],
+                ["", "7004", "Monthly", "30", "05/01/24", "05/01/24", "1000", "Fresh"],
+                ["Bulk D", "7005", "Monthly", "30", "", "05/01/24", "1000", "Fresh"],
+            ],
+        )
+        pt_csv = self._write_csv(
+            ["Client Name", "Phone", "Payment Date", "Amount Paid", "Session Count"],
+            [
+                ["Bulk A", "7001", "02/01/24", "₹500", "10"],
+                ["Bulk A", "7001", "02/01/24", "₹500", "10"],  # Duplicate within the file
+                ["Bulk E", "7006", "bad date", "₹500", "10"],
+            ],
+        )
+        with patch("reporter.migrate_historical_data.GC_MEMBERS_CSV", gc_csv), \
+                patch("reporter.migrate_historical_data.PT_MEMBERS_CSV", pt_csv):
+            processed_members = {}
+            self.assertEqual(migrate_gc_data(self.db_mngr, processed_members, {}), (2, 3))
+            self.assertEqual(migrate_pt_data(self.db_mngr, processed_members, {}), (1, 1))
+            # A second run finds everything already loaded
+            self.assertEqual(migrate_gc_data(self.db_mngr, {}, {}), (0, 3))
+            self.assertEqual(migrate_pt_data(self.db_mngr, {}, {}), (0, 1))
+
+        cursor = self.conn.cursor()
+        # Members are created for every row with a name and phone, as before
+        self.assertEqual(cursor.execute("SELECT COUNT(*) FROM members").fetchone()[0], 5)
+        self.assertEqual(cursor.execute("SELECT COUNT(*) FROM group_plans").fetchone()[0], 1)
+        cursor.execute(
+            "SELECT start_date, end_date, amount_paid, purchase_date, membership_type "
+            "FROM group_class_memberships ORDER BY start_date"
+        )
+        self.assertEqual(
+            [tuple(row) for row in cursor.fetchall()],
+            [
+                ("2024-01-01", "2024-01-30", 100000, "2024-01-01", "New"),
+                ("2024-01-05", "2024-02-03", 100000, "2024-01-05", "Renewal"),
+            ],
+        )
+        self.assertEqual(cursor.execute("SELECT COUNT(*) FROM pt_memberships").fetchone()[0], 1)
+
+    def test_failure_summary_groups_reasons_and_samples_rows(self):
+        gc_csv = self._write_csv(
+            ["Client Name", "Phone", "Plan Type", "Plan Duration", "Plan Start Date", "Amount"],
+            [["Summary A", "7100", "Monthly", "30", "01/01/24", "1000"], ["", "7101", "Monthly", "30", "01/01/24", "1000"]]
+            + [[f"Summary {i}", f"72{i:02d}", "Monthly", f"bad{i}", "01/01/24", "1000"] for i in range(12)],
+        )
+        with patch("reporter.migrate_historical_data.GC_MEMBERS_CSV", gc_csv), \
+                self.assertLogs(level="INFO") as logs:
+            self.assertEqual(migrate_gc_data(self.db_mngr, {}, {}), (1, 13))
+
+        messages = [record.getMessage() for record in logs.records]
+        self.assertIn("GC data migration: Processed 14 rows. Migrated: 1. Failed: 13.", messages)
+        self.assertIn("Failed GC rows: 12 x Invalid Plan Duration", messages)
+        self.assertIn("Failed GC rows: 1 x Missing name or phone", messages)
+        sampled = [message for message in messages if message.startswith("  GC Row ")]
+        self.assertEqual(len(sampled), FAILED_ROW_SAMPLES)
+        self.assertTrue(sampled[0].startswith("  GC Row 2: Missing name or phone - Data: {"))
+
+    def test_vectorized_parsers(self):
+        dates = pd.Series(["01/01/24", "1/2/24", "15/03/2024", " 05/01/24 ", "", "31/02/24", "bad"])
+        self.assertEqual(
+            parse_dates_dmy(dates).tolist(),
+            ["2024-01-01", "2024-02-01", "2024-03-15", "2024-01-05", "", "", ""],
+        )
+        amounts = pd.Series(["₹1,000", "250.5", "", "-", "None", "abc"])
+        self.assertEqual(clean_amounts(amounts).tolist(), [1000.0, 250.5, 0.0, 0.0, 0.0, 0.0])
+        self.assertEqual(amounts_in_paise(clean_amounts(amounts)).tolist(), [100000, 25050, 0, 0, 0, 0])
 
+        gc_df = pd.DataFrame({"Phone": ["1", "1", "2", ""], "Plan Start Date": ["05/01/24", "01/01/24", "bad", "01/01/20"]})
+        pt_df = pd.DataFrame({"Phone": ["1", "2"], "Payment Date": ["03/01/24", "10/02/2024"]})
+        self.assertEqual(
+            collect_earliest_start_dates(gc_df, pt_df),
+            {"1": "2024-01-01", "2": "2024-02-10"},
+        )
+
+    def test_header_only_files_load_nothing(self):
+        gc_csv = self._write_csv(["Client Name", "Phone", "Plan Type", "Plan Duration", "Plan Start Date"], [])
+        pt_csv = self._write_csv(["Client Name", "Phone", "Payment Date", "Amount Paid", "Session Count"], [])
+        with patch("reporter.migrate_historical_data.GC_MEMBERS_CSV", gc_csv), \
+                patch("reporter.migrate_historical_data.PT_MEMBERS_CSV", pt_csv):
+            self.assertEqual(migrate_gc_data(self.db_mngr, {}, {}), (0, 0))
+            self.assertEqual(migrate_pt_data(self.db_mngr, {}, {}), (0, 0))
+
+    def test_unchanged_sources_are_skipped_and_appends_load_only_new_rows(self):
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir)
+        gc_csv = shutil.copy(TEST_GC_CSV, os.path.join(work_dir, "gc.csv"))
+        pt_csv = shutil.copy(TEST_PT_CSV, os.path.join(work_dir, "pt.csv"))
+        module = "reporter.migrate_historical_data"
+        with patch(f"{module}.DB_FILE", TEST_DB_FILE), \
+                patch(f"{module}.GC_MEMBERS_CSV", gc_csv), \
+                patch(f"{module}.PT_MEMBERS_CSV", pt_csv), \
+                patch(f"{module}.migrate_gc_data", wraps=migrate_gc_data) as gc_loader, \
+                patch(f"{module}.migrate_pt_data", wraps=migrate_pt_data) as pt_loader:
+            migrate_historical_data()
+            self.assertEqual((gc_loader.call_count, pt_loader.call_count), (1, 1))
+
+            migrate_historical_data()
+            self.assertEqual((gc_loader.call_count, pt_loader.call_count), (1, 1))
+            # The skipped run must leave previously migrated rows in place
+            gc_count = self.conn.execute("SELECT COUNT(*) FROM group_class_memberships").fetchone()[0]
+            self.assertEqual(gc_count, 2)
+
+            # Touching a file without changing it is still a no-op
+            os.utime(gc_csv, (1_000_000_000, 1_000_000_000))
+            migrate_historical_data()
+            self.assertEqual(gc_loader.call_count, 1)
+
+            with open(pt_csv, "a", encoding="utf-8") as file:
+                file.write('PT-T03,Test User Four,5566778899,01/03/24,"₹800",8,\n')
+            migrate_historical_data()
+            self.assertEqual((gc_loader.call_count, pt_loader.call_count), (1, 2))
+            appended_rows = pt_loader.call_args.args[3]
+            self.assertEqual(list(appended_rows.index), [2])
+
+            migrate_historical_data(force=True)
+            self.assertEqual((gc_loader.call_count, pt_loader.call_count), (2, 3))
+
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT m.name, pt.purchase_date FROM pt_memberships pt JOIN members m ON m.id = pt.member_id ORDER BY pt.id")
+        self.assertEqual(
+            [tuple(row) for row in cursor.fetchall()],
+            [("Test User One", "2024-01-02"), ("Test User Three", "2024-02-10"), ("Test User Four", "2024-03-01")],
+        )
+        cursor.execute("SELECT row_count FROM migration_sources WHERE source_path = ?", (os.path.abspath(pt_csv),))
+        self.assertEqual(cursor.fetchone()[0], 3)
 
 if __name__ == "__main__":
     # This allows running the tests directly from the command line
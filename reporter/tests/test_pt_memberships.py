@@ -4,7 +4,7 @@ from datetime import date
 
 import pytest
 
-from reporter.database import create_database
+from reporter.database import create_database, get_connection
 from reporter.database_manager import DatabaseManager
 
 # Define the test database path
@@ -19,10 +19,9 @@ def db_manager_pt():  # Renamed fixture to avoid conflict if run with other test
     if os.path.exists(TEST_DB_PATH):
         os.remove(TEST_DB_PATH)
 
-    create_database(TEST_DB_PATH)
+    create_database(TEST_DB_PATH).close()
 
-    conn = sqlite3.connect(TEST_DB_PATH)
-    conn.execute("PRAGMA foreign_keys = ON;")
+    conn = get_connection(TEST_DB_PATH)
     manager = DatabaseManager(conn)
 
     # Setup: Create a dummy member to associate PT memberships with
@@ -0,0 +1,125 @@
+import re
+import sqlite3
+
+import pytest
+
+from reporter.database import INDEXES, SCHEMA_VERSION, create_database
+from reporter.database_manager import DatabaseManager
+from reporter.models import GroupClassMembership, GroupPlan, Member, PTMembership
+
+# A bare "SCAN <table>" in EXPLAIN QUERY PLAN output means SQLite walks the whole
+# table without an index. "SCAN <table> USING INDEX ..." is an ordered index walk.
+FULL_SCAN_PATTERN = re.compile(r"^SCAN \w+$")
+
+
+@pytest.fixture
+def db_manager() -> DatabaseManager:
+    conn = create_database(":memory:")
+    conn.execute("PRAGMA foreign_keys = ON;")
+    manager = DatabaseManager(connection=conn)
+    member = manager.add_member(
+        Member(id=None, name="Plan Member", phone="5550001", email=None, join_date="2024-01-01", is_active=True)
+    )
+    plan = manager.add_group_plan(
+        GroupPlan(id=None, name="Monthly", duration_days=30, default_amount=1000.0)
+    )
+    manager.add_group_class_membership(
+        GroupClassMembership(
+            id=None,
+            member_id=member.id,
+            plan_id=plan.id,
+            start_date="2024-01-01",
+            end_date="2024-01-30",
+            amount_paid=1000.0,
+            membership_type="New",
+            purchase_date="2024-01-01",
+        )
+    )
+    manager.add_pt_membership(
+        PTMembership(
+            id=None,
+            member_id=member.id,
+            purchase_date="2024-01-05",
+            amount_paid=500.0,
+            sessions_total=10,
+            sessions_remaining=10,
+        )
+    )
+    yield manager
+    conn.close()
+
+
+def _run_read_queries(db_manager: DatabaseManager):
+    db_manager.get_all_members()
+    db_manager.get_all_members_for_view()
+    db_manager.get_all_group_plans()
+    db_manager.get_all_group_plans_for_view()
+    db_manager.get_group_plan_by_display_name("Monthly - 30 days")
+    db_manager.get_group_plan_by_id(1)
+    db_manager.find_or_create_group_plan("Monthly", 30, 1000.0)
+    db_manager.get_all_group_class_memberships()
+    db_manager.get_all_group_class_memberships(status_filter="Active")
+    db_manager.get_all_group_class_memberships_for_view()
+    db_manager.get_all_group_class_memberships_for_view(name_filter="Plan", status_filter="Active")
+    db_manager.get_group_class_memberships_by_member_id(1)
+    db_manager.get_all_pt_memberships()
+    db_manager.get_all_pt_memberships_for_view()
+    db_manager.get_members_page_for_view(10, after=("Plan Member", 1))
+    db_manager.search_members("plan member")
+    db_manager.search_members("plan m")
+    db_manager.search_members("pl")
+    db_manager.search_members_by_prefix("plan m")
+    db_manager.search_members_by_prefix("555", active_only=True)
+    db_manager.get_group_class_memberships_page_for_view(10, after=("2024-01-01", 1))
+    db_manager.get_pt_memberships_page_for_view(10, after=("2024-01-05", 1))
+    db_manager.get_financial_report_details("2024-01-01", "2024-12-31")
+    db_manager.get_financial_report_totals("2024-01-01", "2024-12-31")
+    db_manager.get_revenue_by_period("2024-01-01", "2024-12-31", "quarter")
+    db_manager.get_revenue_series("2024-01-01", "2024-12-31", "week")
+    db_manager.generate_renewal_report_data("2024-01-01", "2024-01-31")
+
+
+def test_indexes_created_and_versioned(db_manager: DatabaseManager):
+    cursor = db_manager.conn.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    existing = {row[0] for row in cursor.fetchall()}
+    for index_name, _ in INDEXES:
+        assert index_name in existing
+    assert cursor.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+
+
+def test_no_database_manager_query_full_scans(db_manager: DatabaseManager):
+    executed_sql = []
+    db_manager.conn.set_trace_callback(executed_sql.append)
+    try:
+        _run_read_queries(db_manager)
+    finally:
+        db_manager.conn.set_trace_callback(None)
+
+    select_statements = [
+        sql for sql in executed_sql if sql.lstrip().upper().startswith("SELECT")
+    ]
+    assert select_statements, "No SELECT statements were captured"
+
+    offenders = []
+    for sql in select_statements:
+        plan = db_manager.conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+        for row in plan:
+            detail = row[3]
+            if FULL_SCAN_PATTERN.match(detail):
+                offenders.append((" ".join(sql.split()), detail))
+    assert offenders == [], f"Queries falling back to full table scans: {offenders}"
+
+
+def test_financial_report_details_need_no_sort(db_manager: DatabaseManager):
+    executed_sql = []
+    db_manager.conn.set_trace_callback(executed_sql.append)
+    try:
+        db_manager.get_financial_report_details("2024-01-01", "2024-12-31")
+    finally:
+        db_manager.conn.set_trace_callback(None)
+
+    plan = db_manager.conn.execute(f"EXPLAIN QUERY PLAN {executed_sql[0]}").fetchall()
+    details = [row[3] for row in plan]
+    assert "MERGE (UNION ALL)" in details
+    assert not any("TEMP B-TREE" in detail for detail in details), details
@@ -18,16 +18,11 @@ fi
 echo "Activating virtual environment..."
 source $VENV_DIR/bin/activate
 
-# Install dependencies
-echo "Installing dependencies..."
-pip install -r requirements.txt
-
-# Run data migration
-echo "Running data migration..."
-python -m reporter.migrate_historical_data
-
-# Launch the application
+# Launch the application. reporter.main installs missing dependencies only when
+# requirements.txt changed since they were last verified (.deps_verified), sets up the
+# schema only when it is stale, skips source CSVs that were already migrated unchanged,
+# and then starts Streamlit.
 echo "Launching Streamlit application..."
-python -m streamlit run reporter/main.py
+python -m reporter.main
 
 echo "Application setup and launch complete."